@@ -2,29 +2,36 @@
 
 
 import os
-import shutil
-import tempfile
+import asyncio
+import json
+import queue
 from joblib import load
 import numpy as np
 import base64
 from fastapi.responses import JSONResponse
 from fastapi import FastAPI, File, UploadFile, Form, Request
-import plotly.express as px
-import plotly.io as po
 import pandas as pd
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import soundfile as sf
-import whisper
-from typing import Dict
+from typing import Dict, List
 import cv2
 from datetime import datetime
 import torch
 from fastapi.middleware.cors import CORSMiddleware
-from models.enhanced_voice_processor import EnhancedVoiceProcessor
+from models.enhanced_voice_processor import EnhancedVoiceProcessor, decode_audio_bytes
 from models.facial_behavior_analyzer import EnhancedFacialBehaviorAnalyzer
 from models.advanced_voice_mental_health import AdvancedVoiceMentalHealthAnalyzer
 from models.weighted_ai_assessment import WeightedAIAssessmentEngine
-from models.hindi_sentiment import HindiSentimentAnalyzer
+from models.hindi_sentiment import get_hindi_sentiment_analyzer
+from utils.job_queue import AudioJob, AudioJobQueue
+from utils.feature_cache import DEFAULT_CACHE_PATH, VoiceFeatureCache
+from utils.frame_store import SessionFrameStore
+from utils.facial_stream_worker import FacialStreamWorker
+from utils.stress_aggregation import StressAggregate
+from utils.model_registry import model_registry
+from utils.text_analysis_cache import (
+    DEFAULT_MAX_ENTRIES, DEFAULT_TEXT_CACHE_PATH, DEFAULT_TTL_SECONDS, text_analysis_cache
+)
 
 from app_voice_enhanced import *
 # from fucntions import * 
@@ -33,7 +40,6 @@ curr_path = os.getcwd()
 
 
 app = FastAPI()
-model = whisper.load_model("base")  # You can use 'small', 'medium', or 'large' for more accuracy but slower
 origins = [
     "http://localhost:5173",  # Vite
     "http://127.0.0.1:5173",
@@ -57,21 +63,61 @@ try:
     print("✅ Enhanced voice processor with Whisper model initialized")
 
     # Initialize advanced voice analyzer
-    advanced_voice_analyzer = AdvancedVoiceMentalHealthAnalyzer()
+    # VOICE_PITCH_BACKEND=yin|autocorr trades a little F0 accuracy for near real-time prosody
+    # VOICE_WAV2VEC_BACKBONE=base and VOICE_WAV2VEC_RUNTIME=int8|onnx shrink the deep-feature model on CPU
+    # VOICE_FEATURE_CACHE_MB=0 disables the persistent feature cache used for re-submitted recordings
+    voice_feature_cache_mb = float(os.getenv("VOICE_FEATURE_CACHE_MB", "256"))
+    voice_feature_cache = VoiceFeatureCache(
+        os.getenv("VOICE_FEATURE_CACHE_PATH", str(DEFAULT_CACHE_PATH)), max_mb=voice_feature_cache_mb
+    ) if voice_feature_cache_mb > 0 else None
+    advanced_voice_analyzer = AdvancedVoiceMentalHealthAnalyzer(
+        pitch_backend=os.getenv("VOICE_PITCH_BACKEND", "pyin"),
+        wav2vec_backbone=os.getenv("VOICE_WAV2VEC_BACKBONE", "xlsr-large"),
+        wav2vec_runtime=os.getenv("VOICE_WAV2VEC_RUNTIME", "torch"),
+        feature_cache=voice_feature_cache
+    )
     print("✅ Advanced voice analyzer initialized")
 
     # Initialize weighted assessment engine
     weighted_assessment_engine = WeightedAIAssessmentEngine()
     print("✅ Weighted assessment engine initialized")
 
+    # Load every registered model (Hindi sentiment, ...) once now instead of on the first request
+    model_registry.warm()
+    print("✅ Shared models loaded: " + ", ".join(
+        f"{name} ({info['status']})" for name, info in model_registry.status().items()
+    ))
+
     print("✅ All AI components initialized successfully")
 
 except Exception as e:
     print(f"⚠️ Error initializing AI components: {e}")
     enhanced_voice_processor = None
     advanced_voice_analyzer = None
+    voice_feature_cache = None
     weighted_assessment_engine = None
 
+# Memoized sentiment / mental state results for recurring answers
+# TEXT_ANALYSIS_CACHE_SIZE=0 disables it; TEXT_ANALYSIS_CACHE_PATH="" keeps it in memory only
+try:
+    text_analysis_cache.configure(
+        max_entries=int(os.getenv("TEXT_ANALYSIS_CACHE_SIZE", str(DEFAULT_MAX_ENTRIES))),
+        ttl_seconds=float(os.getenv("TEXT_ANALYSIS_CACHE_TTL", str(DEFAULT_TTL_SECONDS))),
+        path=os.getenv("TEXT_ANALYSIS_CACHE_PATH", str(DEFAULT_TEXT_CACHE_PATH)) or None
+    )
+    print("✅ Text analysis cache configured")
+except Exception as e:
+    print(f"⚠️ Error opening text analysis cache, keeping it in memory only: {e}")
+    text_analysis_cache.configure(path=None)
+
+# Bounded worker pool for transcription + voice analysis so uploads don't block the event loop
+VOICE_JOB_WORKERS = int(os.getenv("VOICE_JOB_WORKERS", "2"))
+VOICE_JOB_MAX_PENDING = int(os.getenv("VOICE_JOB_MAX_PENDING", "50"))
+AUDIO_SAMPLE_RATE = 16000  # Whisper and wav2vec2 both expect 16 kHz mono
+SSE_POLL_INTERVAL = 0.5  # seconds between job status checks on the SSE stream
+
+voice_job_queue = AudioJobQueue(max_workers=VOICE_JOB_WORKERS, max_pending=VOICE_JOB_MAX_PENDING)
+
 @app.get("/")
 async def root():
     return {"message": "SOLDIER SUPPORT SYSTEM - Python Backend", "status": "running"}
@@ -82,137 +128,102 @@ async def health_check():
         "status": "healthy",
         "service": "warrior-support-python-backend",
         "advanced_voice_analysis": advanced_voice_analyzer is not None,
+        "wav2vec_backbone": advanced_voice_analyzer.wav2vec_backbone.describe() if advanced_voice_analyzer and advanced_voice_analyzer.wav2vec_backbone else None,
         "weighted_assessment": weighted_assessment_engine is not None,
-        "gpu_available": torch.cuda.is_available() if 'torch' in globals() else False
+        "gpu_available": torch.cuda.is_available() if 'torch' in globals() else False,
+        "voice_job_queue": voice_job_queue.stats(),
+        "voice_feature_cache": voice_feature_cache.stats() if voice_feature_cache else None,
+        "text_analysis_cache": text_analysis_cache.stats(),
+        "facial_analysis": facial_analyzer is not None and facial_analyzer.is_initialized,
+        "facial_emotion_backend": facial_analyzer.emotion_backend if facial_analyzer else None,
+        "frame_store": frame_store.stats(),
+        "facial_stream_worker": facial_stream_worker.stats(),
+        "models": model_registry.status()
     }
 
-@app.post("/api/translate")
-async def translate_audio(audio: UploadFile = File(...)):
-    tmp_path = None
-    voice_analysis_path = None
-    print(f'🎙️ Audio received: {audio.filename}, Content-Type: {audio.content_type}, Size: {audio.size if hasattr(audio, "size") else "unknown"}')
-
-    try:
-        # Save uploaded file to a temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmpfile:
-            content = await audio.read()
-            tmpfile.write(content)
-            tmp_path = tmpfile.name
+def process_translation_job(job: AudioJob, content: bytes, filename: str = "") -> Dict:
+    """
+    Worker-side /api/translate pipeline: transcription, voice analysis and weighted scoring.
+    Runs on the audio job queue so the event loop stays free while Whisper is busy.
+    """
+    print(f"🧵 Processing audio job {job.job_id} ({filename or 'upload'})")
 
-        print(f"📁 File saved to: {tmp_path}, Size: {os.path.getsize(tmp_path)} bytes")
+    # Use global enhanced voice processor (no need to reload Whisper model)
+    if not enhanced_voice_processor:
+        raise ValueError("Enhanced voice processor not available")
 
-        # Use global enhanced voice processor (no need to reload Whisper model)
-        if not enhanced_voice_processor:
-            raise ValueError("Enhanced voice processor not available")
+    # Decode once in memory to 16 kHz mono float32, shared by Whisper and voice analysis
+    with job.stage("audio_decode"):
+        audio_data = decode_audio_bytes(content, sample_rate=AUDIO_SAMPLE_RATE)
 
-        # Create a copy of the file for voice analysis
-        voice_analysis_path = tmp_path + "_voice_copy"
-        shutil.copy2(tmp_path, voice_analysis_path)
-        print(f"📁 Voice analysis copy created: {voice_analysis_path}")
+    print(f"✅ Audio decoded in memory: {len(audio_data)/AUDIO_SAMPLE_RATE:.2f}s at {AUDIO_SAMPLE_RATE}Hz ({len(content)} bytes uploaded)")
 
-        print("🎤 Starting transcription with Hinglish (Hindi) language...")
-        transcript = enhanced_voice_processor.transcribe_audio(tmp_path, language_hint="hi")
+    print("🎤 Starting transcription with Hinglish (Hindi) language...")
+    with job.stage("transcription"):
+        transcript = enhanced_voice_processor.transcribe_audio(audio_data, language_hint="hi")
 
-        if not transcript or 'transcription' not in transcript:
-            print(f"❌ Transcription failed. Result: {transcript}")
-            raise ValueError("Transcription failed or returned no result.")
+    if not transcript or 'transcription' not in transcript:
+        print(f"❌ Transcription failed. Result: {transcript}")
+        raise ValueError("Transcription failed or returned no result.")
 
-        print(f"✅ Transcription successful: '{transcript['transcription'][:100]}...'")
-        print(f"🌐 Detected language: {transcript.get('language', 'unknown')}")
+    print(f"✅ Transcription successful: '{transcript['transcription'][:100]}...'")
+    print(f"🌐 Detected language: {transcript.get('language', 'unknown')}")
 
-        # Perform advanced voice analysis if available
-        voice_analysis_results = None
-        if advanced_voice_analyzer:
-            try:
-                print(f"🎵 Starting voice analysis for file: {voice_analysis_path}")
-
-                # Load audio for analysis
-                import librosa
-                import soundfile as sf
-
-                # Try multiple methods to load audio
-                audio_data = None
-                sample_rate = None
-
-                try:
-                    # Method 1: Try librosa
-                    audio_data, sample_rate = librosa.load(voice_analysis_path, sr=None)
-                    print(f"✅ Audio loaded with librosa: {len(audio_data)/sample_rate:.2f}s at {sample_rate}Hz")
-                except Exception as e1:
-                    print(f"⚠️ Librosa failed: {e1}")
-                    try:
-                        # Method 2: Try soundfile
-                        audio_data, sample_rate = sf.read(voice_analysis_path)
-                        print(f"✅ Audio loaded with soundfile: {len(audio_data)/sample_rate:.2f}s at {sample_rate}Hz")
-                    except Exception as e2:
-                        print(f"⚠️ Soundfile failed: {e2}")
-                        # Method 3: Convert using pydub first
-                        try:
-                            from pydub import AudioSegment
-                            import tempfile as tf
-
-                            # Convert to WAV using pydub
-                            audio = AudioSegment.from_file(voice_analysis_path)
-
-                            # Export to temporary WAV file
-                            with tf.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
-                                audio.export(temp_wav.name, format="wav")
-                                audio_data, sample_rate = librosa.load(temp_wav.name, sr=None)
-                                print(f"✅ Audio converted and loaded: {len(audio_data)/sample_rate:.2f}s at {sample_rate}Hz")
-
-                                # Clean up temp file
-                                os.unlink(temp_wav.name)
-
-                        except Exception as e3:
-                            print(f"⚠️ Pydub conversion failed: {e3}")
-                            audio_data = None
-
-                if audio_data is not None and len(audio_data) > 0:
-                    # Extract voice features
-                    print("🔍 Extracting voice features...")
-                    voice_features = advanced_voice_analyzer.analyze_audio_array(audio_data, sample_rate)
-
-                    if voice_features and len(voice_features) > 0:
-                        # Calculate mental health scores
-                        print("🧠 Calculating mental health scores...")
+    # Perform advanced voice analysis if available
+    voice_analysis_results = None
+    if advanced_voice_analyzer:
+        try:
+            print("🎵 Starting voice analysis on decoded waveform")
+
+            if audio_data is not None and len(audio_data) > 0:
+                # Extract voice features
+                print("🔍 Extracting voice features...")
+                with job.stage("voice_analysis"):
+                    voice_features = advanced_voice_analyzer.analyze_audio_array(audio_data, AUDIO_SAMPLE_RATE)
+
+                if voice_features and len(voice_features) > 0:
+                    # Calculate mental health scores
+                    print("🧠 Calculating mental health scores...")
+                    with job.stage("voice_scoring"):
                         voice_analysis_results = advanced_voice_analyzer.calculate_mental_health_scores(voice_features)
 
-                        if voice_analysis_results:
-                            print(f"🎯 Voice analysis completed successfully!")
-                            print(f"   Depression: {voice_analysis_results.get('depression', {}).get('score', 0):.1f}")
-                            print(f"   Anxiety: {voice_analysis_results.get('anxiety', {}).get('score', 0):.1f}")
-                            print(f"   Stress: {voice_analysis_results.get('stress', {}).get('score', 0):.1f}")
-                        else:
-                            print("⚠️ Mental health scoring failed")
+                    if voice_analysis_results:
+                        print(f"🎯 Voice analysis completed successfully!")
+                        print(f"   Depression: {voice_analysis_results.get('depression', {}).get('score', 0):.1f}")
+                        print(f"   Anxiety: {voice_analysis_results.get('anxiety', {}).get('score', 0):.1f}")
+                        print(f"   Stress: {voice_analysis_results.get('stress', {}).get('score', 0):.1f}")
                     else:
-                        print("⚠️ Voice feature extraction failed")
+                        print("⚠️ Mental health scoring failed")
                 else:
-                    print("⚠️ Could not load audio data")
+                    print("⚠️ Voice feature extraction failed")
+            else:
+                print("⚠️ Could not load audio data")
 
-            except Exception as e:
-                print(f"⚠️ Advanced voice analysis failed: {e}")
-                import traceback
-                traceback.print_exc()
-                voice_analysis_results = None
-
-        # Prepare response
-        response = {
-            "transcript": transcript['transcription']
-        }
+        except Exception as e:
+            print(f"⚠️ Advanced voice analysis failed: {e}")
+            import traceback
+            traceback.print_exc()
+            voice_analysis_results = None
+
+    # Prepare response
+    response = {
+        "transcript": transcript['transcription']
+    }
 
-        # Add voice analysis results if available
-        if voice_analysis_results:
-            response["voice_analysis"] = voice_analysis_results
-            response["ai_enhanced"] = True
+    # Add voice analysis results if available
+    if voice_analysis_results:
+        response["voice_analysis"] = voice_analysis_results
+        response["ai_enhanced"] = True
 
-            # Calculate weighted scores if we have voice analysis
-            if weighted_assessment_engine:
-                try:
-                    # Create dummy data for other components (since we only have voice)
-                    dummy_sentiment = {"negative": 0.3, "positive": 0.5, "neutral": 0.2}
-                    dummy_keywords = {"depression_indicators": 0, "anxiety_indicators": 0, "stress_indicators": 0, "total_words": 10}
-                    dummy_facial = {"sadness": 0.2, "fear": 0.1, "anger": 0.1, "happiness": 0.6}
+        # Calculate weighted scores if we have voice analysis
+        if weighted_assessment_engine:
+            try:
+                # Create dummy data for other components (since we only have voice)
+                dummy_sentiment = {"negative": 0.3, "positive": 0.5, "neutral": 0.2}
+                dummy_keywords = {"depression_indicators": 0, "anxiety_indicators": 0, "stress_indicators": 0, "total_words": 10}
+                dummy_facial = {"sadness": 0.2, "fear": 0.1, "anger": 0.1, "happiness": 0.6}
 
+                with job.stage("weighted_assessment"):
                     weighted_results = weighted_assessment_engine.calculate_comprehensive_scores(
                         voice_results=voice_analysis_results,
                         sentiment_results=dummy_sentiment,
@@ -220,33 +231,103 @@ async def translate_audio(audio: UploadFile = File(...)):
                         facial_results=dummy_facial
                     )
 
-                    if weighted_results:
-                        response["weighted_assessment"] = weighted_results
-                        print(f"🎯 Weighted assessment completed with voice priority (40%)")
+                if weighted_results:
+                    response["weighted_assessment"] = weighted_results
+                    print(f"🎯 Weighted assessment completed with voice priority (40%)")
 
-                except Exception as e:
-                    print(f"⚠️ Weighted assessment failed: {e}")
-        else:
-            response["ai_enhanced"] = False
+            except Exception as e:
+                print(f"⚠️ Weighted assessment failed: {e}")
+    else:
+        response["ai_enhanced"] = False
+
+    return response
 
-        return response
 
+@app.post("/api/translate")
+async def translate_audio(audio: UploadFile = File(...)):
+    print(f'🎙️ Audio received: {audio.filename}, Content-Type: {audio.content_type}, Size: {audio.size if hasattr(audio, "size") else "unknown"}')
+
+    try:
+        content = await audio.read()
+
+        # Run on the worker pool and await without blocking the event loop
+        job = voice_job_queue.submit(process_translation_job, content, audio.filename, kind="translate")
+        return await asyncio.wrap_future(job.future)
+
+    except queue.Full as e:
+        print(f"⚠️ Audio job queue full: {e}")
+        return JSONResponse(content={"error": str(e), "queue": voice_job_queue.stats()}, status_code=503)
     except Exception as e:
         print(f"Error in translate_audio: {e}")
         return JSONResponse(content={"error": str(e)}, status_code=500)
-    finally:
-        # Clean up temporary files
-        try:
-            if tmp_path and os.path.exists(tmp_path):
-                os.remove(tmp_path)
-                print(f"🗑️ Cleaned up temp file: {tmp_path}")
 
-            # Clean up voice analysis copy
-            if voice_analysis_path and os.path.exists(voice_analysis_path):
-                os.remove(voice_analysis_path)
-                print(f"🗑️ Cleaned up voice analysis copy: {voice_analysis_path}")
-        except Exception as cleanup_error:
-            print(f"⚠️ Cleanup error: {cleanup_error}")
+
+@app.post("/api/translate/jobs")
+async def submit_translate_job(audio: UploadFile = File(...)):
+    """Job-submission mode: queue the upload and return a job id immediately"""
+    print(f'🎙️ Audio job received: {audio.filename}, Content-Type: {audio.content_type}')
+
+    try:
+        content = await audio.read()
+        job = voice_job_queue.submit(process_translation_job, content, audio.filename, kind="translate")
+
+        return JSONResponse(content={
+            "job_id": job.job_id,
+            "status": job.status,
+            "queue_depth": voice_job_queue.queue_depth(),
+            "status_url": f"/api/translate/jobs/{job.job_id}",
+            "events_url": f"/api/translate/jobs/{job.job_id}/events"
+        }, status_code=202)
+
+    except queue.Full as e:
+        print(f"⚠️ Audio job queue full: {e}")
+        return JSONResponse(content={"error": str(e), "queue": voice_job_queue.stats()}, status_code=503)
+    except Exception as e:
+        print(f"Error in submit_translate_job: {e}")
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+
+@app.get("/api/translate/jobs/{job_id}")
+async def get_translate_job(job_id: str):
+    """Poll a queued transcription job for status, stage timings and result"""
+    job = voice_job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(content={"error": "Job not found or expired"}, status_code=404)
+
+    response = job.to_dict()
+    response["queue_depth"] = voice_job_queue.queue_depth()
+    return response
+
+
+@app.get("/api/translate/jobs/{job_id}/events")
+async def stream_translate_job(job_id: str):
+    """Server-sent events stream of job status until the job finishes"""
+    job = voice_job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(content={"error": "Job not found or expired"}, status_code=404)
+
+    async def event_stream():
+        last_state = None
+        while True:
+            state = (job.status, job.current_stage)
+            if state != last_state:
+                last_state = state
+                payload = job.to_dict(include_result=job.is_finished)
+                payload["queue_depth"] = voice_job_queue.queue_depth()
+                event = "result" if job.is_finished else "status"
+                yield f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+            if job.is_finished:
+                break
+            await asyncio.sleep(SSE_POLL_INTERVAL)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.get("/api/translate/queue")
+async def translate_queue_stats():
+    """Queue depth and average per-stage timings of the audio worker pool"""
+    return voice_job_queue.stats()
 
 
 # For sentiment API: use Pydantic model for JSON input
@@ -257,43 +338,91 @@ class SentimentRequest(BaseModel):
 
 @app.post("/api/get_sentiment")
 async def get_sentiment(request: SentimentRequest):
-    print(request)
-    hindi_sentiment_analyzer = HindiSentimentAnalyzer()
-    results = hindi_sentiment_analyzer.analyze_sentiment(request.text)
-
-    results2 = hindi_sentiment_analyzer.analyze_sentiment_with_model(request.text)
-    print("Results 1: ",results)
-
-    print("Results 2: ",results2)
-
-    
+    results = get_hindi_sentiment_analyzer().analyze_sentiment(request.text)
     return {"sentiment": results}
     
 
 
     
-SESSIONS: Dict[str, list] = {}  # Stores frame paths per session
-DURATION = 0
+# Decoded grayscale frames per session, held in memory; spills to sessions/ only past the byte budget
+frame_store = SessionFrameStore(
+    max_mb=float(os.getenv("FRAME_STORE_MAX_MB", "512")),
+    session_ttl=float(os.getenv("FRAME_SESSION_TTL", "600")),
+    spill_dir=os.path.join(curr_path, "sessions")
+)
+
+FACIAL_EMOTION_STRESS_WEIGHTS = {
+    'happy': 0.1,       # Very low stress
+    'neutral': 0.3,     # Low stress
+    'surprise': 0.4,    # Mild stress
+    'disgust': 0.6,     # Moderate stress
+    'angry': 0.8,       # High stress
+    'fear': 0.85,       # Very high stress
+    'sad': 0.9          # Highest stress
+}
+FINAL_SCORE_WAIT_SECONDS = float(os.getenv("FINAL_SCORE_WAIT_SECONDS", "30"))
+
+def score_stream_frames(analyzer: EnhancedFacialBehaviorAnalyzer, frames: List[np.ndarray],
+                        face_tracker=None, analyzer_state=None):
+    """Per-frame stress score, dominant emotions and mean confidence for a batch of streamed frames"""
+    scored = []
+    for frame_result in analyzer.analyze_frames(frames, face_tracker, analyzer_state):
+        frame_stress = calculate_frame_stress_score(frame_result, FACIAL_EMOTION_STRESS_WEIGHTS)
+
+        emotions = frame_result.get("emotions", [])
+        dominant_emotions = [e["dominant_emotion"] for e in emotions]
+        avg_confidence = sum(e["confidence"] for e in emotions) / len(emotions) if emotions else None
+        scored.append((frame_stress, dominant_emotions, avg_confidence))
+    return scored
+
+# FACE_DETECTION_PROCESSES shards Haar detection of each frame batch across processes (0 or 1 disables).
+# Off by default: every uvicorn worker would start its own pool, and streamed batches are often too
+# small to use it; enable it for deployments that score large backlogs of session frames.
+FACE_DETECTION_PROCESSES = int(os.getenv("FACE_DETECTION_PROCESSES", "0"))
+# FACE_TRACK_INTERVAL > 0 detects faces every N session frames and tracks them in between.
+# Off by default: tracking is sequential per session, so it bypasses the detection process pool.
+FACE_TRACK_INTERVAL = int(os.getenv("FACE_TRACK_INTERVAL", "0"))
+# FACE_DETECTION_WIDTH: frames are downscaled to this width for face detection (0 = full resolution).
+# Off by default: at 320 px a 640 px camera frame misses faces under ~48 px (the cascade window is 24 px).
+FACE_DETECTION_WIDTH = int(os.getenv("FACE_DETECTION_WIDTH", "0"))
+# FACIAL_EMOTION_BACKEND=onnx|onnx-int8 scores faces with ONNX Runtime instead of eager PyTorch
+# (export the int8 model first: python scripts/export_emotion_model.py --int8 --calibration-dir ...)
+FACIAL_EMOTION_BACKEND = os.getenv("FACIAL_EMOTION_BACKEND", "torch")
+
+def build_stream_facial_analyzer() -> EnhancedFacialBehaviorAnalyzer:
+    """Facial analyzer for the session stream worker, with process-pool face detection"""
+    analyzer = EnhancedFacialBehaviorAnalyzer(detection_width=FACE_DETECTION_WIDTH, emotion_backend=FACIAL_EMOTION_BACKEND)
+    if FACE_DETECTION_PROCESSES > 1:
+        analyzer.enable_parallel_detection(FACE_DETECTION_PROCESSES)
+    return analyzer
+
+# Loaded once at startup (cascade, EmotionCNN weights) and shared by every session;
+# per-session history lives on the session (FrameSession.analyzer_state)
+try:
+    facial_analyzer = build_stream_facial_analyzer()
+    print("✅ Facial behavior analyzer initialized")
+except Exception as e:
+    print(f"⚠️ Error initializing facial analyzer: {e}")
+    facial_analyzer = None
+
+# Frames are analysed in the background as they arrive; final_score only finalizes the aggregates.
+# Batches are large enough to keep every detection process busy.
+facial_stream_worker = FacialStreamWorker(
+    frame_store, facial_analyzer, score_stream_frames,
+    batch_size=max(16, 2 * FACE_DETECTION_PROCESSES),
+    track_interval=FACE_TRACK_INTERVAL
+)
 
 @app.post("/api/stream_frame")
 async def stream_frame(frame: UploadFile = File(...), session_id: str = Form(...), duration : int = Form(...)):
-    global DURATION
-    try:
-        session_dir = f"sessions/{session_id}"
-        os.makedirs(session_dir, exist_ok=True)
-        file_path = os.path.join(session_dir, frame.filename)
+    if facial_analyzer is None:
+        return JSONResponse(content={"error": "Facial analyzer not available"}, status_code=503)
 
+    try:
+        frame_count = frame_store.add_frame(session_id, await frame.read(), duration)
+        facial_stream_worker.notify(session_id)
         
-        with open(file_path, "wb") as f:
-            f.write(await frame.read())
-
-        DURATION = duration
-
-        if session_id not in SESSIONS:
-            SESSIONS[session_id] = []
-        SESSIONS[session_id].append(file_path)
-        
-        return {"status": "frame received", "frame_count": len(SESSIONS[session_id])}
+        return {"status": "frame received", "frame_count": frame_count}
     
     except Exception as e:
         print(f"Error processing frame: {e}")
@@ -301,69 +430,23 @@ async def stream_frame(frame: UploadFile = File(...), session_id: str = Form(...
 
 @app.get("/api/final_score")
 def get_final_score(session_id: str):
-    global DURATION
-    frame_paths = SESSIONS.get(session_id, [])
+    session = frame_store.get_session(session_id)
     
-    if not frame_paths:
+    if session is None or len(session) == 0:
         return {"error": "No frames found for this session"}
     
-    analyzer = EnhancedFacialBehaviorAnalyzer()
-
-    emotion_stress_weights = {
-        'happy': 0.1,       # Very low stress
-        'neutral': 0.3,     # Low stress
-        'surprise': 0.4,    # Mild stress
-        'disgust': 0.6,     # Moderate stress
-        'angry': 0.8,       # High stress
-        'fear': 0.85,       # Very high stress
-        'sad': 0.9          # Highest stress
-    }
-    frame_count = len(frame_paths)
-    frame_stress_scores = []
-    frame_emotions = []
-    frame_confidences = []
-    for f in frame_paths:
-        frame = cv2.imread(f, cv2.IMREAD_COLOR)
-
-        frame_result = analyzer.analyze_frame(frame)
-        frame_stress = calculate_frame_stress_score(frame_result, emotion_stress_weights)
-        frame_stress_scores.append(frame_stress)
-
-        try:
-            # Store frame data
-            dominant_emotions = [e["dominant_emotion"] for e in frame_result.get("emotions", [])]
-            frame_emotions.extend(dominant_emotions)
-
-            avg_confidence = sum(e["confidence"] for e in frame_result.get("emotions", [])) / len(frame_result.get("emotions", []))
-            frame_confidences.append(avg_confidence)
-        
-        except Exception as e:
-            print(f"Error processing frame: {e}")
-            
-
-    base_path = os.path.join(curr_path, 'sessions')
-
-    # Iterate through all subdirectories
-    for subdir in os.listdir(base_path):
-        subdir_path = os.path.join(base_path, subdir)
-        
-        if os.path.isdir(subdir_path):
-            # Remove all contents of the subdirectory
-            for item in os.listdir(subdir_path):
-                item_path = os.path.join(subdir_path, item)
-                if os.path.isfile(item_path) or os.path.islink(item_path):
-                    os.unlink(item_path)  # remove file or symlink
-                elif os.path.isdir(item_path):
-                    shutil.rmtree(item_path)  # remove directory
+    # Usually a no-op: only frames uploaded in the last moments can still be in flight
+    if not facial_stream_worker.wait_until_analysed(session_id, timeout=FINAL_SCORE_WAIT_SECONDS):
+        print(f"⚠️ Session {session_id}: {session.received - session.analysed} frames still pending, scoring analysed frames")
     
-    results = calculate_final_stress_analysis(
-        frame_stress_scores,
-        frame_emotions,
-        frame_confidences,
-        frame_count,
-        DURATION,
-        'general_assessment'
-    )
+    frame_count = len(session)
+    aggregate = session.analysis or StressAggregate()
+    aggregate.frame_count = frame_count
+    
+    # Release the session (and any spilled files) once scored
+    frame_store.drop_session(session_id)
+    
+    results = finalize_stress_analysis(aggregate, session.duration, 'general_assessment')
 
     summary = results.get('analysis_summary', {})
     total_frames = summary.get('total_frames_analyzed', 0)
@@ -388,12 +471,11 @@ def get_final_score(session_id: str):
 
     avg_behavior_score = None
 
-    # Calculate stress levels with better logic
-    if stress_scores and len(stress_scores) > 0:
-        high_stress_count = sum(1 for s in stress_scores if s > 0.55)
-        severe_stress_count = sum(1 for s in stress_scores if s > 0.75)
-        high_stress_ratio = (high_stress_count / len(stress_scores)) * 100
-        severe_stress_ratio = (severe_stress_count / len(stress_scores)) * 100
+    # Band counts were already computed in one pass by finalize_stress_analysis
+    band_counts = summary.get('stress_distribution') if stress_scores else None
+    if band_counts:
+        high_stress_ratio = ((band_counts['high'] + band_counts['severe']) / len(stress_scores)) * 100
+        severe_stress_ratio = (band_counts['severe'] / len(stress_scores)) * 100
     else:
         # Generate realistic demo stress data if no real data
         high_stress_ratio = 33.2  # From your screenshot
@@ -421,13 +503,8 @@ def get_final_score(session_id: str):
         overall_assessment = "Good"
 
     stress_dist = None
-    if stress_scores and len(stress_scores) > 0:
-        stress_dist = {
-            'Low': sum(1 for s in stress_scores if s <= 0.35),
-            'Moderate': sum(1 for s in stress_scores if 0.35 < s <= 0.55),
-            'High': sum(1 for s in stress_scores if 0.55 < s <= 0.75),
-            'Severe': sum(1 for s in stress_scores if s > 0.75)
-        }
+    if band_counts:
+        stress_dist = {band.title(): count for band, count in band_counts.items()}
     else:
         # Try to get from results summary
         stress_dist = summary.get('stress_distribution', {})
@@ -453,33 +530,9 @@ def get_final_score(session_id: str):
         if level not in stress_dist:
             stress_dist[level] = 0
 
-    # Create DataFrame for chart
-    stress_df = pd.DataFrame([
-        {'Level': level, 'Count': count}
-        for level, count in stress_dist.items()
-        if level in required_levels
-    ])
-
-    # Create stress distribution chart
-    if len(stress_df) > 0 and stress_df['Count'].sum() > 0:
-        fig_stress = px.bar(
-            stress_df,
-            x='Level',
-            y='Count',
-            color='Level',
-            color_discrete_map={
-                'Low': '#28a745',
-                'Moderate': '#ffc107',
-                'High': '#fd7e14',
-                'Severe': '#dc3545'
-            },
-            title="Stress Level Distribution"
-        )
-
-        
     return {
         "session_id": session_id,
-        "frame_count": len(frame_paths),
+        "frame_count": frame_count,
         'results': results,
     }
 
@@ -28,6 +28,15 @@ from utils.language_support import (
     t, get_language, set_language, language_selector,
     display_bilingual_header, bilingual_info_box, get_bilingual_text
 )
+from utils.stress_aggregation import StressAggregate, stress_distribution
+from utils.camera_pipeline import FrameAnalysisWorker, LatestFrameCapture
+
+# Live camera analysis runs full face detection every N frames and tracks faces in between.
+# The interval counts consecutive analysed frames: when analysis falls behind and camera
+# frames are dropped, the tracker is reset and the next analysed frame is fully detected.
+LIVE_FACE_TRACK_INTERVAL = 5
+# Live video/metrics refresh rate; analysis runs as fast as it can on its own thread
+LIVE_DISPLAY_FPS = 10
 
 # Import enhanced systems
 try:
@@ -5275,12 +5284,11 @@ def facial_behavior_assessment():
                 # Remove only the broken average behavior score
                 avg_behavior_score = None
 
-                # Calculate stress levels with better logic
-                if stress_scores and len(stress_scores) > 0:
-                    high_stress_count = sum(1 for s in stress_scores if s > 0.55)
-                    severe_stress_count = sum(1 for s in stress_scores if s > 0.75)
-                    high_stress_ratio = (high_stress_count / len(stress_scores)) * 100
-                    severe_stress_ratio = (severe_stress_count / len(stress_scores)) * 100
+                # Calculate stress levels with better logic (one band count, reused for the chart below)
+                band_counts = stress_distribution(stress_scores) if stress_scores else None
+                if band_counts:
+                    high_stress_ratio = ((band_counts['high'] + band_counts['severe']) / len(stress_scores)) * 100
+                    severe_stress_ratio = (band_counts['severe'] / len(stress_scores)) * 100
                 else:
                     # Generate realistic demo stress data if no real data
                     high_stress_ratio = 33.2  # From your screenshot
@@ -5439,13 +5447,8 @@ def facial_behavior_assessment():
 
                 # Calculate stress distribution with proper fallbacks
                 stress_dist = None
-                if stress_scores and len(stress_scores) > 0:
-                    stress_dist = {
-                        'Low': sum(1 for s in stress_scores if s <= 0.35),
-                        'Moderate': sum(1 for s in stress_scores if 0.35 < s <= 0.55),
-                        'High': sum(1 for s in stress_scores if 0.55 < s <= 0.75),
-                        'Severe': sum(1 for s in stress_scores if s > 0.75)
-                    }
+                if band_counts:
+                    stress_dist = {band.title(): count for band, count in band_counts.items()}
                 else:
                     # Try to get from results summary
                     stress_dist = summary.get('stress_distribution', {})
@@ -5707,31 +5710,21 @@ def run_live_facial_stress_analysis(analyzer: EnhancedFacialBehaviorAnalyzer, du
             progress_bar = st.progress(0)
             status_text = st.empty()
 
-        # Initialize tracking variables
-        start_time = time.time()
-        frame_count = 0
+        # Initialize tracking variables (appended by the analysis thread only)
         frame_stress_scores = []
         frame_emotions = []
         frame_confidences = []
+        stress_sum = [0.0]
 
-        logger.info(f"🎬 Starting live facial stress analysis for {duration} seconds...")
+        face_tracker = analyzer.create_face_tracker(LIVE_FACE_TRACK_INTERVAL)
 
-        # Main analysis loop
-        while (time.time() - start_time) < duration:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            frame_count += 1
-            current_time = time.time() - start_time
-
-            # Analyze current frame
-            frame_result = analyzer.analyze_frame(frame)
+        def analyse(frame):
+            """Analyze one camera frame and record its stress score (analysis thread)"""
+            frame_result = analyzer.analyze_frame(frame, face_tracker)
 
             if "error" not in frame_result and frame_result.get("faces_detected", 0) > 0:
                 # Calculate frame stress score
                 frame_stress = calculate_frame_stress_score(frame_result, emotion_stress_weights)
-                frame_stress_scores.append(frame_stress)
 
                 # Store frame data
                 dominant_emotions = [e["dominant_emotion"] for e in frame_result.get("emotions", [])]
@@ -5739,37 +5732,66 @@ def run_live_facial_stress_analysis(analyzer: EnhancedFacialBehaviorAnalyzer, du
 
                 avg_confidence = sum(e["confidence"] for e in frame_result.get("emotions", [])) / len(frame_result.get("emotions", []))
                 frame_confidences.append(avg_confidence)
-
-                # Draw enhanced overlay with stress visualization
-                display_frame = draw_stress_overlay(frame, frame_result, frame_stress)
             else:
                 # No face detected - use neutral stress
-                frame_stress_scores.append(0.3)  # Neutral baseline
-                display_frame = draw_no_face_overlay(frame)
+                frame_stress = 0.3  # Neutral baseline
 
-            # Update live display
-            display_frame_rgb = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
-            camera_placeholder.image(display_frame_rgb, use_container_width=True)
+            frame_stress_scores.append(frame_stress)
+            stress_sum[0] += frame_stress
+            return frame_result, frame_stress
 
-            # Update real-time metrics in professional layout
-            if frame_stress_scores:
-                current_avg_stress = sum(frame_stress_scores) / len(frame_stress_scores)
-                current_stress_level = classify_stress_level(current_avg_stress)
+        logger.info(f"🎬 Starting live facial stress analysis for {duration} seconds...")
 
-                frame_metric.metric("Frame", frame_count)
-                stress_metric.metric("Stress Score", f"{current_avg_stress:.3f}")
-                level_metric.metric("Stress Level", current_stress_level.replace("😊 ", "").replace("😐 ", "").replace("😟 ", "").replace("🚨 ", ""))
-                faces_metric.metric("Faces Detected", frame_result.get("faces_detected", 0) if "error" not in frame_result else 0)
+        # Capture and analysis run on their own threads; this loop only refreshes the UI
+        start_time = time.time()
+        capture = LatestFrameCapture(cap)
+        # Template tracking only holds between consecutive frames, so re-detect after dropped frames
+        worker = FrameAnalysisWorker(capture, analyse, on_skip=lambda skipped: face_tracker.reset())
+        shown_seq = 0
 
-            # Update progress
-            progress = current_time / duration
-            progress_bar.progress(min(progress, 1.0))
-            status_text.text(f"Time: {current_time:.1f}s / {duration}s | Frames Processed: {frame_count}")
+        try:
+            while (time.time() - start_time) < duration and not worker.done:
+                current_time = time.time() - start_time
+                latest = worker.latest
 
-            # Small delay for smooth rendering
-            time.sleep(0.05)
+                if latest is not None and latest[0] != shown_seq:
+                    shown_seq, frame, (frame_result, frame_stress) = latest
 
-        cap.release()
+                    # Overlays are drawn only for frames that are actually displayed
+                    if "error" not in frame_result and frame_result.get("faces_detected", 0) > 0:
+                        display_frame = draw_stress_overlay(frame, frame_result, frame_stress)
+                    else:
+                        display_frame = draw_no_face_overlay(frame)
+
+                    # Update live display
+                    display_frame_rgb = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
+                    camera_placeholder.image(display_frame_rgb, use_container_width=True)
+
+                    # Update real-time metrics in professional layout
+                    current_avg_stress = stress_sum[0] / len(frame_stress_scores)
+                    current_stress_level = classify_stress_level(current_avg_stress)
+
+                    frame_metric.metric("Frame", worker.analysed)
+                    stress_metric.metric("Stress Score", f"{current_avg_stress:.3f}")
+                    level_metric.metric("Stress Level", current_stress_level.replace("😊 ", "").replace("😐 ", "").replace("😟 ", "").replace("🚨 ", ""))
+                    faces_metric.metric("Faces Detected", frame_result.get("faces_detected", 0) if "error" not in frame_result else 0)
+
+                # Update progress
+                progress = current_time / duration
+                progress_bar.progress(min(progress, 1.0))
+                pipeline = worker.stats()
+                status_text.text(f"Time: {current_time:.1f}s / {duration}s | Frames Processed: {pipeline['frames_analyzed']} "
+                                 f"| {pipeline['analysis_fps']:.1f} fps | Dropped: {pipeline['frames_dropped']}")
+
+                # Refresh the display at a fixed rate, independent of the analysis rate
+                time.sleep(1.0 / LIVE_DISPLAY_FPS)
+        finally:
+            worker.stop()
+            capture.stop()
+            cap.release()
+
+        pipeline_stats = worker.stats()
+        frame_count = pipeline_stats["frames_analyzed"]
 
         # Calculate final weighted stress analysis
         final_results = calculate_final_stress_analysis(
@@ -5784,7 +5806,12 @@ def run_live_facial_stress_analysis(analyzer: EnhancedFacialBehaviorAnalyzer, du
         # Restore logging level
         logging.getLogger('models.facial_behavior_analyzer').setLevel(old_level)
 
-        logger.info(f"✅ Live facial stress analysis completed: {frame_count} frames processed")
+        if "error" not in final_results:
+            final_results["pipeline_stats"] = pipeline_stats
+
+        logger.info(f"✅ Live facial stress analysis completed: {frame_count} frames processed "
+                    f"at {pipeline_stats['analysis_fps']} fps, {pipeline_stats['frames_dropped']} dropped "
+                    f"(face detection ratio {face_tracker.stats()['detection_ratio']})")
         return final_results
 
     except Exception as e:
@@ -5937,55 +5964,49 @@ def get_stress_color_bgr_enhanced(stress_score):
 
 def calculate_final_stress_analysis(stress_scores, emotions, confidences, frame_count, duration, analysis_type):
     """Calculate final weighted stress analysis results"""
+    aggregate = StressAggregate.from_lists(stress_scores, emotions, confidences, frame_count)
+    return finalize_stress_analysis(aggregate, duration, analysis_type)
+
+def finalize_stress_analysis(aggregate: StressAggregate, duration, analysis_type):
+    """Final weighted stress analysis of a session's per-frame results, summarized in one vectorized pass"""
+    stress_scores = aggregate.stress_scores
     if not stress_scores:
         return {"error": "No valid frames analyzed"}
 
-    # Calculate weighted average stress score
-    avg_stress_score = sum(stress_scores) / len(stress_scores)
+    # Average stress, band and emotion distributions, confidence and band ratios
+    stats = aggregate.summary()
+    avg_stress_score = stats['average_stress']
     final_stress_level = classify_stress_level(avg_stress_score)
-
-    # Calculate stress distribution
-    stress_distribution = {
-        'low': sum(1 for s in stress_scores if s <= 0.35),
-        'moderate': sum(1 for s in stress_scores if 0.35 < s <= 0.55),
-        'high': sum(1 for s in stress_scores if 0.55 < s <= 0.75),
-        'severe': sum(1 for s in stress_scores if s > 0.75)
-    }
-
-    # Calculate emotion distribution
-    emotion_counts = {}
-    for emotion in emotions:
-        emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-
-    # Calculate confidence metrics
-    avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    band_counts = stats['stress_distribution']
+    emotion_counts = stats['emotion_distribution']
+    avg_confidence = stats['average_confidence']
 
     # Generate recommendations based on stress level
     recommendations = generate_stress_recommendations(avg_stress_score, emotion_counts)
 
     # Determine overall assessment
-    severe_ratio = stress_distribution['severe'] / len(stress_scores)
-    high_ratio = stress_distribution['high'] / len(stress_scores)
+    severe_ratio = stats['severe_ratio']
+    high_ratio = stats['high_ratio']
 
     if severe_ratio > 0.3:
         overall_assessment = "severe_concern"
     elif high_ratio > 0.4:
         overall_assessment = "high_concern"
-    elif stress_distribution['moderate'] > stress_distribution['low']:
+    elif band_counts['moderate'] > band_counts['low']:
         overall_assessment = "moderate_concern"
     else:
         overall_assessment = "stable"
 
     return {
         "analysis_summary": {
-            "total_frames": frame_count,
+            "total_frames": aggregate.frame_count,
             "valid_frames": len(stress_scores),
             "duration": duration,
             "analysis_type": analysis_type,
             "average_stress_score": avg_stress_score,
             "final_stress_level": final_stress_level.replace("😊 ", "").replace("😐 ", "").replace("😟 ", "").replace("🚨 ", ""),
             "overall_assessment": overall_assessment,
-            "stress_distribution": stress_distribution,
+            "stress_distribution": band_counts,
             "emotion_distribution": emotion_counts,
             "average_confidence": avg_confidence,
             "severe_stress_ratio": severe_ratio,
@@ -5994,8 +6015,8 @@ def calculate_final_stress_analysis(stress_scores, emotions, confidences, frame_
         "recommendations": recommendations,
         "frame_analysis": {
             "stress_scores": stress_scores,
-            "emotions": emotions,
-            "confidences": confidences
+            "emotions": aggregate.emotions,
+            "confidences": aggregate.confidences
         }
     }
 
@@ -6352,14 +6373,7 @@ def generate_combined_report(emotion_results: List[Dict], cpu_results: List[Dict
             stress_scores.append(final_stress)
 
     # Calculate stress distribution
-    stress_distribution = {}
-    if stress_scores:
-        stress_distribution = {
-            'low': sum(1 for s in stress_scores if s <= 0.35),
-            'moderate': sum(1 for s in stress_scores if 0.35 < s <= 0.55),
-            'high': sum(1 for s in stress_scores if 0.55 < s <= 0.75),
-            'severe': sum(1 for s in stress_scores if s > 0.75)
-        }
+    band_counts = stress_distribution(stress_scores) if stress_scores else {}
 
     # Create comprehensive report with working scores
     report = {
@@ -6368,7 +6382,7 @@ def generate_combined_report(emotion_results: List[Dict], cpu_results: List[Dict
             'analysis_duration': f"{duration} seconds",
             'average_behavior_score': round(behavior_score * 100, 2),  # Convert to 0-100 scale
             'faces_detected_percentage': round(face_detection_rate, 1),
-            'stress_distribution': stress_distribution
+            'stress_distribution': band_counts
         },
         'mental_health_indicators': {
             'stress_detection_rate': round(mental_health_indicators['stress_level'] == 'high' and 80 or
@@ -4,16 +4,24 @@ Advanced Mental Health Analyzer using RoBERTa and AI4Indic models
 Similar to culture project implementation with local GPU models
 """
 
+import sys
 import logging
 import torch
 import numpy as np
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import re
 
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.text_analysis_cache import text_analysis_cache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ADVANCED_ANALYSIS_VERSION = "1"  # bump when indicator keywords or model analysis change (invalidates cached results)
+
 class AdvancedMentalHealthAnalyzer:
     """
     Advanced mental health analyzer using multiple local models
@@ -192,12 +200,22 @@ class AdvancedMentalHealthAnalyzer:
             # Combine all text responses
             combined_text = self._prepare_text_for_analysis(responses)
             
+            # The text analysis depends only on the combined text, so it is memoized;
+            # scores and recommendations below also use the responses and profile
             if self.is_initialized:
                 # Use advanced model analysis
-                analysis = self._advanced_model_analysis(combined_text, responses)
+                # Keyed by the models that actually loaded; results degraded by a model error are not cached
+                analysis = text_analysis_cache.get_or_compute(
+                    "advanced_analysis", f"{ADVANCED_ANALYSIS_VERSION}:models:{'+'.join(self._loaded_models())}",
+                    combined_text, lambda text: self._advanced_model_analysis(text, responses),
+                    cacheable=self._is_model_result
+                )
             else:
                 # Use enhanced rule-based analysis
-                analysis = self._enhanced_rule_based_analysis(combined_text, responses)
+                analysis = text_analysis_cache.get_or_compute(
+                    "advanced_analysis", f"{ADVANCED_ANALYSIS_VERSION}:rules", combined_text,
+                    lambda text: self._enhanced_rule_based_analysis(text, responses)
+                )
             
             # Calculate comprehensive scores
             overall_score = self._calculate_comprehensive_score(analysis, responses)
@@ -241,6 +259,25 @@ class AdvancedMentalHealthAnalyzer:
         
         return combined
     
+    def _loaded_models(self) -> List[str]:
+        """Names of the loaded models, as reported in available_models"""
+        loaded = []
+        if self.sentiment_model and self.sentiment_tokenizer:
+            loaded.append("sentiment")
+        if self.emotion_pipeline:
+            loaded.append("emotion")
+        if self.mental_health_pipeline:
+            loaded.append("mental_health")
+        if self.multilingual_pipeline:
+            loaded.append("multilingual")
+        return loaded
+    
+    def _is_model_result(self, analysis: Dict) -> bool:
+        """False when the analysis, or one of its model results, fell back after a model error"""
+        if analysis.get("fallback"):
+            return False
+        return not any(isinstance(result, dict) and result.get("fallback") for result in analysis.values())
+    
     def _advanced_model_analysis(self, text: str, responses: List[Dict]) -> Dict:
         """Advanced analysis using available AI models with fallback"""
         analysis = {}
@@ -294,7 +331,9 @@ class AdvancedMentalHealthAnalyzer:
 
         except Exception as e:
             logger.error(f"❌ Advanced model analysis failed: {e}")
-            return self._enhanced_rule_based_analysis(text, responses)
+            analysis = self._enhanced_rule_based_analysis(text, responses)
+            analysis["fallback"] = True
+            return analysis
 
         return analysis
     
@@ -340,7 +379,7 @@ class AdvancedMentalHealthAnalyzer:
 
         except Exception as e:
             logger.error(f"❌ GPU Sentiment analysis failed: {e}")
-            return {"label": "neutral", "scores": {"negative": 0.33, "neutral": 0.34, "positive": 0.33}, "confidence": 0.5}
+            return {"label": "neutral", "scores": {"negative": 0.33, "neutral": 0.34, "positive": 0.33}, "confidence": 0.5, "fallback": True}
     
     def _analyze_emotions(self, text: str) -> Dict:
         """Analyze emotions using GPU-accelerated emotion detection model"""
@@ -371,7 +410,7 @@ class AdvancedMentalHealthAnalyzer:
 
         except Exception as e:
             logger.error(f"❌ GPU Emotion analysis failed: {e}")
-            return {"dominant_emotion": "neutral", "all_emotions": {"neutral": 1.0}, "confidence": 0.5}
+            return {"dominant_emotion": "neutral", "all_emotions": {"neutral": 1.0}, "confidence": 0.5, "fallback": True}
     
     def _analyze_mental_health_specific(self, text: str) -> Dict:
         """Analyze using GPU-accelerated mental health specific model"""
@@ -399,7 +438,7 @@ class AdvancedMentalHealthAnalyzer:
 
         except Exception as e:
             logger.error(f"❌ GPU Mental health analysis failed: {e}")
-            return {"classification": "normal", "confidence": 0.5, "all_scores": {"normal": 0.5}}
+            return {"classification": "normal", "confidence": 0.5, "all_scores": {"normal": 0.5}, "fallback": True}
     
     def _analyze_language_patterns(self, text: str) -> Dict:
         """Analyze language patterns for Hinglish and cultural context"""
@@ -462,7 +501,7 @@ class AdvancedMentalHealthAnalyzer:
 
         except Exception as e:
             logger.error(f"❌ GPU Multilingual analysis failed: {e}")
-            return {"sentiment": "neutral", "confidence": 0.5, "all_scores": {"neutral": 0.5}}
+            return {"sentiment": "neutral", "confidence": 0.5, "all_scores": {"neutral": 0.5}, "fallback": True}
     
     def _calculate_model_confidence(self, sentiment: Dict, emotion: Dict, mental_health: Dict) -> float:
         """Calculate overall confidence from multiple models"""
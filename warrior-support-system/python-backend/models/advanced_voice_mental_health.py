@@ -8,30 +8,65 @@ import librosa
 import torch
 from typing import Dict, List, Tuple, Optional
 import warnings
+import sys
+from pathlib import Path
 warnings.filterwarnings('ignore')
 
-# Try to import transformers, handle gracefully if not available
-try:
-    from transformers import Wav2Vec2Processor, Wav2Vec2Model
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.voice_segmentation import segment_pauses
+from utils.pitch_tracking import PITCH_BACKENDS, SPEECH_FMIN, SPEECH_FMAX, track_pitch
+from utils.running_stats import RunningMoments
+from utils.feature_cache import VoiceFeatureCache, audio_content_hash
+from models.wav2vec_backbone import TRANSFORMERS_AVAILABLE, Wav2VecBackbone
+
+if not TRANSFORMERS_AVAILABLE:
     print("⚠️ Transformers not available - deep learning features disabled")
 
+WAV2VEC_FRAME_STRIDE = 320  # samples per Wav2Vec2 output frame at 16 kHz (20 ms)
+
+# Bump whenever feature definitions change so cached features are recomputed
+FEATURE_EXTRACTOR_VERSION = "1"
+
 class AdvancedVoiceMentalHealthAnalyzer:
     """
     Advanced voice analyzer for mental health assessment
     Integrates with existing SOLDIER SUPPORT SYSTEM
     """
     
-    def __init__(self, device: str = 'auto'):
-        """Initialize the voice analyzer with GPU support if available"""
+    def __init__(self, device: str = 'auto', pitch_backend: str = 'pyin',
+                 wav2vec_window_seconds: float = 20.0, wav2vec_context_seconds: float = 0.5,
+                 wav2vec_backbone: str = 'xlsr-large', wav2vec_runtime: str = 'torch',
+                 feature_cache: Optional[VoiceFeatureCache] = None):
+        """
+        Initialize the voice analyzer with GPU support if available
+        
+        Args:
+            device: 'auto', 'cpu' or 'cuda'
+            pitch_backend: F0 tracker for prosodic features - 'pyin' (most accurate),
+                'yin' or 'autocorr' (fast, restricted to the speech range)
+            wav2vec_window_seconds: Clips longer than this run through Wav2Vec2 in
+                windows of this size, capping memory for long recordings
+            wav2vec_context_seconds: Overlap on each side of a window
+            wav2vec_backbone: 'xlsr-large' (wav2vec2-large-xlsr-53) or 'base' (wav2vec2-base)
+            wav2vec_runtime: 'torch', 'int8' (dynamic quantization) or 'onnx' (ONNX Runtime)
+            feature_cache: Persistent cache consulted by analyze_audio_array
+        """
+        if pitch_backend not in PITCH_BACKENDS:
+            raise ValueError(f"Unknown pitch backend '{pitch_backend}', expected one of {PITCH_BACKENDS}")
+        self.pitch_backend = pitch_backend
+        self.wav2vec_window_samples = int(wav2vec_window_seconds * 16000)
+        self.wav2vec_context_seconds = wav2vec_context_seconds
+        self.wav2vec_backbone_name = wav2vec_backbone
+        self.wav2vec_runtime = wav2vec_runtime
+        self.feature_cache = feature_cache
+        
         if device == 'auto':
             self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         else:
             self.device = torch.device(device)
             
-        print(f"🎯 Advanced Voice Analyzer initialized on: {self.device}")
+        print(f"🎯 Advanced Voice Analyzer initialized on: {self.device} (pitch backend: {self.pitch_backend})")
         
         # Load pre-trained models
         self._load_models()
@@ -51,31 +86,53 @@ class AdvancedVoiceMentalHealthAnalyzer:
         
     def _load_models(self):
         """Load pre-trained models for feature extraction"""
+        self.wav2vec_backbone = None
+        self.wav2vec_processor = None
+        self.wav2vec_model = None
+        
         if not TRANSFORMERS_AVAILABLE:
-            self.wav2vec_processor = None
-            self.wav2vec_model = None
             return
             
         try:
             # Load Wav2Vec2 for deep audio features
-            model_name = "facebook/wav2vec2-large-xlsr-53"
-            self.wav2vec_processor = Wav2Vec2Processor.from_pretrained(model_name)
-            self.wav2vec_model = Wav2Vec2Model.from_pretrained(model_name).to(self.device)
-            self.wav2vec_model.eval()
-            print("✅ Wav2Vec2 model loaded successfully")
+            self.wav2vec_backbone = Wav2VecBackbone(
+                self.wav2vec_backbone_name, self.wav2vec_runtime, self.device
+            ).load()
+            self.wav2vec_processor = self.wav2vec_backbone.feature_extractor
+            self.wav2vec_model = self.wav2vec_backbone.model
+            print(f"✅ Wav2Vec2 model loaded successfully ({self.wav2vec_backbone_name}, {self.wav2vec_runtime})")
             
         except Exception as e:
             print(f"⚠️ Error loading Wav2Vec2: {e}")
-            self.wav2vec_processor = None
-            self.wav2vec_model = None
+            self.wav2vec_backbone = None
+    
+    def compute_frame_cache(self, audio: np.ndarray, sr: int) -> Dict[str, np.ndarray]:
+        """
+        Compute the magnitude spectrogram and frame energies once per clip
+        
+        Every spectral descriptor (MFCC, centroid, rolloff) is derived from the
+        same STFT and every energy-based feature (shimmer, pauses, voicing)
+        from the same RMS track, with librosa's default framing so the values
+        match the per-feature librosa calls they replace.
+        """
+        magnitude = np.abs(librosa.stft(audio, n_fft=self.frame_length, hop_length=self.hop_length))
+        rms = librosa.feature.rms(y=audio, frame_length=self.frame_length, hop_length=self.hop_length)[0]
+        return {'magnitude': magnitude, 'rms': rms}
     
-    def extract_prosodic_features(self, audio: np.ndarray, sr: int) -> Dict[str, float]:
+    def extract_prosodic_features(self, audio: np.ndarray, sr: int,
+                                  cache: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, float]:
         """Extract prosodic features (pitch, rhythm, stress patterns)"""
         features = {}
+        rms = cache['rms'] if cache else None
         
         # Fundamental frequency (F0) analysis
-        f0, voiced_flag, voiced_probs = librosa.pyin(
-            audio, fmin=librosa.note_to_hz('C2'), fmax=librosa.note_to_hz('C7')
+        if self.pitch_backend == 'pyin':
+            fmin, fmax = librosa.note_to_hz('C2'), librosa.note_to_hz('C7')
+        else:
+            fmin, fmax = SPEECH_FMIN, SPEECH_FMAX
+        f0, voiced_flag = track_pitch(
+            audio, sr, backend=self.pitch_backend, fmin=fmin, fmax=fmax,
+            frame_length=self.frame_length, hop_length=self.hop_length, rms=rms
         )
         
         # Remove NaN values
@@ -98,7 +155,8 @@ class AdvancedVoiceMentalHealthAnalyzer:
             f0_diff = np.diff(f0_clean)
             features['jitter'] = np.mean(np.abs(f0_diff)) / np.mean(f0_clean) if np.mean(f0_clean) > 0 else 0
             
-            rms = librosa.feature.rms(y=audio, frame_length=self.frame_length, hop_length=self.hop_length)[0]
+            if rms is None:
+                rms = librosa.feature.rms(y=audio, frame_length=self.frame_length, hop_length=self.hop_length)[0]
             rms_clean = rms[rms > 0]
             if len(rms_clean) > 1:
                 rms_diff = np.diff(rms_clean)
@@ -111,20 +169,27 @@ class AdvancedVoiceMentalHealthAnalyzer:
             
         return features
     
-    def extract_spectral_features(self, audio: np.ndarray, sr: int) -> Dict[str, float]:
+    def extract_spectral_features(self, audio: np.ndarray, sr: int,
+                                  cache: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, float]:
         """Extract spectral features (timbre, voice quality)"""
         features = {}
+        if cache is None:
+            cache = self.compute_frame_cache(audio, sr)
+        magnitude = cache['magnitude']
         
-        # MFCCs (first 5 for efficiency)
-        mfccs = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=5)
+        # MFCCs (first 5 for efficiency), from the shared power spectrogram
+        mel = librosa.feature.melspectrogram(S=magnitude ** 2, sr=sr)
+        mfccs = librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=5)
         for i in range(5):
             features[f'mfcc_{i}_mean'] = np.mean(mfccs[i])
             features[f'mfcc_{i}_std'] = np.std(mfccs[i])
         
         # Spectral features
-        spectral_centroids = librosa.feature.spectral_centroid(y=audio, sr=sr)[0]
-        spectral_rolloff = librosa.feature.spectral_rolloff(y=audio, sr=sr)[0]
-        zero_crossing_rate = librosa.feature.zero_crossing_rate(audio)[0]
+        spectral_centroids = librosa.feature.spectral_centroid(S=magnitude, sr=sr)[0]
+        spectral_rolloff = librosa.feature.spectral_rolloff(S=magnitude, sr=sr)[0]
+        zero_crossing_rate = librosa.feature.zero_crossing_rate(
+            audio, frame_length=self.frame_length, hop_length=self.hop_length
+        )[0]
         
         features.update({
             'spectral_centroid_mean': np.mean(spectral_centroids),
@@ -134,51 +199,35 @@ class AdvancedVoiceMentalHealthAnalyzer:
         
         return features
     
-    def extract_temporal_features(self, audio: np.ndarray, sr: int) -> Dict[str, float]:
+    def extract_temporal_features(self, audio: np.ndarray, sr: int,
+                                  cache: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, float]:
         """Extract temporal features (rhythm, pauses, speaking rate)"""
         features = {}
         
         # Energy-based features
-        rms = librosa.feature.rms(y=audio, frame_length=self.frame_length, hop_length=self.hop_length)[0]
+        if cache is not None:
+            rms = cache['rms']
+        else:
+            rms = librosa.feature.rms(y=audio, frame_length=self.frame_length, hop_length=self.hop_length)[0]
         features.update({
             'rms_mean': np.mean(rms),
             'rms_std': np.std(rms)
         })
         
-        # Pause detection
-        energy_threshold = np.mean(rms) * 0.1
-        silent_frames = rms < energy_threshold
-        
-        # Calculate pause statistics
-        pause_segments = []
-        in_pause = False
-        pause_start = 0
-        
-        for i, is_silent in enumerate(silent_frames):
-            if is_silent and not in_pause:
-                in_pause = True
-                pause_start = i
-            elif not is_silent and in_pause:
-                in_pause = False
-                pause_length = (i - pause_start) * self.hop_length / sr
-                if pause_length > 0.1:  # Only count pauses longer than 100ms
-                    pause_segments.append(pause_length)
-        
-        if pause_segments:
-            features.update({
-                'num_pauses': len(pause_segments),
-                'mean_pause_duration': np.mean(pause_segments),
-                'pause_rate': len(pause_segments) / (len(audio) / sr)
-            })
-        else:
-            features.update({
-                'num_pauses': 0, 'mean_pause_duration': 0, 'pause_rate': 0
-            })
+        # Pause detection (vectorized run-length segmentation of silent frames)
+        pause_stats = segment_pauses(
+            rms, sr, self.hop_length, len(audio),
+            min_pause_duration=0.1,  # Only count pauses longer than 100ms
+            include_trailing=False
+        )
+        features.update({
+            'num_pauses': pause_stats['num_pauses'],
+            'mean_pause_duration': pause_stats['mean_pause_duration'],
+            'pause_rate': pause_stats['pause_rate']
+        })
         
         # Speaking rate approximation
-        total_pause_time = sum(pause_segments) if pause_segments else 0
-        speaking_time = (len(audio) / sr) - total_pause_time
-        features['speaking_rate'] = speaking_time / (len(audio) / sr) if len(audio) > 0 else 0
+        features['speaking_rate'] = pause_stats['speaking_rate']
         
         return features
     
@@ -186,7 +235,7 @@ class AdvancedVoiceMentalHealthAnalyzer:
         """Extract deep learning features using Wav2Vec2"""
         features = {}
         
-        if self.wav2vec_model is None:
+        if self.wav2vec_backbone is None:
             return features
         
         try:
@@ -194,17 +243,9 @@ class AdvancedVoiceMentalHealthAnalyzer:
             if sr != 16000:
                 audio = librosa.resample(audio, orig_sr=sr, target_sr=16000)
             
-            # Process audio
-            inputs = self.wav2vec_processor(
-                audio, sampling_rate=16000, return_tensors="pt", padding=True
-            )
-            
-            with torch.no_grad():
-                inputs = {k: v.to(self.device) for k, v in inputs.items()}
-                outputs = self.wav2vec_model(**inputs)
-                
-                # Extract features from last hidden state
-                hidden_states = outputs.last_hidden_state.cpu().numpy()[0]
+            if len(audio) <= self.wav2vec_window_samples:
+                # Short clip: single forward pass
+                hidden_states = self._wav2vec_hidden_states(audio)
                 
                 # Statistical features from hidden states
                 features.update({
@@ -213,12 +254,45 @@ class AdvancedVoiceMentalHealthAnalyzer:
                     'wav2vec_skewness': self._calculate_skewness(hidden_states),
                     'wav2vec_kurtosis': self._calculate_kurtosis(hidden_states)
                 })
+            else:
+                # Long clip: bounded-memory windows with running moments
+                features.update(self._stream_wav2vec_moments(audio).to_dict('wav2vec'))
 
         except Exception as e:
             print(f"⚠️ Error extracting Wav2Vec features: {e}")
             
         return features
     
+    def _wav2vec_hidden_states(self, audio: np.ndarray) -> np.ndarray:
+        """Last hidden state (frames x hidden size) for one 16 kHz segment"""
+        return self.wav2vec_backbone.hidden_states(audio)
+    
+    def _stream_wav2vec_moments(self, audio: np.ndarray) -> RunningMoments:
+        """
+        Run Wav2Vec2 over fixed-size overlapping windows of a long 16 kHz clip
+        
+        Each window is the core segment plus ``wav2vec_context_seconds`` of
+        audio on either side; hidden-state frames from the context margins are
+        dropped so every output frame is counted once. Peak memory depends on
+        the window size only, not on the clip length.
+        """
+        context = int(self.wav2vec_context_seconds * 16000)
+        core = max(WAV2VEC_FRAME_STRIDE, self.wav2vec_window_samples - 2 * context)
+        moments = RunningMoments()
+        
+        for start in range(0, len(audio), core):
+            end = min(start + core, len(audio))
+            window_start = max(0, start - context)
+            window_end = min(len(audio), end + context)
+            
+            hidden_states = self._wav2vec_hidden_states(audio[window_start:window_end])
+            
+            first = (start - window_start) // WAV2VEC_FRAME_STRIDE
+            last = (end - window_start) // WAV2VEC_FRAME_STRIDE if end < len(audio) else len(hidden_states)
+            moments.update(hidden_states[first:last])
+        
+        return moments
+    
     def _calculate_skewness(self, data: np.ndarray) -> float:
         """Calculate skewness of data"""
         mean = np.mean(data)
@@ -235,8 +309,26 @@ class AdvancedVoiceMentalHealthAnalyzer:
             return 0
         return np.mean(((data - mean) / std) ** 4) - 3
     
-    def analyze_audio_array(self, audio: np.ndarray, sr: int) -> Dict[str, float]:
-        """Complete audio analysis pipeline"""
+    @property
+    def extractor_version(self) -> str:
+        """Identifies everything that changes feature values, used in feature cache keys"""
+        if self.wav2vec_backbone is not None:
+            wav2vec = (f"{self.wav2vec_backbone_name}-{self.wav2vec_runtime}"
+                       f"-w{self.wav2vec_window_samples}-c{self.wav2vec_context_seconds}")
+        else:
+            wav2vec = "no-wav2vec"
+        return f"v{FEATURE_EXTRACTOR_VERSION}|{self.pitch_backend}|{wav2vec}"
+    
+    def analyze_audio_array(self, audio: np.ndarray, sr: int, use_cache: bool = True) -> Dict[str, float]:
+        """Complete audio analysis pipeline, served from the feature cache when possible"""
+        audio_hash = None
+        if use_cache and self.feature_cache is not None:
+            audio_hash = audio_content_hash(audio, sr)
+            cached = self.feature_cache.get(audio_hash, self.extractor_version)
+            if cached is not None:
+                print(f"⚡ Voice features served from cache ({len(cached)} features)")
+                return cached
+        
         try:
             # Normalize audio
             audio = librosa.util.normalize(audio)
@@ -246,16 +338,19 @@ class AdvancedVoiceMentalHealthAnalyzer:
             # Extract all feature types
             all_features = {}
             
+            # One STFT and one RMS pass shared by all hand-crafted feature groups
+            cache = self.compute_frame_cache(audio, sr)
+            
             # Prosodic features
-            prosodic_features = self.extract_prosodic_features(audio, sr)
+            prosodic_features = self.extract_prosodic_features(audio, sr, cache)
             all_features.update(prosodic_features)
             
             # Spectral features
-            spectral_features = self.extract_spectral_features(audio, sr)
+            spectral_features = self.extract_spectral_features(audio, sr, cache)
             all_features.update(spectral_features)
             
             # Temporal features
-            temporal_features = self.extract_temporal_features(audio, sr)
+            temporal_features = self.extract_temporal_features(audio, sr, cache)
             all_features.update(temporal_features)
             
             # Deep learning features
@@ -263,6 +358,14 @@ class AdvancedVoiceMentalHealthAnalyzer:
             all_features.update(wav2vec_features)
             
             print(f"✅ Extracted {len(all_features)} features")
+            
+            # extract_wav2vec_features swallows runtime errors; never cache a result missing a
+            # feature group under a version that says the group was extracted
+            feature_groups = [prosodic_features, spectral_features, temporal_features]
+            if self.wav2vec_backbone is not None:
+                feature_groups.append(wav2vec_features)
+            if audio_hash is not None and all(feature_groups):
+                self.feature_cache.put(audio_hash, self.extractor_version, all_features)
             return all_features
             
         except Exception as e:
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Batched Whisper Transcription for bulk re-processing of stored recordings
+Re-transcribes a directory or manifest of clips with length-grouped log-mel
+batches and streams JSONL results with resume-from-checkpoint support
+
+Usage:
+    python -m models.batch_transcriber recordings/ -o transcripts.jsonl
+    python -m models.batch_transcriber manifest.jsonl -o transcripts.jsonl --batch-size 16
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from models.enhanced_voice_processor import EnhancedVoiceProcessor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+try:
+    import torch
+    import whisper
+    WHISPER_AVAILABLE = True
+except ImportError:
+    WHISPER_AVAILABLE = False
+    logger.warning("⚠️ PyTorch/Whisper not available. Install with: pip install torch openai-whisper")
+
+AUDIO_EXTENSIONS = {".wav", ".webm", ".mp3", ".m4a", ".ogg", ".flac", ".mp4"}
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 30  # Whisper's fixed encoder window
+
+
+class BatchWhisperTranscriber:
+    """
+    Batch transcription engine on top of EnhancedVoiceProcessor's Whisper model
+
+    Clips up to 30 s are padded into one log-mel batch and decoded together;
+    clips are sorted by duration first so each batch finishes decoding at a
+    similar step. Longer clips fall back to Whisper's sliding-window
+    ``transcribe``. Hinglish post-processing is the processor's own
+    ``_process_hinglish_text`` so results match the live endpoint.
+    """
+
+    def __init__(self, processor: Optional[EnhancedVoiceProcessor] = None,
+                 batch_size: int = 8, num_workers: int = 4,
+                 num_threads: Optional[int] = None, language: str = "hi"):
+        """
+        Args:
+            processor: Existing voice processor to reuse (loads a new one if None)
+            batch_size: Clips per Whisper decode call
+            num_workers: Threads for audio decoding and log-mel extraction
+            num_threads: torch intra-op threads for CPU inference (default: torch's choice)
+            language: Language hint ("hi", "en" or "auto")
+        """
+        if not WHISPER_AVAILABLE:
+            raise RuntimeError("Whisper is not installed")
+
+        self.processor = processor or EnhancedVoiceProcessor()
+        if not self.processor.is_initialized:
+            raise RuntimeError("Voice processor failed to initialize Whisper")
+
+        self.model = self.processor.whisper_model
+        self.device = self.processor.device
+        self.batch_size = max(1, batch_size)
+        self.num_workers = max(1, num_workers)
+        self.language = None if language == "auto" else language
+
+        if num_threads and self.device == "cpu":
+            torch.set_num_threads(num_threads)
+
+        self.decoding_options = whisper.DecodingOptions(
+            task="transcribe",
+            language=self.language,
+            fp16=self.device == "cuda",
+            without_timestamps=True
+        )
+
+        logger.info(f"✅ Batch transcriber ready on {self.device} (batch size: {self.batch_size}, workers: {self.num_workers})")
+
+    def _load_clip(self, item: Dict) -> Dict:
+        """Decode one clip to 16 kHz float32 and compute its log-mel if it fits one window"""
+        clip = dict(item)
+        try:
+            audio = whisper.load_audio(item["path"], sr=SAMPLE_RATE)
+            clip["duration"] = round(len(audio) / SAMPLE_RATE, 3)
+
+            if len(audio) <= CHUNK_SECONDS * SAMPLE_RATE:
+                clip["mel"] = whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(audio), self.model.dims.n_mels
+                )
+            else:
+                # Only long clips keep the waveform for sliding-window transcription
+                clip["audio"] = audio
+        except Exception as e:
+            clip["error"] = f"decode failed: {e}"
+        return clip
+
+    def _make_record(self, clip: Dict, text: str, language: str, confidence: float, mode: str) -> Dict:
+        text = text.strip()
+        return {
+            "id": clip["id"],
+            "path": clip["path"],
+            "duration": clip["duration"],
+            "transcription": self.processor._process_hinglish_text(text, language),
+            "original_text": text,
+            "detected_language": language,
+            "confidence": confidence,
+            "mode": mode
+        }
+
+    def _error_record(self, clip: Dict, error: str) -> Dict:
+        return {"id": clip["id"], "path": clip["path"], "error": error}
+
+    def transcribe_short_batch(self, clips: List[Dict]) -> List[Dict]:
+        """Decode up to ``batch_size`` clips (<= 30 s each) in one Whisper call"""
+        mel = torch.stack([clip["mel"] for clip in clips]).to(self.model.device)
+
+        with torch.no_grad():
+            results = whisper.decode(self.model, mel, self.decoding_options)
+
+        return [
+            self._make_record(clip, result.text, result.language, float(result.avg_logprob), "batched")
+            for clip, result in zip(clips, results)
+        ]
+
+    def transcribe_long_clip(self, clip: Dict) -> Dict:
+        """Sliding-window transcription for clips longer than one Whisper window"""
+        result = self.model.transcribe(
+            clip["audio"],
+            language=self.language,
+            task="transcribe",
+            fp16=self.device == "cuda",
+            verbose=None
+        )
+        segments = result.get("segments") or []
+        confidence = float(np.mean([s.get("avg_logprob", 0) for s in segments])) if segments else 0.0
+        return self._make_record(clip, result.get("text", ""), result.get("language", "unknown"), confidence, "long_form")
+
+    def transcribe_items(self, items: Iterable[Dict], window: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Transcribe manifest items, yielding one record per clip
+
+        Items are consumed in windows of ``window`` clips (default 8 batches):
+        each window is decoded in parallel, sorted by duration and split into
+        batches, so memory stays bounded for arbitrarily large archives.
+        """
+        window = window or self.batch_size * 8
+        pending: List[Dict] = []
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            for item in items:
+                pending.append(item)
+                if len(pending) >= window:
+                    yield from self._transcribe_window(pool, pending)
+                    pending = []
+
+            if pending:
+                yield from self._transcribe_window(pool, pending)
+
+    def _transcribe_window(self, pool: ThreadPoolExecutor, items: List[Dict]) -> Iterator[Dict]:
+        clips = list(pool.map(self._load_clip, items))
+
+        short_clips = []
+        for clip in clips:
+            if "error" in clip:
+                yield self._error_record(clip, clip["error"])
+            elif "mel" in clip:
+                short_clips.append(clip)
+            else:
+                try:
+                    yield self.transcribe_long_clip(clip)
+                except Exception as e:
+                    yield self._error_record(clip, f"transcription failed: {e}")
+
+        # Group similar lengths so each batch's decoder loop ends at about the same step
+        short_clips.sort(key=lambda c: c["duration"])
+        for start in range(0, len(short_clips), self.batch_size):
+            batch = short_clips[start:start + self.batch_size]
+            try:
+                yield from self.transcribe_short_batch(batch)
+            except Exception as e:
+                logger.error(f"❌ Batch transcription failed, retrying clips one by one: {e}")
+                for clip in batch:
+                    try:
+                        yield from self.transcribe_short_batch([clip])
+                    except Exception as clip_error:
+                        yield self._error_record(clip, f"transcription failed: {clip_error}")
+
+    def run(self, source: str, output_path: str, resume: bool = True) -> Dict:
+        """
+        Transcribe a directory or manifest, appending JSONL records to ``output_path``
+
+        The output file doubles as the checkpoint: on resume, clips that
+        already have a successful record are skipped and failed ones retried.
+        """
+        items = load_manifest(source)
+        done = read_checkpoint(output_path) if resume else set()
+        todo = [item for item in items if item["id"] not in done]
+
+        logger.info(f"🎧 {len(items)} clips found, {len(items) - len(todo)} already done, {len(todo)} to transcribe")
+
+        stats = {"total": len(items), "skipped": len(items) - len(todo), "transcribed": 0, "failed": 0}
+        start = time.time()
+        audio_seconds = 0.0
+
+        if resume:
+            truncate_partial_record(output_path)
+
+        mode = "a" if resume else "w"
+        with open(output_path, mode, encoding="utf-8") as out:
+            for record in self.transcribe_items(todo):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+
+                if "error" in record:
+                    stats["failed"] += 1
+                    logger.warning(f"⚠️ {record['path']}: {record['error']}")
+                else:
+                    stats["transcribed"] += 1
+                    audio_seconds += record.get("duration", 0)
+
+            os.fsync(out.fileno())
+
+        elapsed = time.time() - start
+        stats["elapsed_seconds"] = round(elapsed, 2)
+        stats["audio_seconds"] = round(audio_seconds, 2)
+        stats["real_time_factor"] = round(elapsed / audio_seconds, 3) if audio_seconds else 0.0
+
+        logger.info(f"✅ Batch transcription finished: {stats}")
+        return stats
+
+
+def load_manifest(source: str) -> List[Dict]:
+    """
+    Build the clip list from a directory (recursive) or a manifest file
+
+    Manifests are either JSONL with a ``path`` (and optional ``id``) per line
+    or a plain list of paths, one per line. Relative paths resolve against
+    the manifest's directory.
+    """
+    source_path = Path(source)
+    items = []
+
+    if source_path.is_dir():
+        for path in sorted(source_path.rglob("*")):
+            if path.suffix.lower() in AUDIO_EXTENSIONS:
+                items.append({"id": str(path.relative_to(source_path)), "path": str(path)})
+        return items
+
+    base_dir = source_path.parent
+    with open(source_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            if line.startswith("{"):
+                entry = json.loads(line)
+                path = entry["path"]
+                item_id = entry.get("id", path)
+            else:
+                path = item_id = line
+
+            if not os.path.isabs(path):
+                path = str(base_dir / path)
+            items.append({"id": str(item_id), "path": path})
+
+    return items
+
+
+def read_checkpoint(output_path: str) -> Set[str]:
+    """Return ids that already have a successful record in an existing JSONL output"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Partial last line from an interrupted run
+                continue
+            if "error" not in record:
+                done.add(record.get("id"))
+
+    return done
+
+
+def truncate_partial_record(output_path: str):
+    """Cut an interrupted run's unterminated last line so appended records start on a fresh line"""
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return
+
+    with open(output_path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        # Scan backwards in blocks for the last newline
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            block = f.read(end - start)
+            if end == size and block.endswith(b"\n"):
+                return
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        f.truncate(end)
+    logger.warning(f"⚠️ Dropped {size - end} bytes of a partial record at the end of {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch re-transcription of stored recordings with Whisper")
+    parser.add_argument("source", help="Directory of recordings or manifest file (JSONL or one path per line)")
+    parser.add_argument("-o", "--output", required=True, help="JSONL output file (also used as resume checkpoint)")
+    parser.add_argument("--batch-size", type=int, default=8, help="Clips per Whisper decode call")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Threads for audio decoding and log-mel extraction")
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads for inference")
+    parser.add_argument("--language", default="hi", help="Language hint: hi, en or auto")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite output instead of resuming")
+    args = parser.parse_args()
+
+    transcriber = BatchWhisperTranscriber(
+        batch_size=args.batch_size,
+        num_workers=args.workers,
+        num_threads=args.threads,
+        language=args.language
+    )
+    stats = transcriber.run(args.source, args.output, resume=not args.no_resume)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+EmotionCNN: the PyTorch facial emotion classifier of EnhancedFacialBehaviorAnalyzer
+Kept in its own module so the ONNX Runtime backends never import torch
+"""
+
+import torch
+import torch.nn as nn
+
+
+class EmotionCNN(nn.Module):
+    """
+    Convolutional Neural Network for Facial Emotion Recognition
+    Lightweight model for real-time emotion classification
+    """
+
+    def __init__(self, num_classes=7):
+        super(EmotionCNN, self).__init__()
+
+        # Convolutional layers
+        self.conv1 = nn.Conv2d(1, 32, kernel_size=3, padding=1)
+        self.conv2 = nn.Conv2d(32, 64, kernel_size=3, padding=1)
+        self.conv3 = nn.Conv2d(64, 128, kernel_size=3, padding=1)
+
+        # Pooling and dropout
+        self.pool = nn.MaxPool2d(2, 2)
+        self.dropout = nn.Dropout(0.5)
+
+        # Fully connected layers
+        self.fc1 = nn.Linear(128 * 6 * 6, 512)
+        self.fc2 = nn.Linear(512, num_classes)
+
+        # Activation
+        self.relu = nn.ReLU()
+        self.softmax = nn.Softmax(dim=1)
+
+    def forward(self, x):
+        # Convolutional layers with pooling
+        x = self.pool(self.relu(self.conv1(x)))
+        x = self.pool(self.relu(self.conv2(x)))
+        x = self.pool(self.relu(self.conv3(x)))
+
+        # Flatten for fully connected layers
+        x = x.view(-1, 128 * 6 * 6)
+
+        # Fully connected layers
+        x = self.relu(self.fc1(x))
+        x = self.dropout(x)
+        x = self.fc2(x)
+
+        return self.softmax(x)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+ONNX Runtime backends for the facial analyzer's EmotionCNN
+Exports the PyTorch weights to ONNX once, optionally quantizes them to static
+int8 with face-crop calibration, and runs them without importing torch
+"""
+
+import logging
+import numpy as np
+from pathlib import Path
+from typing import List, Optional
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+EMOTION_INPUT_SIZE = (48, 48)  # FER2013 crop size expected by EmotionCNN
+EMOTION_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+EMOTION_WEIGHTS_DIR = Path(__file__).parent / "weights"
+EMOTION_WEIGHTS_PATH = EMOTION_WEIGHTS_DIR / "emotion_model.pth"
+EMOTION_ONNX_PATHS = {
+    "onnx": EMOTION_WEIGHTS_DIR / "emotion_model.onnx",
+    "onnx-int8": EMOTION_WEIGHTS_DIR / "emotion_model.int8.onnx"
+}
+
+
+def preprocess_faces(face_rois: List[np.ndarray]) -> np.ndarray:
+    """
+    Stack grayscale face crops into one normalized float32 NCHW batch
+
+    Same normalization as the original torchvision transform (48x48, [0, 1],
+    mean/std 0.5), with cv2 area resampling instead of a PIL round trip per crop.
+    """
+    batch = np.stack([
+        cv2.resize(roi, EMOTION_INPUT_SIZE, interpolation=cv2.INTER_AREA) for roi in face_rois
+    ]).astype(np.float32)
+    batch = (batch / 255.0 - 0.5) / 0.5
+    return np.ascontiguousarray(batch[:, None])
+
+
+class OnnxEmotionModel:
+    """EmotionCNN as an ONNX Runtime CPU session: NCHW float32 faces in, softmax probabilities out"""
+
+    def __init__(self, onnx_path: Path, threads: Optional[int] = None):
+        if not ONNX_AVAILABLE:
+            raise RuntimeError("onnxruntime is not installed")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.path = Path(onnx_path)
+        self.session = ort.InferenceSession(str(self.path), options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, faces: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: faces})[0]
+
+
+def export_emotion_onnx(weights_path: Path = EMOTION_WEIGHTS_PATH,
+                        onnx_path: Path = EMOTION_ONNX_PATHS["onnx"]) -> Path:
+    """Export EmotionCNN weights to ONNX with a dynamic batch axis (needs torch, once)"""
+    import torch
+    from models.emotion_cnn import EmotionCNN
+
+    model = EmotionCNN(num_classes=7)
+    if Path(weights_path).exists():
+        model.load_state_dict(torch.load(weights_path, map_location="cpu"))
+    else:
+        logger.warning(f"⚠️ {weights_path} not found - exporting random weights")
+    model.eval()
+
+    onnx_path = Path(onnx_path)
+    onnx_path.parent.mkdir(parents=True, exist_ok=True)
+    logger.info(f"🔄 Exporting EmotionCNN to ONNX: {onnx_path}")
+
+    dummy = torch.zeros(1, 1, *EMOTION_INPUT_SIZE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model, (dummy,), str(onnx_path),
+            input_names=["faces"],
+            output_names=["probabilities"],
+            dynamic_axes={"faces": {0: "batch"}, "probabilities": {0: "batch"}},
+            opset_version=13
+        )
+    return onnx_path
+
+
+def quantize_emotion_onnx(calibration_faces: List[np.ndarray],
+                          onnx_path: Path = EMOTION_ONNX_PATHS["onnx"],
+                          int8_path: Path = EMOTION_ONNX_PATHS["onnx-int8"],
+                          batch_size: int = 32) -> Path:
+    """
+    Static int8 quantization of the exported ONNX model
+
+    Activation ranges are calibrated on ``calibration_faces`` (grayscale face
+    crops as the analyzer would see them), so they should come from real
+    recordings; a few hundred crops are enough.
+    """
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    if not calibration_faces:
+        raise ValueError("Static int8 quantization needs calibration face crops")
+
+    class FaceCalibrationReader(CalibrationDataReader):
+        def __init__(self):
+            self.batches = iter([
+                {"faces": preprocess_faces(calibration_faces[i:i + batch_size])}
+                for i in range(0, len(calibration_faces), batch_size)
+            ])
+
+        def get_next(self):
+            return next(self.batches, None)
+
+    logger.info(f"🔄 Quantizing {onnx_path} to static int8 on {len(calibration_faces)} faces: {int8_path}")
+    quantize_static(
+        str(onnx_path), str(int8_path), FaceCalibrationReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True
+    )
+    return Path(int8_path)
+
+
+def load_onnx_emotion_model(backend: str, threads: Optional[int] = None) -> OnnxEmotionModel:
+    """
+    ONNX Runtime EmotionCNN for the "onnx" or "onnx-int8" backend
+
+    The fp32 model is exported from the .pth weights on first use. The int8
+    model needs calibration data, so it must be produced beforehand with
+    scripts/export_emotion_model.py; without it the fp32 model is used.
+    """
+    onnx_path = EMOTION_ONNX_PATHS["onnx"]
+    if backend == "onnx-int8":
+        if EMOTION_ONNX_PATHS["onnx-int8"].exists():
+            return OnnxEmotionModel(EMOTION_ONNX_PATHS["onnx-int8"], threads)
+        logger.warning("⚠️ No int8 emotion model - run scripts/export_emotion_model.py --int8; using fp32 ONNX")
+
+    if not onnx_path.exists():
+        export_emotion_onnx(onnx_path=onnx_path)
+    return OnnxEmotionModel(onnx_path, threads)
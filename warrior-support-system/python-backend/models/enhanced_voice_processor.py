@@ -9,11 +9,17 @@ import logging
 import numpy as np
 import tempfile
 import os
-from typing import Dict, Optional, Tuple
+import io
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
 import threading
 import queue
 import time
 
+sys.path.append(str(Path(__file__).parent.parent))
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,6 +44,13 @@ except ImportError:
     AUDIO_AVAILABLE = False
     logger.warning("⚠️ Audio libraries not available. Install with: pip install sounddevice soundfile")
 
+try:
+    from utils.streaming_voice_features import StreamingVoiceFeatures
+    STREAMING_ANALYSIS_AVAILABLE = True
+except ImportError:
+    STREAMING_ANALYSIS_AVAILABLE = False
+    logger.warning("⚠️ librosa not available - incremental voice analysis disabled")
+
 class EnhancedVoiceProcessor:
     """
     Enhanced voice processor with GPU acceleration and Hinglish support
@@ -51,6 +64,13 @@ class EnhancedVoiceProcessor:
         self.recording = False
         self.audio_queue = queue.Queue()
         
+        # Incremental analysis state (start_recording(incremental=True))
+        self.streaming_features = None
+        self.score_fn = None
+        self.analysis_thread = None
+        self.recorded_chunks = []
+        self.last_analysis = None
+        
         # Audio settings
         self.sample_rate = 16000  # Whisper's preferred sample rate
         self.channels = 1
@@ -92,15 +112,37 @@ class EnhancedVoiceProcessor:
             logger.error(f"❌ Failed to initialize Whisper: {e}")
             self.is_initialized = False
     
-    def start_recording(self) -> bool:
-        """Start recording audio from microphone"""
+    def start_recording(self, incremental: bool = False,
+                        score_fn: Optional[Callable[[Dict], Dict]] = None) -> bool:
+        """
+        Start recording audio from microphone
+        
+        Args:
+            incremental: Analyse blocks as they arrive so get_partial_analysis()
+                works during recording and the final analysis is ready at stop
+            score_fn: Maps a feature dict to scores, e.g.
+                AdvancedVoiceMentalHealthAnalyzer.calculate_mental_health_scores
+        """
         if not AUDIO_AVAILABLE:
             logger.error("❌ Audio libraries not available")
             return False
         
+        if incremental and not STREAMING_ANALYSIS_AVAILABLE:
+            logger.warning("⚠️ Incremental analysis unavailable, recording without it")
+            incremental = False
+        
         try:
             self.recording = True
             self.audio_queue = queue.Queue()
+            self.recorded_chunks = []
+            self.last_analysis = None
+            self.streaming_features = StreamingVoiceFeatures(sr=self.sample_rate) if incremental else None
+            self.score_fn = score_fn
+            
+            if incremental:
+                self.analysis_thread = threading.Thread(target=self._analyse_stream)
+                self.analysis_thread.daemon = True
+                self.analysis_thread.start()
             
             # Start recording in a separate thread
             self.recording_thread = threading.Thread(target=self._record_audio)
@@ -127,6 +169,9 @@ class EnhancedVoiceProcessor:
             if hasattr(self, 'recording_thread'):
                 self.recording_thread.join(timeout=2.0)
             
+            if self.streaming_features is not None:
+                return self._stop_incremental_analysis()
+            
             # Collect all audio data
             audio_data = []
             while not self.audio_queue.empty():
@@ -149,6 +194,49 @@ class EnhancedVoiceProcessor:
             logger.error(f"❌ Error stopping recording: {e}")
             return None
     
+    def _analyse_stream(self):
+        """Background consumer: feed microphone blocks to the incremental analyzer"""
+        while True:
+            chunk = self.audio_queue.get()
+            if chunk is None:  # sentinel from stop_recording
+                break
+            self.recorded_chunks.append(chunk)
+            try:
+                self.streaming_features.push(chunk)
+            except Exception as e:
+                logger.error(f"❌ Incremental analysis error: {e}")
+    
+    def _stop_incremental_analysis(self) -> Optional[np.ndarray]:
+        """Drain the analysis thread, finalize features and return the recorded audio"""
+        self.audio_queue.put(None)
+        if self.analysis_thread is not None:
+            self.analysis_thread.join()
+        
+        self.streaming_features.finalize()
+        self.last_analysis = self.streaming_features.snapshot(self.score_fn)
+        
+        if not self.recorded_chunks:
+            logger.warning("⚠️ No audio data recorded")
+            return None
+        
+        full_audio = np.concatenate(self.recorded_chunks, axis=0)
+        logger.info(f"🎵 Recording stopped. Audio length: {len(full_audio)/self.sample_rate:.2f} seconds, "
+                    f"{len(self.last_analysis['features'])} features ready")
+        return full_audio
+    
+    def get_partial_analysis(self) -> Optional[Dict]:
+        """
+        Features (and scores, if a score_fn was given) for the audio received so far
+        
+        Returns the final analysis once recording has stopped, or None when
+        incremental analysis is not running.
+        """
+        if self.last_analysis is not None:
+            return self.last_analysis
+        if self.streaming_features is None:
+            return None
+        return self.streaming_features.snapshot(self.score_fn)
+    
     def _record_audio(self):
         """Internal method to record audio in background thread"""
         try:
@@ -173,12 +261,13 @@ class EnhancedVoiceProcessor:
             logger.error(f"❌ Recording thread error: {e}")
             self.recording = False
     
-    def transcribe_audio(self, temp_path, language_hint: str = "hi") -> Dict:
+    def transcribe_audio(self, temp_path: Union[str, np.ndarray], language_hint: str = "hi") -> Dict:
         """
         Transcribe audio to text with Hinglish support
         
         Args:
-            audio_data: Audio data as numpy array
+            temp_path: Path to an audio file (deleted after transcription) or
+                a mono 16 kHz float32 numpy array, passed to Whisper as-is
             language_hint: Language hint ("hi" for Hindi/Hinglish, "en" for English)
             
         Returns:
@@ -196,6 +285,10 @@ class EnhancedVoiceProcessor:
             # Transcribe with Whisper
             logger.info("🔄 Transcribing audio with Whisper...")
             
+            # Whisper accepts decoded 16 kHz float32 arrays directly (no ffmpeg pass)
+            if isinstance(temp_path, np.ndarray):
+                temp_path = temp_path.astype(np.float32, copy=False)
+            
             # Use language detection for better results
             result = self.whisper_model.transcribe(
                 temp_path,
@@ -206,7 +299,8 @@ class EnhancedVoiceProcessor:
             )
             
             # Clean up temporary file
-            os.unlink(temp_path)
+            if isinstance(temp_path, str):
+                os.unlink(temp_path)
             
             # Extract transcription
             transcribed_text = result.get("text", "").strip()
@@ -375,6 +469,55 @@ class EnhancedVoiceProcessor:
             return {"error": str(e)}
 
 # Utility functions
+def decode_audio_bytes(content: bytes, sample_rate: int = 16000) -> np.ndarray:
+    """
+    Decode an uploaded audio blob (webm, ogg, wav, ...) to mono float32 PCM in memory
+    
+    Pipes the bytes through a single ffmpeg pass (the same conversion Whisper's
+    loader uses) so no temp file is written. Falls back to soundfile for
+    formats libsndfile can read when ffmpeg is missing or fails.
+    
+    Args:
+        content: Raw bytes of the uploaded file
+        sample_rate: Target sample rate (Whisper and wav2vec2 expect 16 kHz)
+        
+    Returns:
+        1-D float32 array in [-1, 1] at ``sample_rate``
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate),
+        "-"
+    ]
+    
+    try:
+        out = subprocess.run(cmd, input=content, capture_output=True, check=True).stdout
+        audio = np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+        if len(audio) > 0:
+            return audio
+        logger.warning("⚠️ ffmpeg produced no samples, trying soundfile")
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.warning(f"⚠️ ffmpeg decode failed, trying soundfile: {e}")
+    
+    import soundfile as sf
+    audio, sr = sf.read(io.BytesIO(content), dtype="float32")
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    
+    if sr != sample_rate:
+        try:
+            import librosa
+            audio = librosa.resample(audio, orig_sr=sr, target_sr=sample_rate)
+        except ImportError:
+            audio = np.interp(
+                np.linspace(0, len(audio), int(len(audio) * sample_rate / sr)),
+                np.arange(len(audio)),
+                audio
+            )
+    
+    return audio.astype(np.float32, copy=False)
+
 def initialize_enhanced_voice_processor() -> EnhancedVoiceProcessor:
     """Initialize and return enhanced voice processor"""
     return EnhancedVoiceProcessor()
@@ -13,13 +13,20 @@ import time
 from datetime import datetime
 import json
 import math
-import torch
-import torch.nn as nn
-import torchvision.transforms as transforms
-from PIL import Image
 import os
+import sys
+import threading
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.detection_resolution import (
+    DEFAULT_DETECTION_WIDTH, downscale_for_detection, scale_detection_params, upscale_boxes
+)
+from models.emotion_runtime import (
+    EMOTION_BACKENDS, EMOTION_WEIGHTS_PATH, load_onnx_emotion_model, preprocess_faces
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,59 +45,68 @@ def suppress_logging():
     finally:
         logger.setLevel(old_level)
 
-class EmotionCNN(nn.Module):
-    """
-    Convolutional Neural Network for Facial Emotion Recognition
-    Lightweight model for real-time emotion classification
-    """
-
-    def __init__(self, num_classes=7):
-        super(EmotionCNN, self).__init__()
+EMOTION_BATCH_SIZE = 256  # face crops per forward pass
 
-        # Convolutional layers
-        self.conv1 = nn.Conv2d(1, 32, kernel_size=3, padding=1)
-        self.conv2 = nn.Conv2d(32, 64, kernel_size=3, padding=1)
-        self.conv3 = nn.Conv2d(64, 128, kernel_size=3, padding=1)
+# Haar cascade parameters of EnhancedFacialBehaviorAnalyzer (lenient, for varied webcam conditions)
+FACE_DETECTION_PARAMS = {
+    'scaleFactor': 1.05,   # More sensitive scaling
+    'minNeighbors': 3,     # Fewer neighbors required
+    'minSize': (20, 20),   # Smaller minimum size
+    'maxSize': (500, 500)  # Larger maximum size
+}
 
-        # Pooling and dropout
-        self.pool = nn.MaxPool2d(2, 2)
-        self.dropout = nn.Dropout(0.5)
-
-        # Fully connected layers
-        self.fc1 = nn.Linear(128 * 6 * 6, 512)
-        self.fc2 = nn.Linear(512, num_classes)
-
-        # Activation
-        self.relu = nn.ReLU()
-        self.softmax = nn.Softmax(dim=1)
-
-    def forward(self, x):
-        # Convolutional layers with pooling
-        x = self.pool(self.relu(self.conv1(x)))
-        x = self.pool(self.relu(self.conv2(x)))
-        x = self.pool(self.relu(self.conv3(x)))
+class FacialSessionState:
+    """
+    Per-session history of an EnhancedFacialBehaviorAnalyzer
 
-        # Flatten for fully connected layers
-        x = x.view(-1, 128 * 6 * 6)
+    Keeps one user's frame history apart from the shared, preloaded models
+    so a single analyzer can serve concurrent sessions.
+    """
 
-        # Fully connected layers
-        x = self.relu(self.fc1(x))
-        x = self.dropout(x)
-        x = self.fc2(x)
+    def __init__(self):
+        self.emotion_history = []
+        self.face_history = []
+        self.baseline_measurements = {}
 
-        return self.softmax(x)
+        # Frame analysis history for weighted averaging
+        self.frame_analysis_history = []
+        self.stress_factor_history = []
+        self.confidence_history = []
 
 
 class EnhancedFacialBehaviorAnalyzer:
     """
     Enhanced facial behavior analyzer with deep learning emotion recognition
     Combines OpenCV face detection with CNN-based emotion classification
+
+    The cascade and CNN are loaded once and may be shared across threads;
+    pass a FacialSessionState (create_session_state) per session to keep
+    histories apart. Without one, the analyzer's default state is used.
     """
 
-    def __init__(self, device="auto"):
-        """Initialize the enhanced facial behavior analyzer"""
+    def __init__(self, device="auto", detection_width: Optional[int] = DEFAULT_DETECTION_WIDTH,
+                 emotion_backend: str = "torch"):
+        """
+        Initialize the enhanced facial behavior analyzer
+
+        Args:
+            device: "auto", "cuda" or "cpu"
+            detection_width: Width frames are downscaled to for face detection
+                (None or 0, the default, detects at full resolution); faces
+                smaller than min_face_size at that scale are missed. Emotion
+                crops always come from the full-resolution frame
+            emotion_backend: EmotionCNN runtime - "torch" (eager PyTorch), "onnx"
+                or "onnx-int8" (ONNX Runtime on CPU, torch is never imported)
+        """
+        if emotion_backend not in EMOTION_BACKENDS:
+            raise ValueError(f"Unknown emotion backend '{emotion_backend}', expected one of {EMOTION_BACKENDS}")
+        self.emotion_backend = emotion_backend
+        self.detection_width = detection_width
         # Auto-detect best device
-        if device == "auto":
+        if emotion_backend != "torch":
+            self.device = "cpu"
+        elif device == "auto":
+            import torch
             if torch.cuda.is_available():
                 self.device = "cuda"
                 logger.info(f"🎮 GPU detected: {torch.cuda.get_device_name(0)}")
@@ -101,9 +117,7 @@ class EnhancedFacialBehaviorAnalyzer:
             self.device = device
 
         self.is_initialized = False
-        self.emotion_history = []
-        self.face_history = []
-        self.baseline_measurements = {}
+        self.default_state = FacialSessionState()
 
         # Emotion labels (FER2013 standard)
         self.emotion_labels = {
@@ -174,18 +188,31 @@ class EnhancedFacialBehaviorAnalyzer:
             'severe': 1.0       # 0.75 - 1.0
         }
 
-        # Frame analysis history for weighted averaging
-        self.frame_analysis_history = []
-        self.stress_factor_history = []
-        self.confidence_history = []
-
         # OpenCV components
         self.face_cascade = None
+        self._cascade_lock = threading.Lock()  # CascadeClassifier is not safe for concurrent detectMultiScale
         self.emotion_model = None
+        self.parallel_detector = None
 
         # Initialize components
         self._initialize_components()
 
+    @property
+    def emotion_history(self) -> List[Dict]:
+        return self.default_state.emotion_history
+
+    @property
+    def face_history(self) -> List:
+        return self.default_state.face_history
+
+    @property
+    def baseline_measurements(self) -> Dict:
+        return self.default_state.baseline_measurements
+
+    def create_session_state(self) -> FacialSessionState:
+        """Fresh per-session history for analyze_frame(s) and get_stress_analysis_summary"""
+        return FacialSessionState()
+
     def _initialize_components(self):
         """Initialize OpenCV and deep learning components"""
         try:
@@ -202,8 +229,12 @@ class EnhancedFacialBehaviorAnalyzer:
             # Initialize emotion recognition model
             self._initialize_emotion_model()
 
-            # Confirm GPU setup
-            if self.device == "cuda" and torch.cuda.is_available():
+            # Confirm GPU setup (only the torch backend ever selects cuda)
+            use_gpu = False
+            if self.device == "cuda":
+                import torch
+                use_gpu = torch.cuda.is_available()
+            if use_gpu:
                 torch.cuda.empty_cache()  # Clear GPU memory
                 gpu_memory = torch.cuda.get_device_properties(0).total_memory / (1024**3)
                 logger.info(f"🎮 Using GPU: {torch.cuda.get_device_name(0)} ({gpu_memory:.1f}GB)")
@@ -222,11 +253,19 @@ class EnhancedFacialBehaviorAnalyzer:
     def _initialize_emotion_model(self):
         """Initialize or load emotion recognition model"""
         try:
+            if self.emotion_backend != "torch":
+                self.emotion_model = load_onnx_emotion_model(self.emotion_backend)
+                logger.info(f"✅ Emotion model loaded with ONNX Runtime ({self.emotion_model.path.name})")
+                return True
+
+            import torch
+            from models.emotion_cnn import EmotionCNN
+
             # Create model
             self.emotion_model = EmotionCNN(num_classes=7)
 
             # Try to load pre-trained weights
-            model_path = Path(__file__).parent / "weights" / "emotion_model.pth"
+            model_path = EMOTION_WEIGHTS_PATH
 
             if model_path.exists():
                 logger.info("📦 Loading pre-trained emotion model...")
@@ -240,14 +279,6 @@ class EnhancedFacialBehaviorAnalyzer:
             self.emotion_model.to(self.device)
             self.emotion_model.eval()
 
-            # Image preprocessing
-            self.transform = transforms.Compose([
-                transforms.Grayscale(),
-                transforms.Resize((48, 48)),
-                transforms.ToTensor(),
-                transforms.Normalize(mean=[0.5], std=[0.5])
-            ])
-
             return True
 
         except Exception as e:
@@ -255,118 +286,232 @@ class EnhancedFacialBehaviorAnalyzer:
             self.emotion_model = None
             return False
 
-    def analyze_frame(self, frame: np.ndarray) -> Dict:
+    def detect_faces(self, gray: np.ndarray) -> np.ndarray:
+        """Haar cascade face boxes (x, y, w, h) on a grayscale frame, in its full-resolution coordinates"""
+        small, scale = downscale_for_detection(gray, self.detection_width)
+        # Detect faces with more lenient parameters
+        with self._cascade_lock:
+            faces = self.face_cascade.detectMultiScale(small, **scale_detection_params(FACE_DETECTION_PARAMS, scale))
+        return upscale_boxes(faces, scale, gray.shape)
+
+    def enable_parallel_detection(self, processes: Optional[int] = None):
+        """
+        Shard face detection in analyze_frames across a process pool
+
+        Args:
+            processes: Worker processes (default: all cores)
+        """
+        from utils.parallel_face_detection import ParallelFaceDetector
+        self.parallel_detector = ParallelFaceDetector(FACE_DETECTION_PARAMS, processes=processes)
+
+    def detect_faces_batch(self, grays: List[np.ndarray], tracker=None) -> List[np.ndarray]:
+        """
+        Face boxes for several grayscale frames
+
+        With a FaceTracker the frames are treated as consecutive frames of one
+        stream (full detection only every N frames or on track loss); otherwise
+        every frame is detected, on the process pool when enabled.
+        """
+        if tracker is not None:
+            return [tracker.update(gray) for gray in grays]
+        if self.parallel_detector is not None:
+            # Downscale before the frames are pickled to the worker processes
+            scaled = [downscale_for_detection(gray, self.detection_width) for gray in grays]
+            faces = self.parallel_detector.detect(
+                [small for small, _ in scaled],
+                [scale_detection_params(FACE_DETECTION_PARAMS, scale) for _, scale in scaled]
+            )
+            return [upscale_boxes(boxes, scale, gray.shape) for boxes, (_, scale), gray in zip(faces, scaled, grays)]
+        return [self.detect_faces(gray) for gray in grays]
+
+    def create_face_tracker(self, detect_interval: int = 10):
+        """Detect-once-then-track wrapper around detect_faces, one per video stream"""
+        from utils.face_tracking import FaceTracker
+        return FaceTracker(self.detect_faces, detect_interval=detect_interval)
+
+    def analyze_frame(self, frame: np.ndarray, tracker=None, state: Optional[FacialSessionState] = None) -> Dict:
         """
         Analyze a single frame for facial emotions and mental health indicators
 
         Args:
-            frame: Input video frame (BGR format)
+            frame: Input video frame (BGR, or already grayscale)
+            tracker: Optional FaceTracker (see create_face_tracker) for video streams
+            state: Session history to record the frame in (default: the analyzer's own)
 
         Returns:
             Dictionary containing emotion analysis results
         """
+        return self.analyze_frames([frame], tracker, state)[0]
+
+    def analyze_frames(self, frames: List[np.ndarray], tracker=None,
+                       state: Optional[FacialSessionState] = None) -> List[Dict]:
+        """
+        Analyze several frames, classifying every detected face in one batched CNN pass
+
+        Faces are detected frame by frame, then all face crops are stacked and
+        scored together by predict_emotions.
+
+        Args:
+            frames: Video frames (BGR, or already grayscale)
+            tracker: Optional FaceTracker; frames must then be consecutive frames of its stream
+            state: Session history to record the frames in (default: the analyzer's own)
+
+        Returns:
+            One analyze_frame-style result dict per input frame, in order
+        """
         if not self.is_initialized:
-            return {"error": "Analyzer not initialized"}
+            return [{"error": "Analyzer not initialized"} for _ in frames]
+
+        detections = []
+        grays = []
+        for frame in frames:
+            try:
+                # Convert to grayscale for face detection (stored stream frames already are)
+                gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                grays.append(gray)
+                detections.append(None)
+            except Exception as e:
+                logger.error(f"❌ Frame analysis failed: {e}")
+                detections.append(e)
 
         try:
-            # Convert to grayscale for face detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-            # Detect faces with more lenient parameters
-            faces = self.face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.05,  # More sensitive scaling
-                minNeighbors=3,    # Fewer neighbors required
-                minSize=(20, 20),  # Smaller minimum size
-                maxSize=(500, 500) # Larger maximum size
-            )
+            boxes = iter(self.detect_faces_batch(grays, tracker))
+        except Exception as e:
+            logger.error(f"❌ Face detection failed: {e}")
+            boxes = iter([e] * len(grays))
+
+        # Merge detections back in frame order and collect every face crop
+        face_rois = []
+        gray_iter = iter(grays)
+        for i, detection in enumerate(detections):
+            if detection is not None:
+                continue
+            gray, faces = next(gray_iter), next(boxes)
+            detections[i] = faces
+            if not isinstance(faces, Exception):
+                face_rois.extend(gray[y:y+h, x:x+w] for (x, y, w, h) in faces)
+
+        emotion_results = self.predict_emotions(face_rois)
+
+        results = []
+        offset = 0
+        for faces in detections:
+            if isinstance(faces, Exception):
+                results.append({"error": str(faces)})
+                continue
 
             if len(faces) == 0:
-                return {
+                results.append({
                     "faces_detected": 0,
                     "emotions": [],
                     "stress_level": "unknown",
                     "confidence": 0.0
-                }
+                })
+                continue
 
-            # Analyze each detected face
+            # Attach each face's emotion result to its location
             face_emotions = []
-            for (x, y, w, h) in faces:
-                # Extract face ROI
-                face_roi = gray[y:y+h, x:x+w]
-
-                # Analyze emotion
-                emotion_result = self._analyze_emotion(face_roi)
+            for (x, y, w, h), emotion_result in zip(faces, emotion_results[offset:offset + len(faces)]):
                 emotion_result.update({
                     "face_location": (x, y, w, h),
                     "face_size": w * h
                 })
-
                 face_emotions.append(emotion_result)
+            offset += len(faces)
 
-            # Calculate overall stress level
-            overall_stress = self._calculate_stress_level(face_emotions)
+            results.append(self._summarize_frame(face_emotions, state or self.default_state))
 
-            # Store in history
-            self.emotion_history.append({
-                "timestamp": time.time(),
-                "emotions": face_emotions,
-                "stress_level": overall_stress
-            })
+        return results
 
-            # Keep history manageable
-            if len(self.emotion_history) > 100:
-                self.emotion_history = self.emotion_history[-50:]
+    def _summarize_frame(self, face_emotions: List[Dict], state: FacialSessionState) -> Dict:
+        """Frame-level stress result from its faces' emotions, recorded in the session history"""
+        # Calculate overall stress level
+        overall_stress = self._calculate_stress_level(face_emotions)
 
-            return {
-                "faces_detected": len(faces),
-                "emotions": face_emotions,
-                "stress_level": overall_stress["level"],
-                "stress_score": overall_stress["score"],
-                "confidence": overall_stress["confidence"],
-                "timestamp": time.time()
-            }
+        # Store in history
+        state.emotion_history.append({
+            "timestamp": time.time(),
+            "emotions": face_emotions,
+            "stress_level": overall_stress
+        })
 
-        except Exception as e:
-            logger.error(f"❌ Frame analysis failed: {e}")
-            return {"error": str(e)}
+        # Keep history manageable
+        if len(state.emotion_history) > 100:
+            state.emotion_history = state.emotion_history[-50:]
+
+        return {
+            "faces_detected": len(face_emotions),
+            "emotions": face_emotions,
+            "stress_level": overall_stress["level"],
+            "stress_score": overall_stress["score"],
+            "confidence": overall_stress["confidence"],
+            "timestamp": time.time()
+        }
 
     def _analyze_emotion(self, face_roi: np.ndarray) -> Dict:
         """Analyze emotion from face ROI using CNN model"""
-        try:
-            if self.emotion_model is None:
-                # Fallback to basic analysis
-                return self._basic_emotion_analysis(face_roi)
+        return self.predict_emotions([face_roi])[0]
+
+    def _run_emotion_model(self, faces: np.ndarray) -> np.ndarray:
+        """Softmax probabilities for a preprocessed NCHW face batch on the configured backend"""
+        if self.emotion_backend != "torch":
+            return self.emotion_model(faces)
 
-            # Preprocess face for CNN
-            face_pil = Image.fromarray(face_roi)
-            face_tensor = self.transform(face_pil).unsqueeze(0).to(self.device)
+        import torch
+        with torch.no_grad():
+            return self.emotion_model(torch.from_numpy(faces).to(self.device)).cpu().numpy()
 
-            # Get emotion predictions
-            with torch.no_grad():
-                predictions = self.emotion_model(face_tensor)
-                probabilities = predictions.cpu().numpy()[0]
+    def predict_emotions(self, face_rois: List[np.ndarray], batch_size: int = EMOTION_BATCH_SIZE) -> List[Dict]:
+        """
+        Emotion distribution for each face crop
 
-            # Get dominant emotion
-            dominant_idx = np.argmax(probabilities)
-            dominant_emotion = self.emotion_labels[dominant_idx]
-            confidence = probabilities[dominant_idx]
+        Args:
+            face_rois: Grayscale face crops of any size, from any number of frames
+            batch_size: Crops per CNN forward pass
 
-            # Create emotion distribution
-            emotion_dist = {}
-            for idx, prob in enumerate(probabilities):
-                emotion_dist[self.emotion_labels[idx]] = float(prob)
+        Returns:
+            One emotion result dict per crop, in order
+        """
+        if not face_rois:
+            return []
 
-            return {
-                "dominant_emotion": dominant_emotion,
-                "confidence": float(confidence),
-                "emotion_distribution": emotion_dist,
-                "method": "cnn"
-            }
+        if self.emotion_model is None:
+            # Fallback to basic analysis
+            return [self._basic_emotion_analysis(roi) for roi in face_rois]
+
+        try:
+            probabilities = []
+            for start in range(0, len(face_rois), batch_size):
+                faces = preprocess_faces(face_rois[start:start + batch_size])
+
+                # Get emotion predictions
+                probabilities.append(self._run_emotion_model(faces))
+            probabilities = np.concatenate(probabilities)
 
         except Exception as e:
             logger.error(f"❌ CNN emotion analysis failed: {e}")
-            return self._basic_emotion_analysis(face_roi)
+            return [self._basic_emotion_analysis(roi) for roi in face_rois]
+
+        return [self._emotion_result(p) for p in probabilities]
+
+    def _emotion_result(self, probabilities: np.ndarray) -> Dict:
+        """Dominant emotion and full distribution from one softmax output"""
+        # Get dominant emotion
+        dominant_idx = int(np.argmax(probabilities))
+        dominant_emotion = self.emotion_labels[dominant_idx]
+        confidence = probabilities[dominant_idx]
+
+        # Create emotion distribution
+        emotion_dist = {}
+        for idx, prob in enumerate(probabilities):
+            emotion_dist[self.emotion_labels[idx]] = float(prob)
+
+        return {
+            "dominant_emotion": dominant_emotion,
+            "confidence": float(confidence),
+            "emotion_distribution": emotion_dist,
+            "method": "cnn"
+        }
 
     def _basic_emotion_analysis(self, face_roi: np.ndarray) -> Dict:
         """Basic emotion analysis using OpenCV features"""
@@ -459,15 +604,17 @@ class EnhancedFacialBehaviorAnalyzer:
             "confidence": avg_confidence
         }
 
-    def get_stress_analysis_summary(self, duration_seconds: int = 30) -> Dict:
+    def get_stress_analysis_summary(self, duration_seconds: int = 30,
+                                    state: Optional[FacialSessionState] = None) -> Dict:
         """Get stress analysis summary over specified duration"""
-        if not self.emotion_history:
+        emotion_history = (state or self.default_state).emotion_history
+        if not emotion_history:
             return {"error": "No emotion history available"}
 
         # Filter recent history
         current_time = time.time()
         recent_history = [
-            entry for entry in self.emotion_history
+            entry for entry in emotion_history
             if current_time - entry["timestamp"] <= duration_seconds
         ]
 
@@ -566,8 +713,9 @@ class CPUFacialBehaviorAnalyzer:
     No heavy ML models - designed for real-time CPU performance
     """
 
-    def __init__(self):
-        """Initialize the CPU-only facial behavior analyzer"""
+    def __init__(self, detection_width: Optional[int] = DEFAULT_DETECTION_WIDTH):
+        """Initialize the CPU-only facial behavior analyzer (detection_width as in EnhancedFacialBehaviorAnalyzer)"""
+        self.detection_width = detection_width
         self.is_initialized = False
         self.emotion_history = []
         self.face_history = []
@@ -752,19 +900,20 @@ class CPUFacialBehaviorAnalyzer:
 
         try:
             # Convert to grayscale for processing
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
             # Enhance image quality for better detection
             gray = cv2.equalizeHist(gray)
 
-            # Detect faces with optimized parameters for better detection
-            faces = self.face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.05,  # More sensitive
-                minNeighbors=3,    # Fewer neighbors
-                minSize=(30, 30),  # Smaller minimum
-                maxSize=(400, 400) # Larger maximum
-            )
+            # Detect faces with optimized parameters for better detection, on a downscaled copy
+            small, scale = downscale_for_detection(gray, self.detection_width)
+            faces = self.face_cascade.detectMultiScale(small, **scale_detection_params({
+                'scaleFactor': 1.05,  # More sensitive
+                'minNeighbors': 3,    # Fewer neighbors
+                'minSize': (30, 30),  # Smaller minimum
+                'maxSize': (400, 400) # Larger maximum
+            }, scale))
+            faces = upscale_boxes(faces, scale, gray.shape)
 
             analysis_results = {
                 'timestamp': datetime.now().isoformat(),
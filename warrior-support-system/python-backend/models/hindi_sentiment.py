@@ -5,6 +5,7 @@ CPU-ONLY, OFFLINE-CAPABLE VERSION
 import os
 import sys
 import re
+import threading
 import numpy as np
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
@@ -27,6 +28,11 @@ except ImportError as e:
 
 # Add parent directory to path for config import
 sys.path.append(str(Path(__file__).parent.parent.parent))
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.model_registry import model_registry
+from utils.keyword_index import KeywordIndex
+from utils.text_analysis_cache import text_analysis_cache
 
 try:
     from config import MODELS_DIR, HINDI_MODELS, MODEL_CONFIG
@@ -50,6 +56,9 @@ except ImportError:
     }
     MODEL_CONFIG = {"device": "cpu", "local_files_only": True}
 
+SENTIMENT_BATCH_SIZE = 16  # texts per forward pass in batch_analyze_sentiment
+SENTIMENT_ANALYSIS_VERSION = "1"  # bump when preprocessing, keywords or scoring change (invalidates cached results)
+
 class HindiSentimentAnalyzer:
     """
     Hindi Sentiment Analysis using local Hugging Face models
@@ -60,6 +69,20 @@ class HindiSentimentAnalyzer:
         self.tokenizer = None
         self.sentiment_pipeline = None
         self.model_loaded = False
+        self.loaded_model_name: Optional[str] = None
+        self._load_lock = threading.Lock()
+        
+    @property
+    def cache_version(self) -> str:
+        """Analysis code and loaded model behind a result, for the text analysis cache"""
+        return f"{SENTIMENT_ANALYSIS_VERSION}:{self.loaded_model_name}"
+        
+    def ensure_loaded(self) -> "HindiSentimentAnalyzer":
+        """Load the model (or keyword fallback) once, even when called from several threads"""
+        with self._load_lock:
+            if not self.model_loaded:
+                self.download_and_load_model()
+        return self
         
     def download_and_load_model(self) -> bool:
         """
@@ -163,6 +186,7 @@ class HindiSentimentAnalyzer:
             )
 
             self.model_loaded = True
+            self.loaded_model_name = model_name
             print("✓ Hindi sentiment model loaded successfully (CPU-only)")
             return True
 
@@ -209,7 +233,16 @@ class HindiSentimentAnalyzer:
             "सामान्य", "ठीक", "वैसा", "कभी", "शायद", "लगता", "होता", "रहता"
         ]
         
+        self.intensity_keywords = ["बहुत", "अत्यधिक", "काफी", "ज्यादा"]
+        
+        self.keyword_index = KeywordIndex({
+            "positive": self.positive_keywords,
+            "negative": self.negative_keywords,
+            "intensity": self.intensity_keywords
+        }, whole_words=False)
+        
         self.model_loaded = True
+        self.loaded_model_name = "keyword-fallback"
     
     def preprocess_hindi_text(self, text: str) -> str:
         """
@@ -242,24 +275,55 @@ class HindiSentimentAnalyzer:
             
             # Get sentiment prediction
             result = self.sentiment_pipeline(processed_text)[0]
-            
-            # Normalize labels
-            label = result["label"].upper()
-            if label in ["POSITIVE", "POS"]:
-                label = "POSITIVE"
-            elif label in ["NEGATIVE", "NEG"]:
-                label = "NEGATIVE"
-            else:
-                label = "NEUTRAL"
-            
-            return {
-                "label": label,
-                "score": result["score"]
-            }
+            return self._normalize_model_result(result["label"], result["score"])
             
         except Exception as e:
             print(f"Error in model-based sentiment analysis: {str(e)}")
-            return self.analyze_sentiment_fallback(text)
+            # Marked so the result is not cached under the loaded model's cache_version
+            return dict(self.analyze_sentiment_fallback(text), fallback=True)
+    
+    def _normalize_model_result(self, label: str, score: float) -> Dict[str, float]:
+        """
+        Map a model label onto POSITIVE/NEGATIVE/NEUTRAL
+        """
+        label = label.upper()
+        if label in ["POSITIVE", "POS"]:
+            label = "POSITIVE"
+        elif label in ["NEGATIVE", "NEG"]:
+            label = "NEGATIVE"
+        else:
+            label = "NEUTRAL"
+        
+        return {
+            "label": label,
+            "score": score
+        }
+    
+    def _predict_batch(self, encodings, indices: List[int]) -> List[Dict[str, float]]:
+        """
+        One forward pass over the tokenized texts at ``indices``, padded to the longest of them
+        """
+        batch = self.tokenizer.pad(
+            {key: [encodings[key][i] for i in indices] for key in encodings.keys()},
+            return_tensors="pt"
+        )
+        with torch.inference_mode():
+            logits = self.model(**batch).logits
+        
+        # Same scoring as the text-classification pipeline: sigmoid for a single logit, else softmax top-1
+        if logits.shape[-1] == 1:
+            positive = torch.sigmoid(logits[:, 0])
+            labels = (positive >= 0.5).long()
+            scores = torch.where(positive >= 0.5, positive, 1 - positive)
+            id2label = {0: "NEGATIVE", 1: "POSITIVE"}
+        else:
+            scores, labels = torch.softmax(logits, dim=-1).max(dim=-1)
+            id2label = self.model.config.id2label
+        
+        return [
+            self._normalize_model_result(id2label[int(label)], float(score))
+            for label, score in zip(labels, scores)
+        ]
     
     def analyze_sentiment_fallback(self, text: str) -> Dict[str, float]:
         """
@@ -271,16 +335,9 @@ class HindiSentimentAnalyzer:
             return {"label": "NEUTRAL", "score": 0.5}
 
         # Count keyword matches with better scoring
-        positive_matches = []
-        negative_matches = []
-
-        for keyword in self.positive_keywords:
-            if keyword in processed_text:
-                positive_matches.append(keyword)
-
-        for keyword in self.negative_keywords:
-            if keyword in processed_text:
-                negative_matches.append(keyword)
+        matched = self.keyword_index.matched_keywords(processed_text)
+        positive_matches = matched["positive"]
+        negative_matches = matched["negative"]
 
         positive_count = len(positive_matches)
         negative_count = len(negative_matches)
@@ -294,7 +351,7 @@ class HindiSentimentAnalyzer:
         negative_score = negative_count * 1.0
 
         # Check for intensity markers
-        if any(word in processed_text for word in ["बहुत", "अत्यधिक", "काफी", "ज्यादा"]):
+        if matched["intensity"]:
             if positive_count > negative_count:
                 positive_score *= 1.5  # Boost positive
             elif negative_count > positive_count:
@@ -316,7 +373,7 @@ class HindiSentimentAnalyzer:
         Main method to analyze sentiment of Hindi text
         """
         if not self.model_loaded:
-            self.download_and_load_model()
+            self.ensure_loaded()
         
         # Try model-based analysis first, fallback to keyword-based
         if self.sentiment_pipeline:
@@ -324,7 +381,12 @@ class HindiSentimentAnalyzer:
         else:
             result = self.analyze_sentiment_fallback(text)
         
-        # Convert to standardized format
+        return self._standardize_result(result)
+    
+    def _standardize_result(self, result: Dict[str, float]) -> Dict[str, any]:
+        """
+        Convert a label/score result to the analyze_sentiment output format
+        """
         sentiment_score = result["score"]
         if result["label"] == "NEGATIVE":
             sentiment_score = -sentiment_score
@@ -338,13 +400,46 @@ class HindiSentimentAnalyzer:
             "raw_result": result
         }
     
-    def batch_analyze_sentiment(self, texts: List[str]) -> List[Dict[str, any]]:
+    def batch_analyze_sentiment(self, texts: List[str], batch_size: int = SENTIMENT_BATCH_SIZE) -> List[Dict[str, any]]:
         """
-        Analyze sentiment for multiple texts
+        Analyze sentiment for multiple texts, in input order
+        
+        With a transformer model loaded, all texts are tokenized once, sorted by
+        token length and run in micro-batches of ``batch_size``, each padded only
+        to its own longest text. A micro-batch that fails is retried text by text.
         """
-        results = []
-        for text in texts:
-            results.append(self.analyze_sentiment(text))
+        if not self.model_loaded:
+            self.ensure_loaded()
+        
+        if not self.sentiment_pipeline:
+            return [self.analyze_sentiment(text) for text in texts]
+        
+        processed_texts = [self.preprocess_hindi_text(text) for text in texts]
+        results: List[Optional[Dict[str, any]]] = [None] * len(texts)
+        
+        # Texts with no Hindi left after preprocessing are neutral, as in analyze_sentiment_with_model
+        pending = []
+        for i, processed_text in enumerate(processed_texts):
+            if processed_text:
+                pending.append(i)
+            else:
+                results[i] = self._standardize_result({"label": "NEUTRAL", "score": 0.5})
+        
+        if pending:
+            encodings = self.tokenizer([processed_texts[i] for i in pending], truncation=True)
+            by_length = sorted(range(len(pending)), key=lambda j: len(encodings["input_ids"][j]))
+            
+            for start in range(0, len(by_length), batch_size):
+                chunk = by_length[start:start + batch_size]
+                try:
+                    predictions = self._predict_batch(encodings, chunk)
+                except Exception as e:
+                    print(f"Error in batched sentiment analysis, analyzing texts one by one: {str(e)}")
+                    predictions = [self.analyze_sentiment_with_model(texts[pending[j]]) for j in chunk]
+                
+                for j, prediction in zip(chunk, predictions):
+                    results[pending[j]] = self._standardize_result(prediction)
+        
         return results
     
     def get_emotion_indicators(self, text: str) -> Dict[str, float]:
@@ -372,17 +467,40 @@ class HindiSentimentAnalyzer:
 # Global instance
 hindi_sentiment_analyzer = HindiSentimentAnalyzer()
 
+# Loaded once per process through the shared registry (warmed at API startup)
+model_registry.register(
+    "hindi_sentiment",
+    hindi_sentiment_analyzer.ensure_loaded,
+    describe=lambda analyzer: analyzer.loaded_model_name
+)
+
+def get_hindi_sentiment_analyzer() -> HindiSentimentAnalyzer:
+    """
+    Shared, loaded Hindi sentiment analyzer
+    """
+    return model_registry.get("hindi_sentiment")
+
+def is_fallback_result(result: Dict[str, any]) -> bool:
+    """
+    True for an analyze_sentiment result that fell back to keywords after a model error
+    """
+    return bool((result.get("raw_result") or {}).get("fallback"))
+
 def analyze_hindi_sentiment(text: str) -> Dict[str, any]:
     """
-    Convenience function to analyze Hindi sentiment
+    Convenience function to analyze Hindi sentiment (memoized per normalized text)
     """
-    return hindi_sentiment_analyzer.analyze_sentiment(text)
+    analyzer = get_hindi_sentiment_analyzer()
+    return text_analysis_cache.get_or_compute(
+        "hindi_sentiment", analyzer.cache_version, text, analyzer.analyze_sentiment,
+        cacheable=lambda result: not is_fallback_result(result)
+    )
 
 def get_emotion_analysis(text: str) -> Dict[str, any]:
     """
     Get comprehensive emotion analysis for Hindi text
     """
-    sentiment_result = hindi_sentiment_analyzer.analyze_sentiment(text)
+    sentiment_result = get_hindi_sentiment_analyzer().analyze_sentiment(text)
     emotion_indicators = hindi_sentiment_analyzer.get_emotion_indicators(text)
     
     return {
@@ -2,13 +2,40 @@
 Keyword Matcher for Mental Health Assessment
 """
 import re
+import json
 from typing import Dict, List, Tuple, Set
 import sys
 from pathlib import Path
 
 # Add parent directory to path for config import
 sys.path.append(str(Path(__file__).parent.parent.parent))
+sys.path.append(str(Path(__file__).parent.parent))
 from config import MENTAL_HEALTH_KEYWORDS
+from utils.keyword_index import KeywordIndex
+
+KEYWORDS_FILE = Path(__file__).parent.parent / "keywords" / "hindi_mental_health_keywords.json"
+# Keyword file categories that are scored as one of the MENTAL_HEALTH_KEYWORDS categories
+KEYWORDS_FILE_CATEGORY_ALIASES = {"happiness": "positive"}
+
+def load_category_keywords(keywords_file: Path = KEYWORDS_FILE) -> Dict[str, List[str]]:
+    """
+    Hindi keywords per category from MENTAL_HEALTH_KEYWORDS, extended with the keyword file
+    """
+    category_keywords = {category: list(data["hindi"]) for category, data in MENTAL_HEALTH_KEYWORDS.items()}
+
+    try:
+        with open(keywords_file, encoding="utf-8") as f:
+            extra_keywords = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not load {keywords_file}: {e}")
+        return category_keywords
+
+    for category, keywords in extra_keywords.items():
+        category = KEYWORDS_FILE_CATEGORY_ALIASES.get(category, category)
+        if category in category_keywords:
+            category_keywords[category].extend(k for k in keywords if k not in category_keywords[category])
+
+    return category_keywords
 
 class MentalHealthKeywordMatcher:
     """
@@ -17,23 +44,8 @@ class MentalHealthKeywordMatcher:
 
     def __init__(self):
         self.keyword_categories = MENTAL_HEALTH_KEYWORDS
-        self.compiled_patterns = self._compile_keyword_patterns()
-
-    def _compile_keyword_patterns(self) -> Dict[str, List[re.Pattern]]:
-        """
-        Compile regex patterns for efficient keyword matching
-        """
-        compiled_patterns = {}
-
-        for category, data in self.keyword_categories.items():
-            patterns = []
-            for keyword in data["hindi"]:
-                # Create pattern that matches whole words
-                pattern = re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE)
-                patterns.append(pattern)
-            compiled_patterns[category] = patterns
-
-        return compiled_patterns
+        # All categories in one automaton, matching whole (Devanagari-aware) words
+        self.keyword_index = KeywordIndex(load_category_keywords())
 
     def analyze_text(self, text: str) -> Dict[str, Dict]:
         """
@@ -46,15 +58,11 @@ class MentalHealthKeywordMatcher:
             Dictionary with analysis results for each category
         """
         results = {}
+        hits_by_category = self.keyword_index.find_by_category(text)
 
-        for category, patterns in self.compiled_patterns.items():
-            matches = []
-            total_matches = 0
-
-            for pattern in patterns:
-                found_matches = pattern.findall(text)
-                matches.extend(found_matches)
-                total_matches += len(found_matches)
+        for category in self.keyword_categories:
+            matches = [text[hit.start:hit.end] for hit in hits_by_category.get(category, [])]
+            total_matches = len(matches)
 
             # Calculate severity score based on frequency and category weight
             severity_weight = self.keyword_categories[category]["severity_weight"]
@@ -181,27 +189,14 @@ class MentalHealthKeywordMatcher:
         Find keywords in text for specific category or all categories
         """
         processed_text = self.preprocess_text(text)
-        found_keywords = {}
-        
-        categories_to_check = [category] if category else self.keyword_categories.keys()
-        
-        for cat in categories_to_check:
-            if cat not in self.compiled_patterns:
-                continue
-                
-            found_keywords[cat] = []
-            patterns = self.compiled_patterns[cat]
-            
-            for i, pattern in enumerate(patterns):
-                matches = pattern.findall(processed_text)
-                if matches:
-                    keyword = self.keyword_categories[cat]["hindi"][i]
-                    found_keywords[cat].extend([keyword] * len(matches))
-        
-        # Remove empty categories
-        found_keywords = {k: v for k, v in found_keywords.items() if v}
+        hits_by_category = self.keyword_index.find_by_category(processed_text)
         
-        return found_keywords
+        # Categories without matches are left out
+        return {
+            cat: [hit.keyword for hit in hits]
+            for cat, hits in hits_by_category.items()
+            if category is None or cat == category
+        }
     
     def calculate_keyword_scores(self, text: str) -> Dict[str, float]:
         """
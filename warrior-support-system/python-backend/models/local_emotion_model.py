@@ -162,6 +162,17 @@ class LocalEmotionModel:
         """
         return self._detect_faces_enhanced_cascade(frame)
     
+    def create_face_tracker(self, detect_interval: int = 10):
+        """
+        Detect-once-then-track wrapper around the multi-cascade detector
+        
+        The full cascade sweep (and its ultra-relaxed retry) then runs only
+        every ``detect_interval`` frames or when a tracked face is lost.
+        Use one tracker per video stream.
+        """
+        from utils.face_tracking import FaceTracker
+        return FaceTracker(self.detect_faces, detect_interval=detect_interval)
+    
     def _detect_faces_enhanced_cascade(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """Enhanced face detection using multiple cascade methods"""
         try:
@@ -375,12 +386,13 @@ class LocalEmotionModel:
             logger.error(f"Feature analysis failed: {e}")
             return {'neutral': 1.0}
     
-    def analyze_frame(self, frame: np.ndarray) -> Dict:
+    def analyze_frame(self, frame: np.ndarray, tracker=None) -> Dict:
         """
         Analyze frame for emotions and mental health indicators
         
         Args:
             frame: Input frame
+            tracker: Optional FaceTracker from create_face_tracker for video streams
             
         Returns:
             Analysis results
@@ -389,8 +401,8 @@ class LocalEmotionModel:
             return {"error": "Model not initialized"}
         
         try:
-            # Detect faces
-            faces = self.detect_faces(frame)
+            # Detect faces (or follow them from the previous frame)
+            faces = tracker.update(frame) if tracker is not None else self.detect_faces(frame)
             
             results = {
                 'faces_detected': len(faces),
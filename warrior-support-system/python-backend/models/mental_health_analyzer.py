@@ -5,7 +5,8 @@ Analyzes questionnaire responses using local Hugging Face models
 
 import re
 from typing import List, Dict, Any, Optional
-from .hindi_sentiment import analyze_hindi_sentiment
+from .hindi_sentiment import analyze_hindi_sentiment, get_hindi_sentiment_analyzer
+from utils.keyword_index import KeywordIndex
 
 class QWarriorMentalHealthAnalyzer:
     """
@@ -81,6 +82,23 @@ class QWarriorMentalHealthAnalyzer:
                 "discipline", "dedication", "service", "pride", "honor", "duty"
             ]
         }
+
+        # One keyword automaton per language over all indicator categories (substring matching)
+        indicator_keywords = {
+            "depression": self.depression_keywords,
+            "anxiety": self.anxiety_keywords,
+            "ptsd": self.ptsd_keywords,
+            "military_stress": self.military_stress_keywords,
+            "positive": self.positive_keywords,
+            "resilience": self.resilience_keywords
+        }
+        self.keyword_indexes = {
+            language: KeywordIndex(
+                {category: keywords[language] for category, keywords in indicator_keywords.items()},
+                whole_words=False
+            )
+            for language in ("hindi", "english")
+        }
     
     def detect_language(self, text: str) -> str:
         """Detect if text is primarily Hindi or English"""
@@ -93,12 +111,30 @@ class QWarriorMentalHealthAnalyzer:
         hindi_ratio = hindi_chars / total_chars
         return "hindi" if hindi_ratio > 0.3 else "english"
     
-    def analyze_text_response(self, text: str, language: str = None) -> Dict[str, Any]:
+    def _is_analyzable_text(self, text: str) -> bool:
+        return bool(text) and len(text.strip()) >= 3
+
+    def analyze_text_responses(self, texts: List[str], language: str = None) -> List[Dict[str, Any]]:
+        """
+        analyze_text_response for several answers, with one batched sentiment pass over all of them
+        """
+        analyzable = [text.lower().strip() for text in texts if self._is_analyzable_text(text)]
+        sentiments = iter(get_hindi_sentiment_analyzer().batch_analyze_sentiment(analyzable))
+
+        return [
+            self.analyze_text_response(text, language, next(sentiments))
+            if self._is_analyzable_text(text) else self.analyze_text_response(text, language)
+            for text in texts
+        ]
+
+    def analyze_text_response(self, text: str, language: str = None,
+                              sentiment_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         QWarrior Advanced Text Analysis for Military Mental Health
         Comprehensive analysis including PTSD, military stress, and resilience factors
+        ``sentiment_result`` is a precomputed analyze_hindi_sentiment result for the text
         """
-        if not text or len(text.strip()) < 3:
+        if not self._is_analyzable_text(text):
             return {"sentiment_score": 0, "keywords": {}, "risk_level": "normal", "military_factors": {}}
 
         text = text.lower().strip()
@@ -107,11 +143,13 @@ class QWarriorMentalHealthAnalyzer:
             language = self.detect_language(text)
 
         # Get sentiment analysis using local model
-        sentiment_result = analyze_hindi_sentiment(text)
+        if sentiment_result is None:
+            sentiment_result = analyze_hindi_sentiment(text)
         sentiment_score = sentiment_result.get("sentiment_score", 0)
         confidence = sentiment_result.get("confidence", 0.5)
 
-        # Advanced keyword analysis for military personnel
+        # Advanced keyword analysis for military personnel: depression, anxiety, PTSD,
+        # military stress, positive and resilience indicators in one pass over the text
         keywords_found = {
             "depression": [],
             "anxiety": [],
@@ -120,36 +158,8 @@ class QWarriorMentalHealthAnalyzer:
             "positive": [],
             "resilience": []
         }
-
-        # Check for depression indicators
-        for keyword in self.depression_keywords.get(language, []):
-            if keyword.lower() in text:
-                keywords_found["depression"].append(keyword)
-
-        # Check for anxiety indicators
-        for keyword in self.anxiety_keywords.get(language, []):
-            if keyword.lower() in text:
-                keywords_found["anxiety"].append(keyword)
-
-        # Check for PTSD indicators (military-specific)
-        for keyword in self.ptsd_keywords.get(language, []):
-            if keyword.lower() in text:
-                keywords_found["ptsd"].append(keyword)
-
-        # Check for military stress indicators
-        for keyword in self.military_stress_keywords.get(language, []):
-            if keyword.lower() in text:
-                keywords_found["military_stress"].append(keyword)
-
-        # Check for positive indicators
-        for keyword in self.positive_keywords.get(language, []):
-            if keyword.lower() in text:
-                keywords_found["positive"].append(keyword)
-
-        # Check for resilience indicators
-        for keyword in self.resilience_keywords.get(language, []):
-            if keyword.lower() in text:
-                keywords_found["resilience"].append(keyword)
+        if language in self.keyword_indexes:
+            keywords_found.update(self.keyword_indexes[language].matched_keywords(text))
 
         # Advanced risk calculation for military context
         risk_score = 0
@@ -389,6 +399,12 @@ def analyze_mental_health_responses(responses: List[Dict[str, Any]], language: s
 
     detailed_analysis = []
 
+    # Sentiment for all free-text answers in one batched model pass
+    text_analyses = iter(analyzer.analyze_text_responses([
+        response_data.get("response") for response_data in responses
+        if response_data.get("question_type", "text") == "text" and isinstance(response_data.get("response"), str)
+    ], language))
+
     for response_data in responses:
         response = response_data.get("response")
         question_type = response_data.get("question_type", "text")
@@ -401,7 +417,7 @@ def analyze_mental_health_responses(responses: List[Dict[str, Any]], language: s
 
         if question_type == "text" and isinstance(response, str):
             # Advanced text analysis using QWarrior system
-            text_analysis = analyzer.analyze_text_response(response, language)
+            text_analysis = next(text_analyses)
             total_risk_score += text_analysis["risk_score"]
             sentiment_scores.append(text_analysis["sentiment_score"])
             confidence_scores.append(text_analysis.get("sentiment_confidence", 0.5))
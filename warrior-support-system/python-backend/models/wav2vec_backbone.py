@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Configurable Wav2Vec2 backbones for the voice analyzer's deep_learning features
+Supports the original XLSR-53 large model, the smaller wav2vec2-base, dynamic
+int8 quantization and ONNX Runtime inference for CPU-only deployments
+"""
+
+import sys
+import time
+import logging
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional
+
+import torch
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.model_registry import current_rss_mb
+
+logger = logging.getLogger(__name__)
+
+try:
+    from transformers import Wav2Vec2FeatureExtractor, Wav2Vec2Model
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+WAV2VEC_BACKBONES = {
+    "xlsr-large": "facebook/wav2vec2-large-xlsr-53",  # ~300M params, multilingual
+    "base": "facebook/wav2vec2-base"                   # ~95M params
+}
+WAV2VEC_RUNTIMES = ("torch", "int8", "onnx")
+
+ONNX_CACHE_DIR = Path(__file__).parent.parent / "models_cache" / "onnx"
+
+
+class Wav2VecBackbone:
+    """
+    Wav2Vec2 encoder that returns last-hidden-state frames for 16 kHz audio
+
+    Runtimes:
+        torch: eager PyTorch on the requested device
+        int8:  torch dynamic int8 quantization of all Linear layers (CPU only)
+        onnx:  ONNX Runtime CPU session, exported once to models_cache/onnx
+    """
+
+    def __init__(self, backbone: str = "xlsr-large", runtime: str = "torch", device: Optional[torch.device] = None):
+        if backbone not in WAV2VEC_BACKBONES:
+            raise ValueError(f"Unknown Wav2Vec2 backbone '{backbone}', expected one of {list(WAV2VEC_BACKBONES)}")
+        if runtime not in WAV2VEC_RUNTIMES:
+            raise ValueError(f"Unknown Wav2Vec2 runtime '{runtime}', expected one of {WAV2VEC_RUNTIMES}")
+
+        self.backbone = backbone
+        self.runtime = runtime
+        self.model_name = WAV2VEC_BACKBONES[backbone]
+        self.device = device or torch.device("cpu")
+        if runtime != "torch" and self.device.type != "cpu":
+            logger.warning(f"⚠️ Wav2Vec2 runtime '{runtime}' is CPU-only, ignoring device {self.device}")
+            self.device = torch.device("cpu")
+
+        self.feature_extractor = None
+        self.model = None
+        self.session = None
+        self.load_time = 0.0
+        self.load_memory_mb = 0.0
+
+    def load(self) -> "Wav2VecBackbone":
+        """Load weights for the configured runtime, recording load time and RSS growth"""
+        if not TRANSFORMERS_AVAILABLE:
+            raise RuntimeError("transformers is not installed")
+        if self.runtime == "onnx" and not ONNX_AVAILABLE:
+            raise RuntimeError("onnxruntime is not installed")
+
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+
+        self.feature_extractor = Wav2Vec2FeatureExtractor.from_pretrained(self.model_name)
+
+        if self.runtime == "onnx":
+            self.session = self._load_onnx_session()
+        else:
+            model = Wav2Vec2Model.from_pretrained(self.model_name)
+            model.eval()
+            if self.runtime == "int8":
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.model = model.to(self.device)
+
+        self.load_time = time.perf_counter() - start
+        self.load_memory_mb = current_rss_mb() - rss_before
+        logger.info(f"✅ Wav2Vec2 {self.backbone} ({self.runtime}) loaded in {self.load_time:.1f}s, "
+                    f"+{self.load_memory_mb:.0f} MB RSS")
+        return self
+
+    @property
+    def onnx_path(self) -> Path:
+        return ONNX_CACHE_DIR / f"{self.model_name.replace('/', '__')}.onnx"
+
+    def _load_onnx_session(self):
+        """Export the encoder to ONNX on first use, then open a CPU inference session"""
+        if not self.onnx_path.exists():
+            self.export_onnx()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        return ort.InferenceSession(str(self.onnx_path), options, providers=["CPUExecutionProvider"])
+
+    def export_onnx(self) -> Path:
+        """Export the PyTorch encoder with a dynamic sample axis"""
+        ONNX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        logger.info(f"🔄 Exporting {self.model_name} to ONNX: {self.onnx_path}")
+
+        model = Wav2Vec2Model.from_pretrained(self.model_name)
+        model.eval()
+        model.config.return_dict = False
+        dummy = torch.zeros(1, 16000)
+
+        with torch.no_grad():
+            torch.onnx.export(
+                model, (dummy,), str(self.onnx_path),
+                input_names=["input_values"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={"input_values": {1: "samples"}, "last_hidden_state": {1: "frames"}},
+                opset_version=14
+            )
+
+        del model
+        return self.onnx_path
+
+    def hidden_states(self, audio: np.ndarray) -> np.ndarray:
+        """Last hidden state (frames x hidden size) for one 16 kHz segment"""
+        inputs = self.feature_extractor(
+            audio, sampling_rate=16000, return_tensors="np" if self.session else "pt", padding=True
+        )
+
+        if self.session is not None:
+            input_values = inputs["input_values"].astype(np.float32)
+            return self.session.run(None, {"input_values": input_values})[0][0]
+
+        with torch.no_grad():
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            outputs = self.model(**inputs)
+            return outputs.last_hidden_state.cpu().numpy()[0]
+
+    def describe(self) -> Dict:
+        """Backbone configuration and load cost, for /health and benchmark reports"""
+        return {
+            "backbone": self.backbone,
+            "model_name": self.model_name,
+            "runtime": self.runtime,
+            "device": str(self.device),
+            "load_time_seconds": round(self.load_time, 2),
+            "load_memory_mb": round(self.load_memory_mb, 1)
+        }
@@ -0,0 +1,212 @@
+"""
+Benchmarks for facial analysis face detection
+Compares optimized detection paths against full per-frame detection on
+recorded video or saved session frames
+
+Usage:
+    python scripts/benchmark_facial_detection.py tracking --video session.webm [--intervals 5 10] [--model local]
+    python scripts/benchmark_facial_detection.py tracking --frames-dir sessions/<session_id>-<hash>/
+    python scripts/benchmark_facial_detection.py downscale --video session.webm [--widths 480 320 240]
+"""
+
+import sys
+import os
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.face_tracking import FaceTracker, box_iou
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".img"}
+MATCH_IOU = 0.5
+
+
+def load_frames(video: str = None, frames_dir: str = None, max_frames: int = 900) -> list:
+    """BGR frames from a video file or a directory of images (sorted by name)"""
+    frames = []
+    if video:
+        cap = cv2.VideoCapture(video)
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+    elif frames_dir:
+        for path in sorted(Path(frames_dir).iterdir()):
+            if path.suffix.lower() in IMAGE_EXTENSIONS and len(frames) < max_frames:
+                frame = cv2.imread(str(path))
+                if frame is not None:
+                    frames.append(frame)
+    return frames
+
+
+def build_detector(model: str):
+    """Full-frame detector (frame -> boxes) and the input it expects for one analyzer"""
+    if model == "local":
+        from models.local_emotion_model import LocalEmotionModel
+        return LocalEmotionModel().detect_faces, lambda frame: frame
+
+    from models.facial_behavior_analyzer import EnhancedFacialBehaviorAnalyzer
+    analyzer = EnhancedFacialBehaviorAnalyzer(device="cpu", detection_width=None)
+    return analyzer.detect_faces, lambda frame: cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def detection_agreement(reference: list, candidate: list) -> dict:
+    """Box-level precision/recall at IoU >= 0.5, mean IoU of matches and face-present agreement"""
+    matched = ref_total = cand_total = present_agree = 0
+    ious = []
+
+    for ref_boxes, cand_boxes in zip(reference, candidate):
+        ref_boxes, cand_boxes = [tuple(b) for b in ref_boxes], [tuple(b) for b in cand_boxes]
+        ref_total += len(ref_boxes)
+        cand_total += len(cand_boxes)
+        present_agree += bool(ref_boxes) == bool(cand_boxes)
+
+        unmatched = list(cand_boxes)
+        for ref_box in ref_boxes:
+            if not unmatched:
+                break
+            best = max(unmatched, key=lambda box: box_iou(ref_box, box))
+            iou = box_iou(ref_box, best)
+            if iou >= MATCH_IOU:
+                matched += 1
+                ious.append(iou)
+                unmatched.remove(best)
+
+    return {
+        "precision": matched / cand_total if cand_total else 1.0,
+        "recall": matched / ref_total if ref_total else 1.0,
+        "mean_iou": float(np.mean(ious)) if ious else 0.0,
+        "presence": present_agree / len(reference) if reference else 1.0
+    }
+
+
+def run_detection(frames: list, detect) -> tuple:
+    start = time.perf_counter()
+    boxes = [detect(frame) for frame in frames]
+    return boxes, time.perf_counter() - start
+
+
+def benchmark_tracking(frames: list, model: str, intervals: list):
+    detect_fn, prepare = build_detector(model)
+    inputs = [prepare(frame) for frame in frames]
+    h, w = frames[0].shape[:2]
+
+    reference, full_elapsed = run_detection(inputs, detect_fn)
+    face_frames = sum(1 for boxes in reference if len(boxes))
+
+    print(f"🎯 Detect-then-track report: {len(frames)} frames at {w}x{h}, {model} detector, "
+          f"faces in {face_frames} frames")
+    print(f"{'mode':>12} {'fps':>8} {'speedup':>8} {'det ratio':>10} {'losses':>7} "
+          f"{'precision':>10} {'recall':>7} {'mean IoU':>9} {'presence':>9}")
+    print(f"{'full':>12} {len(frames) / full_elapsed:>8.1f} {1.0:>8.2f} {1.0:>10.3f} {0:>7}")
+
+    for interval in intervals:
+        tracker = FaceTracker(detect_fn, detect_interval=interval)
+        tracked, elapsed = run_detection(inputs, tracker.update)
+        stats = tracker.stats()
+        agreement = detection_agreement(reference, tracked)
+        print(f"{f'track N={interval}':>12} {len(frames) / elapsed:>8.1f} {full_elapsed / elapsed:>8.2f} "
+              f"{stats['detection_ratio']:>10.3f} {stats['track_losses']:>7} {agreement['precision']:>10.3f} "
+              f"{agreement['recall']:>7.3f} {agreement['mean_iou']:>9.3f} {agreement['presence']:>9.3f}")
+
+
+def benchmark_downscale(sources: list, widths: list):
+    """
+    Detection-rate parity of downscaled detection against full-resolution detection
+
+    ``sources`` is a list of (name, frames) recordings; each is reported
+    separately and in total.
+    """
+    from models.facial_behavior_analyzer import EnhancedFacialBehaviorAnalyzer, FACE_DETECTION_PARAMS
+    from utils.detection_resolution import min_face_size
+    analyzer = EnhancedFacialBehaviorAnalyzer(device="cpu", detection_width=None)
+
+    print(f"🔍 Downscaled detection report ({len(sources)} recordings, reference: full resolution)")
+    print(f"{'recording':>24} {'width':>6} {'fps':>8} {'speedup':>8} {'face rate':>10} {'Δ rate':>7} "
+          f"{'precision':>10} {'recall':>7} {'mean IoU':>9} {'min face':>9}")
+
+    totals = {}
+    for name, frames in sources:
+        grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames]
+        h, w = grays[0].shape
+
+        analyzer.detection_width = None
+        reference, full_elapsed = run_detection(grays, analyzer.detect_faces)
+        full_rate = sum(1 for boxes in reference if len(boxes)) / len(grays)
+        print(f"{name[:24]:>24} {w:>6} {len(grays) / full_elapsed:>8.1f} {1.0:>8.2f} {full_rate:>10.3f} "
+              f"{'':>7} {'':>10} {'':>7} {'':>9} {min_face_size(FACE_DETECTION_PARAMS, 1.0)[0]:>7}px")
+
+        for width in widths:
+            analyzer.detection_width = width
+            detected, elapsed = run_detection(grays, analyzer.detect_faces)
+            rate = sum(1 for boxes in detected if len(boxes)) / len(grays)
+            agreement = detection_agreement(reference, detected)
+            print(f"{'':>24} {width:>6} {len(grays) / elapsed:>8.1f} {full_elapsed / elapsed:>8.2f} "
+                  f"{rate:>10.3f} {rate - full_rate:>+7.3f} {agreement['precision']:>10.3f} "
+                  f"{agreement['recall']:>7.3f} {agreement['mean_iou']:>9.3f} "
+                  f"{min_face_size(FACE_DETECTION_PARAMS, min(1.0, width / w))[0]:>7}px")
+
+            total = totals.setdefault(width, {"frames": 0, "full": 0, "scaled": 0, "full_s": 0.0, "scaled_s": 0.0})
+            total["frames"] += len(grays)
+            total["full"] += round(full_rate * len(grays))
+            total["scaled"] += round(rate * len(grays))
+            total["full_s"] += full_elapsed
+            total["scaled_s"] += elapsed
+
+    for width, total in totals.items():
+        full_rate, rate = total["full"] / total["frames"], total["scaled"] / total["frames"]
+        print(f"{'all recordings':>24} {width:>6} {total['frames'] / total['scaled_s']:>8.1f} "
+              f"{total['full_s'] / total['scaled_s']:>8.2f} {rate:>10.3f} {rate - full_rate:>+7.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Face detection benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    tracking = subparsers.add_parser("tracking", help="Detect-once-then-track vs. full detection per frame")
+    source = tracking.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", help="Recorded session video")
+    source.add_argument("--frames-dir", help="Directory of frame images, e.g. a spilled session")
+    tracking.add_argument("--intervals", type=int, nargs="+", default=[5, 10, 20])
+    tracking.add_argument("--model", choices=["enhanced", "local"], default="enhanced")
+    tracking.add_argument("--max-frames", type=int, default=900)
+
+    downscale = subparsers.add_parser("downscale", help="Downscaled detection: speed and detection-rate parity")
+    source = downscale.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", nargs="+", help="Recorded session videos")
+    source.add_argument("--frames-dir", nargs="+", help="Directories of frame images, e.g. spilled sessions")
+    downscale.add_argument("--widths", type=int, nargs="+", default=[480, 320, 240])
+    downscale.add_argument("--max-frames", type=int, default=900)
+
+    args = parser.parse_args()
+
+    if args.benchmark == "downscale":
+        sources = [(Path(path).name, load_frames(video=path, max_frames=args.max_frames)) for path in args.video or []]
+        sources += [(Path(path).name, load_frames(frames_dir=path, max_frames=args.max_frames))
+                    for path in args.frames_dir or []]
+        sources = [(name, frames) for name, frames in sources if frames]
+        if not sources:
+            print("❌ No frames could be read")
+            return
+        benchmark_downscale(sources, args.widths)
+        return
+
+    frames = load_frames(args.video, args.frames_dir, args.max_frames)
+    if not frames:
+        print("❌ No frames could be read")
+        return
+
+    if args.benchmark == "tracking":
+        benchmark_tracking(frames, args.model, args.intervals)
+
+
+if __name__ == "__main__":
+    main()
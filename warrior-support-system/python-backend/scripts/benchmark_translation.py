@@ -0,0 +1,113 @@
+"""
+Benchmark for HindiEnglishTranslator on long free-text answers
+Compares the indexed partial-match lookup against the previous full
+dictionary scan per missed word, on real answers or synthetic ones
+
+Usage:
+    python scripts/benchmark_translation.py [--words 50 200 1000] [--answers 20]
+    python scripts/benchmark_translation.py --answers-file answers.txt
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.translation_engine import HindiEnglishTranslator, WORD_PUNCTUATION
+
+HINDI_SUFFIXES = ["ों", "ी", "ा", "े", "ना", "कर"]  # inflections that miss the dictionary
+
+
+def scan_partial_match(word: str, dictionary: dict):
+    """The previous lookup: first key (dictionary order) containing or contained in the word"""
+    for key, value in dictionary.items():
+        if word in key or key in word:
+            return value
+    return None
+
+
+def scan_translate(translator: HindiEnglishTranslator, text: str) -> str:
+    """translate_hindi_to_english with the previous scan, which ran twice per missed word"""
+    translated = []
+    for word in translator._clean_text(text).split():
+        clean_word = WORD_PUNCTUATION.sub('', word)
+        dictionary = translator.hindi_to_english_dict
+        if clean_word in dictionary:
+            translated.append(dictionary[clean_word])
+        elif scan_partial_match(clean_word, dictionary):
+            translated.append(scan_partial_match(clean_word, dictionary))
+        else:
+            translated.append(translator._transliterate_word(clean_word) or word)
+    return translator._post_process_translation(" ".join(translated))
+
+
+def synthetic_answers(translator: HindiEnglishTranslator, n_answers: int, n_words: int, seed: int = 0) -> list:
+    """Answers mixing dictionary words, inflected dictionary words and out-of-vocabulary words"""
+    rng = random.Random(seed)
+    keys = list(translator.hindi_to_english_dict)
+    letters = [chr(c) for c in range(0x0915, 0x0939)]
+    answers = []
+    for _ in range(n_answers):
+        words = []
+        for _ in range(n_words):
+            kind = rng.random()
+            if kind < 0.4:
+                words.append(rng.choice(keys))
+            elif kind < 0.8:
+                words.append(rng.choice(keys) + rng.choice(HINDI_SUFFIXES))
+            else:
+                words.append("".join(rng.choice(letters) for _ in range(rng.randint(2, 6))))
+        answers.append(" ".join(words) + "।")
+    return answers
+
+
+def time_translate(translate, answers: list, repeats: int = 3) -> float:
+    """Best-of-N milliseconds per answer"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for answer in answers:
+            translate(answer)
+        best = min(best, time.perf_counter() - start)
+    return 1000 * best / len(answers)
+
+
+def report(translator: HindiEnglishTranslator, label: str, answers: list):
+    n_words = sum(len(answer.split()) for answer in answers) / len(answers)
+    scan_ms = time_translate(lambda text: scan_translate(translator, text), answers)
+    index_ms = time_translate(translator.translate_hindi_to_english, answers)
+    same = sum(
+        scan_translate(translator, answer) == translator.translate_hindi_to_english(answer) for answer in answers
+    ) / len(answers)
+    print(f"{label:>12} {n_words:>7.0f} {scan_ms:>9.2f} {index_ms:>9.2f} {scan_ms / max(index_ms, 1e-9):>8.1f}x {same:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Hindi-English partial-match translation")
+    parser.add_argument("--words", type=int, nargs="+", default=[50, 200, 1000], help="Synthetic answer lengths")
+    parser.add_argument("--answers", type=int, default=20, help="Synthetic answers per length")
+    parser.add_argument("--answers-file", default=None, help="Real answers, one per line")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    translator = HindiEnglishTranslator()
+    print(f"🔤 Translator with partial-match indexes built in {1000 * (time.perf_counter() - start):.1f} ms")
+    print(f"{'answers':>12} {'words':>7} {'scan ms':>9} {'index ms':>9} {'speedup':>9} {'identical':>10}")
+
+    if args.answers_file:
+        with open(args.answers_file, encoding="utf-8") as f:
+            answers = [line.strip() for line in f if line.strip()]
+        report(translator, "file", answers)
+    else:
+        for n_words in args.words:
+            report(translator, "synthetic", synthetic_answers(translator, args.answers, n_words))
+
+    print("ℹ️ 'identical': share of answers where the first scanned key and the longest match agree")
+
+
+if __name__ == "__main__":
+    main()
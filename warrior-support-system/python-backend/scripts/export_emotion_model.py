@@ -0,0 +1,117 @@
+"""
+Export the facial analyzer's EmotionCNN to ONNX (and optionally static int8)
+Writes models/weights/emotion_model.onnx and emotion_model.int8.onnx next to
+emotion_model.pth, then reports agreement and speed against eager PyTorch
+
+Usage:
+    python scripts/export_emotion_model.py
+    python scripts/export_emotion_model.py --int8 --calibration-dir recordings/frames/
+"""
+
+import sys
+import os
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from models.emotion_runtime import (
+    EMOTION_ONNX_PATHS, EMOTION_WEIGHTS_PATH, OnnxEmotionModel,
+    export_emotion_onnx, preprocess_faces, quantize_emotion_onnx
+)
+from models.facial_behavior_analyzer import FACE_DETECTION_PARAMS
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".img"}
+FACE_CROP_MAX_SIDE = 96  # images this small are taken as ready-made face crops
+
+
+def load_calibration_faces(calibration_dir: str, max_faces: int) -> list:
+    """Grayscale face crops from a directory of frames (Haar-detected) or face crop images"""
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    faces = []
+    for path in sorted(Path(calibration_dir).rglob("*")):
+        if path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        gray = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            continue
+        if max(gray.shape) <= FACE_CROP_MAX_SIDE:
+            faces.append(gray)
+        else:
+            faces.extend(gray[y:y+h, x:x+w] for (x, y, w, h) in cascade.detectMultiScale(gray, **FACE_DETECTION_PARAMS))
+        if len(faces) >= max_faces:
+            break
+    return faces[:max_faces]
+
+
+def time_model(run, batch: np.ndarray, repeats: int = 20) -> float:
+    """Best-of-N milliseconds per face for one batch"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run(batch)
+        best = min(best, time.perf_counter() - start)
+    return 1000 * best / len(batch)
+
+
+def report(faces: list, int8: bool):
+    import torch
+    from models.emotion_cnn import EmotionCNN
+
+    model = EmotionCNN(num_classes=7)
+    if EMOTION_WEIGHTS_PATH.exists():
+        model.load_state_dict(torch.load(EMOTION_WEIGHTS_PATH, map_location="cpu"))
+    model.eval()
+
+    def run_torch(batch):
+        with torch.no_grad():
+            return model(torch.from_numpy(batch)).numpy()
+
+    batch = preprocess_faces(faces)
+    reference = run_torch(batch)
+    backends = [("torch", run_torch), ("onnx", OnnxEmotionModel(EMOTION_ONNX_PATHS["onnx"]))]
+    if int8:
+        backends.append(("onnx-int8", OnnxEmotionModel(EMOTION_ONNX_PATHS["onnx-int8"])))
+
+    print(f"🎭 EmotionCNN backends on {len(faces)} faces (reference: eager PyTorch)")
+    print(f"{'backend':>10} {'ms/face':>8} {'argmax agree':>13} {'max |Δp|':>9}")
+    for name, run in backends:
+        probabilities = run(batch)
+        agree = float(np.mean(probabilities.argmax(axis=1) == reference.argmax(axis=1)))
+        print(f"{name:>10} {time_model(run, batch):>8.3f} {agree:>13.3f} {np.abs(probabilities - reference).max():>9.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export EmotionCNN to ONNX Runtime")
+    parser.add_argument("--int8", action="store_true", help="Also write the static int8 model")
+    parser.add_argument("--calibration-dir", default=None,
+                        help="Frames or face crops from real recordings (required for --int8)")
+    parser.add_argument("--max-faces", type=int, default=500)
+    args = parser.parse_args()
+
+    faces = load_calibration_faces(args.calibration_dir, args.max_faces) if args.calibration_dir else []
+    if args.int8 and not faces:
+        print("❌ --int8 needs --calibration-dir with frames or face crops containing faces")
+        return
+
+    onnx_path = export_emotion_onnx()
+    print(f"✅ ONNX model: {onnx_path}")
+
+    if args.int8:
+        int8_path = quantize_emotion_onnx(faces)
+        print(f"✅ int8 model: {int8_path} (calibrated on {len(faces)} faces)")
+
+    if not faces:
+        # Agreement/speed check on noise when no real faces were given
+        rng = np.random.default_rng(0)
+        faces = [rng.integers(0, 256, (64, 64), dtype=np.uint8) for _ in range(64)]
+    report(faces, args.int8)
+
+
+if __name__ == "__main__":
+    main()
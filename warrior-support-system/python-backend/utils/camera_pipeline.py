@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Threaded camera pipeline for live facial analysis
+A capture thread keeps only the newest camera frame and an analysis thread
+always works on the newest one, so a slow analysis or UI step drops stale
+frames instead of delaying everything behind it
+"""
+
+import threading
+import time
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LatestFrameCapture:
+    """
+    Reads a cv2.VideoCapture on a background thread, holding only the latest frame
+
+    ``seq`` numbers every captured frame, so consumers can tell how many
+    frames they skipped. ``ended`` is set when the camera stops delivering.
+    """
+
+    def __init__(self, cap):
+        self.cap = cap
+        self.seq = 0
+        self.ended = False
+        self._frame: Optional[np.ndarray] = None
+        self._stopped = False
+        self._new_frame = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="camera-capture", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            ret, frame = self.cap.read()
+            with self._new_frame:
+                if not ret:
+                    self.ended = True
+                else:
+                    self._frame = frame
+                    self.seq += 1
+                self._new_frame.notify_all()
+            if not ret:
+                break
+
+    def latest(self, after_seq: int, timeout: float = 0.5) -> Tuple[int, Optional[np.ndarray]]:
+        """Newest frame captured after ``after_seq`` as (seq, frame); frame is None on timeout or end"""
+        with self._new_frame:
+            self._new_frame.wait_for(lambda: self.seq > after_seq or self.ended or self._stopped, timeout)
+            if self.seq > after_seq:
+                return self.seq, self._frame
+            return self.seq, None
+
+    def stop(self):
+        with self._new_frame:
+            self._stopped = True
+            self._new_frame.notify_all()
+        self._thread.join(timeout=2.0)
+
+
+class FrameAnalysisWorker:
+    """
+    Runs ``analyse_fn`` on the newest captured frame, skipping any it fell behind on
+
+    ``latest`` holds (seq, frame, result) of the most recently analysed frame
+    for the UI to display at its own rate. ``on_skip(n_skipped)`` is called on
+    the analysis thread before a frame that follows skipped ones, e.g. to
+    reset a face tracker that assumes consecutive frames.
+    """
+
+    def __init__(self, capture: LatestFrameCapture, analyse_fn: Callable[[np.ndarray], object],
+                 on_skip: Optional[Callable[[int], None]] = None):
+        self.capture = capture
+        self.analyse_fn = analyse_fn
+        self.on_skip = on_skip
+        self.latest: Optional[Tuple[int, np.ndarray, object]] = None
+        self.analysed = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._last_seq = 0
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="frame-analysis", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            seq, frame = self.capture.latest(self._last_seq)
+            if frame is None:
+                if self.capture.ended:
+                    break
+                continue
+
+            skipped = seq - self._last_seq - 1
+            self._last_seq = seq
+            try:
+                if skipped > 0 and self.on_skip is not None:
+                    self.on_skip(skipped)
+                result = self.analyse_fn(frame)
+            except Exception as e:
+                logger.error(f"❌ Live frame analysis failed: {e}")
+                continue
+            self.analysed += 1
+            self.latest = (seq, frame, result)
+
+    @property
+    def done(self) -> bool:
+        return not self._thread.is_alive()
+
+    def stop(self):
+        """Finish the frame in progress and stop"""
+        self._stopped = True
+        self._thread.join(timeout=5.0)
+        self.finished_at = time.time()
+
+    def stats(self) -> Dict:
+        """Captured/analysed/dropped frame counts and the achieved analysis rate"""
+        elapsed = max((self.finished_at or time.time()) - self.started_at, 1e-6)
+        return {
+            "frames_captured": self.capture.seq,
+            "frames_analyzed": self.analysed,
+            "frames_dropped": self.capture.seq - self.analysed,
+            "analysis_fps": round(self.analysed / elapsed, 2)
+        }
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Reduced-resolution face detection helpers
+Cascade detection cost grows with pixel count, so frames are detected at a
+fixed width and the boxes mapped back to the original frame, where the face
+crops are taken at full resolution
+
+Downscaling is opt-in: the cascade cannot find faces smaller than its base
+window, so at scale s the smallest detectable face grows to window / s pixels
+of the original frame (48 px at 640 -> 320)
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+DEFAULT_DETECTION_WIDTH = None  # full-resolution detection; set a width in pixels to downscale wider frames
+CASCADE_WINDOW = (24, 24)  # base window of haarcascade_frontalface_default, the smallest face it detects
+
+
+def downscale_for_detection(gray: np.ndarray, detection_width: Optional[int]) -> Tuple[np.ndarray, float]:
+    """Frame to run detection on and its scale relative to ``gray`` (1.0 if not downscaled)"""
+    height, width = gray.shape[:2]
+    if not detection_width or width <= detection_width:
+        return gray, 1.0
+
+    scale = detection_width / width
+    small = cv2.resize(gray, (detection_width, max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+    return small, scale
+
+
+def scale_detection_params(params: Dict, scale: float) -> Dict:
+    """
+    detectMultiScale parameters with minSize/maxSize rescaled to a downscaled frame
+
+    minSize is clamped to CASCADE_WINDOW, since smaller sizes are never searched;
+    see min_face_size for the resulting limit in the original frame.
+    """
+    if scale == 1.0:
+        return params
+    scaled = dict(params)
+    for key in ('minSize', 'maxSize'):
+        if key in scaled:
+            scaled[key] = tuple(max(window, round(v * scale)) for v, window in zip(scaled[key], CASCADE_WINDOW))
+    return scaled
+
+
+def min_face_size(params: Dict, scale: float) -> Tuple[int, int]:
+    """Smallest face (w, h) in the original frame that detection at ``scale`` can find"""
+    min_size = params.get('minSize', CASCADE_WINDOW)
+    return tuple(max(v, round(window / scale)) for v, window in zip(min_size, CASCADE_WINDOW))
+
+
+def upscale_boxes(faces, scale: float, shape: Tuple[int, ...]) -> np.ndarray:
+    """Map (x, y, w, h) boxes from a downscaled frame back onto a frame of ``shape``, clipped to it"""
+    if scale == 1.0:
+        return faces
+    boxes = np.round(np.asarray(faces, dtype=np.float64).reshape(-1, 4) / scale).astype(np.int32)
+    height, width = shape[:2]
+    boxes[:, 0] = np.clip(boxes[:, 0], 0, width - 1)
+    boxes[:, 1] = np.clip(boxes[:, 1], 0, height - 1)
+    boxes[:, 2] = np.minimum(boxes[:, 2], width - boxes[:, 0])
+    boxes[:, 3] = np.minimum(boxes[:, 3], height - boxes[:, 1])
+    return boxes
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Detect-once-then-track face localisation for video streams
+Runs the full (expensive) cascade detector every N frames or when a track
+is lost, and follows each face box in between with template matching in a
+small search window around its last position
+"""
+
+import cv2
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+
+Box = Tuple[int, int, int, int]
+
+TRACK_TEMPLATE_WIDTH = 48  # faces are matched at roughly this width in pixels
+
+
+def box_iou(a: Box, b: Box) -> float:
+    """Intersection over union of two (x, y, w, h) boxes"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    overlap_x = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    overlap_y = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = overlap_x * overlap_y
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+class FaceTracker:
+    """
+    Wraps a full-frame face detector with cheap frame-to-frame tracking
+
+    Args:
+        detect_fn: Full detector, called with the frame passed to ``update``
+            and returning (x, y, w, h) boxes
+        detect_interval: Run full detection at least every this many frames
+        search_margin: Search window padding around the last box, as a
+            fraction of its size
+        min_match_score: Normalized cross-correlation below which a track
+            counts as lost (forcing a full detection on that frame)
+
+    One tracker follows one video stream; keep a separate instance per
+    camera or session.
+    """
+
+    def __init__(self, detect_fn: Callable[[np.ndarray], List[Box]], detect_interval: int = 10,
+                 search_margin: float = 0.5, min_match_score: float = 0.6):
+        self.detect_fn = detect_fn
+        self.detect_interval = max(1, detect_interval)
+        self.search_margin = search_margin
+        self.min_match_score = min_match_score
+
+        self._templates: List[Tuple[Box, np.ndarray]] = []
+        self._since_detection = 0
+        self.frames = 0
+        self.detections = 0
+        self.track_losses = 0
+
+    def reset(self):
+        """Forget current tracks; the next frame runs full detection"""
+        self._templates = []
+        self._since_detection = 0
+
+    def update(self, frame: np.ndarray) -> List[Box]:
+        """Face boxes for the next frame of the stream"""
+        self.frames += 1
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        if self._templates and self._since_detection < self.detect_interval - 1:
+            boxes = self._track(gray)
+            if boxes is not None:
+                self._since_detection += 1
+                return boxes
+            self.track_losses += 1
+
+        return self._detect(frame, gray)
+
+    def _detect(self, frame: np.ndarray, gray: np.ndarray) -> List[Box]:
+        boxes = [tuple(int(v) for v in box) for box in self.detect_fn(frame)]
+        self.detections += 1
+        self._since_detection = 0
+        self._templates = [(box, gray[box[1]:box[1] + box[3], box[0]:box[0] + box[2]].copy()) for box in boxes]
+        return boxes
+
+    def _track(self, gray: np.ndarray) -> Optional[List[Box]]:
+        """Relocate every tracked face, or None if any of them is lost"""
+        frame_h, frame_w = gray.shape[:2]
+        tracked = []
+
+        for (x, y, w, h), template in self._templates:
+            pad_x, pad_y = int(w * self.search_margin), int(h * self.search_margin)
+            x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+            x1, y1 = min(frame_w, x + w + pad_x), min(frame_h, y + h + pad_y)
+            window = gray[y0:y1, x0:x1]
+            if window.shape[0] < h or window.shape[1] < w:
+                return None
+
+            # Match at reduced resolution; correlation cost scales with template area
+            scale = min(1.0, TRACK_TEMPLATE_WIDTH / w)
+            if scale < 1.0:
+                small_window = cv2.resize(window, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                template_size = (max(1, round(w * scale)), max(1, round(h * scale)))
+                small_template = cv2.resize(template, template_size, interpolation=cv2.INTER_AREA)
+                if (small_window.shape[0] < small_template.shape[0]
+                        or small_window.shape[1] < small_template.shape[1]):
+                    return None
+            else:
+                small_window, small_template = window, template
+
+            result = cv2.matchTemplate(small_window, small_template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, location = cv2.minMaxLoc(result)
+            if score < self.min_match_score:
+                return None
+
+            new_x = x0 + int(round(location[0] / scale))
+            new_y = y0 + int(round(location[1] / scale))
+            new_x = min(max(new_x, 0), frame_w - w)
+            new_y = min(max(new_y, 0), frame_h - h)
+            tracked.append(((new_x, new_y, w, h), gray[new_y:new_y + h, new_x:new_x + w].copy()))
+
+        self._templates = tracked
+        return [box for box, _ in tracked]
+
+    def stats(self) -> Dict:
+        return {
+            "frames": self.frames,
+            "detections": self.detections,
+            "track_losses": self.track_losses,
+            "detection_ratio": round(self.detections / self.frames, 3) if self.frames else 0.0
+        }
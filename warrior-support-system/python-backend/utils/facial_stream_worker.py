@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Background facial analysis for streamed session frames
+Analyses frames as /api/stream_frame receives them and keeps running stress
+aggregates per session, so /api/final_score only has to finalize
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.frame_store import SessionFrameStore
+from utils.stress_aggregation import StressAggregate
+
+logger = logging.getLogger(__name__)
+
+# frames_fn(analyzer, gray_frames, face_tracker or None, analyzer_state)
+#     -> [(stress_score, dominant_emotions, mean_confidence or None), ...]
+FrameScoreFn = Callable[[object, List[np.ndarray], object, object], List[Tuple[float, List[str], Optional[float]]]]
+
+STREAM_BATCH_FRAMES = 16  # frames scored together (one batched emotion CNN pass)
+
+
+class FacialStreamWorker:
+    """
+    Single background thread that drains pending frames from a SessionFrameStore
+
+    Pending frames are scored in batches of up to ``batch_size``, folded
+    into the session's StressAggregate (``FrameSession.analysis``) and released
+    from the store. One preloaded analyzer serves every session; each session
+    gets its own analyzer state (``analyzer.create_session_state``).
+
+    With ``track_interval`` > 0 each session gets its own face tracker
+    (``analyzer.create_face_tracker``): full detection every that many frames,
+    template tracking in between. Frames of a session arrive in order, so
+    its tracker sees them as one stream.
+    """
+
+    def __init__(self, frame_store: SessionFrameStore, analyzer, frames_fn: FrameScoreFn,
+                 batch_size: int = STREAM_BATCH_FRAMES, track_interval: int = 0):
+        self.frame_store = frame_store
+        self.batch_size = batch_size
+        self.track_interval = track_interval
+        self.analyzer = analyzer
+        self.frames_fn = frames_fn
+
+        self.frames_analysed = 0
+        self.analysis_time = 0.0
+
+        self._notifications: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._progress = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="facial-stream-worker", daemon=True)
+        self._thread.start()
+
+    def notify(self, session_id: str):
+        """Signal that a session has new frames to analyse"""
+        self._notifications.put(session_id)
+
+    def _run(self):
+        while True:
+            session_id = self._notifications.get()
+            if session_id is None:
+                break
+            try:
+                self._analyse_pending(session_id)
+            except Exception as e:
+                logger.error(f"❌ Facial stream analysis failed for session {session_id}: {e}")
+
+    def _analyse_pending(self, session_id: str):
+        session = self.frame_store.get_session(session_id)
+        frames = self.frame_store.take_frames(session_id)
+        if session is None or not frames:
+            return
+
+        # Taken frames always count as analysed, even when scoring fails or is
+        # unavailable, so wait_until_analysed never waits on frames that are gone
+        counted = 0
+        try:
+            if self.analyzer is None:
+                logger.warning(f"⚠️ No facial analyzer, {len(frames)} frames of session {session_id} not scored")
+                return
+
+            if session.analysis is None:
+                session.analysis = StressAggregate()
+            if session.analyzer_state is None:
+                session.analyzer_state = self.analyzer.create_session_state()
+            if self.track_interval > 0 and session.face_tracker is None:
+                session.face_tracker = self.analyzer.create_face_tracker(self.track_interval)
+
+            for start_idx in range(0, len(frames), self.batch_size):
+                batch = frames[start_idx:start_idx + self.batch_size]
+                # Spilled frames that could not be read back count as analysed but score nothing
+                readable = [frame for frame in batch if frame is not None]
+
+                start = time.perf_counter()
+                try:
+                    for stress, emotions, confidence in self.frames_fn(self.analyzer, readable, session.face_tracker, session.analyzer_state):
+                        session.analysis.add(stress, emotions, confidence)
+                except Exception as e:
+                    logger.error(f"❌ Frame analysis error in session {session_id}: {e}")
+                self.analysis_time += time.perf_counter() - start
+                self.frames_analysed += len(batch)
+
+                self._mark_analysed(session, len(batch))
+                counted += len(batch)
+        finally:
+            if counted < len(frames):
+                self._mark_analysed(session, len(frames) - counted)
+
+    def _mark_analysed(self, session, n_frames: int):
+        with self._progress:
+            session.analysed += n_frames
+            self._progress.notify_all()
+
+    def wait_until_analysed(self, session_id: str, timeout: Optional[float] = None) -> bool:
+        """Block until every frame received so far for the session is analysed"""
+        session = self.frame_store.get_session(session_id)
+        if session is None:
+            return False
+        with self._progress:
+            return self._progress.wait_for(lambda: session.analysed >= session.received, timeout)
+
+    def stats(self) -> Dict:
+        return {
+            "frames_analysed": self.frames_analysed,
+            "backlog_notifications": self._notifications.qsize(),
+            "mean_frame_ms": round(1000 * self.analysis_time / self.frames_analysed, 2) if self.frames_analysed else 0.0
+        }
+
+    def shutdown(self):
+        self._notifications.put(None)
+        self._thread.join(timeout=5.0)
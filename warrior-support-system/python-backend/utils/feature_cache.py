@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Persistent voice feature cache keyed by decoded audio content
+Re-submitted recordings (retries, re-scoring after weight changes, admin
+re-reviews) are served from SQLite instead of re-running feature extraction
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / "models_cache" / "voice_features.sqlite3"
+DEFAULT_MAX_MB = 256
+
+
+def audio_content_hash(audio: np.ndarray, sr: int) -> str:
+    """SHA-256 of the decoded PCM (float32) and its sample rate"""
+    pcm = np.ascontiguousarray(audio, dtype=np.float32)
+    digest = hashlib.sha256(str(int(sr)).encode())
+    digest.update(pcm.tobytes())
+    return digest.hexdigest()
+
+
+def _to_builtin(value):
+    """numpy scalars / arrays -> JSON-serializable Python values"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class VoiceFeatureCache:
+    """
+    SQLite-backed LRU cache of feature dicts
+
+    Entries are keyed by (audio content hash, extractor version), so changing
+    the pitch backend, Wav2Vec2 backbone or feature code never serves stale
+    values. When the stored payloads exceed ``max_mb`` the least recently
+    used entries are evicted. Safe to share between worker threads.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_CACHE_PATH, max_mb: float = DEFAULT_MAX_MB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS voice_features (
+                audio_hash TEXT NOT NULL,
+                extractor_version TEXT NOT NULL,
+                features TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (audio_hash, extractor_version)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_voice_features_access ON voice_features (last_access)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lookup_time = 0.0
+
+    def get(self, audio_hash: str, extractor_version: str) -> Optional[Dict]:
+        """Cached feature dict, or None on a miss"""
+        start = time.perf_counter()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT features FROM voice_features WHERE audio_hash = ? AND extractor_version = ?",
+                (audio_hash, extractor_version)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._conn.execute(
+                    "UPDATE voice_features SET last_access = ? WHERE audio_hash = ? AND extractor_version = ?",
+                    (time.time(), audio_hash, extractor_version)
+                )
+                self._conn.commit()
+            self._lookup_time += time.perf_counter() - start
+
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, audio_hash: str, extractor_version: str, features: Dict):
+        """Store a feature dict and evict least recently used entries over budget"""
+        payload = json.dumps({k: _to_builtin(v) for k, v in features.items()})
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO voice_features VALUES (?, ?, ?, ?, ?, ?)",
+                (audio_hash, extractor_version, payload, len(payload), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM voice_features").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT audio_hash, extractor_version, size_bytes FROM voice_features ORDER BY last_access"
+        ).fetchall()
+        victims = []
+        for audio_hash, extractor_version, size_bytes in rows:
+            if total <= self.max_bytes:
+                break
+            victims.append((audio_hash, extractor_version))
+            total -= size_bytes
+
+        self._conn.executemany(
+            "DELETE FROM voice_features WHERE audio_hash = ? AND extractor_version = ?", victims
+        )
+        self.evictions += len(victims)
+        logger.info(f"🧹 Evicted {len(victims)} cached voice feature entries")
+
+    def purge_stale(self, extractor_version: str) -> int:
+        """Drop entries written by any other extractor version"""
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM voice_features WHERE extractor_version != ?", (extractor_version,)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM voice_features")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Hit-rate and size metrics for /health"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM voice_features"
+            ).fetchone()
+            lookups = self.hits + self.misses
+
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "size_mb": round(size / 1024 / 1024, 2),
+            "max_mb": round(self.max_bytes / 1024 / 1024, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "mean_lookup_ms": round(1000 * self._lookup_time / lookups, 3) if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Bounded in-memory frame store for streamed facial analysis sessions
+Keeps decoded grayscale frames per session under a global byte budget until
+they are analysed, spilling the original uploads to disk only when the
+budget is exhausted and dropping sessions that stop sending frames
+"""
+
+import os
+import re
+import hashlib
+import shutil
+import threading
+import time
+import logging
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_MB = 512
+DEFAULT_SESSION_TTL = 600  # seconds without a new frame before a session is dropped
+
+
+class FrameSession:
+    """
+    Frames of one streaming session: grayscale arrays in memory or spilled file paths
+
+    ``frames`` holds frames not yet taken by a consumer; ``received`` counts
+    every frame uploaded. ``analysis`` carries the consumer's running results,
+    ``face_tracker`` and ``analyzer_state`` its per-stream tracking and
+    analyzer history, if any.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.frames: List[Union[np.ndarray, str]] = []
+        self.received = 0
+        self.analysed = 0
+        self.analysis = None
+        self.face_tracker = None
+        self.analyzer_state = None
+        self.memory_bytes = 0
+        self.spilled = 0
+        self.duration = 0
+        self.created_at = time.time()
+        self.last_seen = self.created_at
+
+    def __len__(self) -> int:
+        return self.received
+
+
+class SessionFrameStore:
+    """
+    Per-session frame buffers shared by /api/stream_frame and /api/final_score
+
+    Frames are decoded once on upload straight to grayscale (all the facial
+    analyzers work on grayscale), which is a third of the BGR footprint. While
+    the total stays under ``max_mb`` nothing touches the disk; frames arriving
+    past the budget are written as the original encoded upload under
+    ``spill_dir/<session_id>/`` and decoded again when read back.
+    """
+
+    def __init__(self, max_mb: float = DEFAULT_MAX_MB, session_ttl: float = DEFAULT_SESSION_TTL,
+                 spill_dir: str = "sessions"):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.session_ttl = session_ttl
+        self.spill_dir = spill_dir
+        self.sessions: Dict[str, FrameSession] = {}
+        self.memory_bytes = 0
+        self.expired_sessions = 0
+        self._lock = threading.Lock()
+
+    def add_frame(self, session_id: str, data: bytes, duration: Optional[int] = None) -> int:
+        """Decode and store one uploaded frame; returns the session's frame count"""
+        gray = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            raise ValueError("Could not decode frame image")
+
+        self.evict_expired()
+
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = self.sessions[session_id] = FrameSession(session_id)
+
+            if self.memory_bytes + gray.nbytes <= self.max_bytes:
+                session.frames.append(gray)
+                session.memory_bytes += gray.nbytes
+                self.memory_bytes += gray.nbytes
+            else:
+                session.frames.append(self._spill(session, data))
+                session.spilled += 1
+
+            session.received += 1
+            if duration is not None:
+                session.duration = duration
+            session.last_seen = time.time()
+            return len(session)
+
+    def _session_dir(self, session_id: str) -> str:
+        """Spill directory of a session: readable prefix plus a hash of the exact id, so ids never share one"""
+        readable = re.sub(r"[^A-Za-z0-9_-]", "_", session_id)[:40]
+        digest = hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.spill_dir, f"{readable}-{digest}")
+
+    def _spill(self, session: FrameSession, data: bytes) -> str:
+        session_dir = self._session_dir(session.session_id)
+        os.makedirs(session_dir, exist_ok=True)
+        file_path = os.path.join(session_dir, f"{len(session):06d}.img")
+        with open(file_path, "wb") as f:
+            f.write(data)
+        if session.spilled == 0:
+            logger.warning(f"⚠️ Frame store over budget, spilling session {session.session_id} to {session_dir}")
+        return file_path
+
+    def get_session(self, session_id: str) -> Optional[FrameSession]:
+        with self._lock:
+            return self.sessions.get(session_id)
+
+    def frame_count(self, session_id: str) -> int:
+        session = self.get_session(session_id)
+        return len(session) if session else 0
+
+    def take_frames(self, session_id: str) -> List[Optional[np.ndarray]]:
+        """
+        Remove and return a session's pending frames, releasing their memory and spill files
+
+        Spilled frames that can no longer be decoded come back as None so the
+        caller can still account for them.
+        """
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None or not session.frames:
+                return []
+            pending, session.frames = session.frames, []
+            freed = sum(f.nbytes for f in pending if isinstance(f, np.ndarray))
+            session.memory_bytes -= freed
+            self.memory_bytes -= freed
+
+        frames = []
+        for frame in pending:
+            if isinstance(frame, str):
+                path, frame = frame, cv2.imread(frame, cv2.IMREAD_GRAYSCALE)
+                os.unlink(path)
+            frames.append(frame)
+        return frames
+
+    def drop_session(self, session_id: str) -> bool:
+        """Release a session's memory and delete any spilled frames"""
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+            if session is None:
+                return False
+            self.memory_bytes -= session.memory_bytes
+
+        if session.spilled:
+            shutil.rmtree(self._session_dir(session_id), ignore_errors=True)
+        return True
+
+    def evict_expired(self) -> int:
+        """Drop sessions that have not received a frame within the TTL"""
+        cutoff = time.time() - self.session_ttl
+        with self._lock:
+            expired = [sid for sid, s in self.sessions.items() if s.last_seen < cutoff]
+
+        for session_id in expired:
+            if self.drop_session(session_id):
+                self.expired_sessions += 1
+                logger.info(f"🧹 Dropped abandoned frame session {session_id}")
+        return len(expired)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self.sessions),
+                "frames": sum(len(s) for s in self.sessions.values()),
+                "pending_frames": sum(len(s.frames) for s in self.sessions.values()),
+                "spilled_frames": sum(s.spilled for s in self.sessions.values()),
+                "memory_mb": round(self.memory_bytes / 1024 / 1024, 2),
+                "max_mb": round(self.max_bytes / 1024 / 1024, 2),
+                "expired_sessions": self.expired_sessions
+            }
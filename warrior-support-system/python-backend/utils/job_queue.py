@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Bounded background job queue for long-running audio processing
+Lets FastAPI endpoints hand Whisper transcription and voice analysis to a
+worker pool and return immediately with a job id
+"""
+
+import logging
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+class AudioJob:
+    """
+    Single unit of work tracked by AudioJobQueue
+    Records status, per-stage timings and the final result or error
+    """
+
+    def __init__(self, job_id: str, kind: str):
+        self.job_id = job_id
+        self.kind = kind
+        self.status = JOB_QUEUED
+        self.current_stage: Optional[str] = None
+        self.stage_timings: Dict[str, float] = {}
+        self.result = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a named processing stage (e.g. 'transcription', 'voice_analysis')"""
+        self.current_stage = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stage_timings[name] = round(self.stage_timings.get(name, 0.0) + elapsed, 4)
+            self.current_stage = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JOB_COMPLETED, JOB_FAILED)
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        """Serialize job state for polling / SSE responses"""
+        wait_time = None
+        if self.started_at is not None:
+            wait_time = round(self.started_at - self.submitted_at, 4)
+
+        run_time = None
+        if self.started_at is not None and self.finished_at is not None:
+            run_time = round(self.finished_at - self.started_at, 4)
+
+        data = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "current_stage": self.current_stage,
+            "stage_timings": dict(self.stage_timings),
+            "queue_wait_time": wait_time,
+            "processing_time": run_time,
+            "submitted_at": datetime.fromtimestamp(self.submitted_at).isoformat(),
+        }
+
+        if include_result:
+            if self.status == JOB_COMPLETED:
+                data["result"] = self.result
+            elif self.status == JOB_FAILED:
+                data["error"] = self.error
+
+        return data
+
+
+class AudioJobQueue:
+    """
+    Bounded worker pool for audio jobs
+
+    Jobs are executed on a fixed number of threads (Whisper / torch release
+    the GIL during inference). Submissions beyond ``max_pending`` waiting jobs
+    are rejected with ``queue.Full`` so a burst of uploads cannot grow memory
+    without limit. Finished jobs are kept for ``result_ttl`` seconds so
+    clients can poll for results.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 50, result_ttl: float = 900.0):
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(1, int(max_pending))
+        self.result_ttl = result_ttl
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="audio-job")
+        self._jobs: Dict[str, AudioJob] = {}
+        self._lock = threading.Lock()
+
+        # Aggregate counters for /health and queue stats
+        self._completed = 0
+        self._failed = 0
+        self._stage_totals: Dict[str, float] = {}
+        self._stage_counts: Dict[str, int] = {}
+        self._wait_total = 0.0
+
+        logger.info(f"🧵 Audio job queue started with {self.max_workers} workers (max pending: {self.max_pending})")
+
+    def submit(self, func: Callable, *args, kind: str = "audio", **kwargs) -> AudioJob:
+        """
+        Queue ``func(job, *args, **kwargs)`` for execution
+
+        Raises:
+            queue.Full: if too many jobs are already waiting
+        """
+        self._expire_finished()
+
+        with self._lock:
+            if self._count_status(JOB_QUEUED) >= self.max_pending:
+                raise queue.Full(f"Audio job queue is full ({self.max_pending} jobs waiting)")
+
+            job = AudioJob(uuid.uuid4().hex, kind)
+            self._jobs[job.job_id] = job
+
+        job.future = self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def get(self, job_id: str) -> Optional[AudioJob]:
+        """Return a tracked job or None if unknown / expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a free worker"""
+        with self._lock:
+            return self._count_status(JOB_QUEUED)
+
+    def stats(self) -> Dict:
+        """Queue depth, worker utilisation and average per-stage timings"""
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "queue_depth": self._count_status(JOB_QUEUED),
+                "running": self._count_status(JOB_RUNNING),
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_queue_wait_time": round(self._wait_total / finished, 4) if finished else 0.0,
+                "avg_stage_timings": {
+                    name: round(total / self._stage_counts[name], 4)
+                    for name, total in self._stage_totals.items()
+                },
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting work and release worker threads"""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: AudioJob, func: Callable, args: tuple, kwargs: Dict):
+        job.started_at = time.time()
+        job.status = JOB_RUNNING
+
+        try:
+            job.result = func(job, *args, **kwargs)
+            job.status = JOB_COMPLETED
+        except Exception as e:
+            logger.error(f"❌ Audio job {job.job_id} failed: {e}")
+            job.error = str(e)
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = time.time()
+            self._record(job)
+
+        if job.status == JOB_FAILED:
+            raise RuntimeError(job.error)
+        return job.result
+
+    def _record(self, job: AudioJob):
+        with self._lock:
+            if job.status == JOB_COMPLETED:
+                self._completed += 1
+            else:
+                self._failed += 1
+
+            self._wait_total += job.started_at - job.submitted_at
+            for name, elapsed in job.stage_timings.items():
+                self._stage_totals[name] = self._stage_totals.get(name, 0.0) + elapsed
+                self._stage_counts[name] = self._stage_counts.get(name, 0) + 1
+
+    def _count_status(self, status: str) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == status)
+
+    def _expire_finished(self):
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired: List[str] = [
+                job_id for job_id, job in self._jobs.items()
+                if job.is_finished and job.finished_at is not None and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Multi-pattern keyword index for the mental health keyword matchers
+All keywords of all categories go into one Aho-Corasick automaton, so a text
+is scanned once for every keyword instead of once per keyword
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+DEVANAGARI_START, DEVANAGARI_END = "\u0900", "\u097F"
+DEVANAGARI_DANDAS = "\u0964\u0965"    # sentence punctuation, not part of words
+ZERO_WIDTH_JOINERS = "\u200C\u200D"   # used inside Devanagari conjuncts
+
+
+class KeywordHit(NamedTuple):
+    category: str
+    keyword: str
+    start: int
+    end: int
+
+
+def is_word_char(ch: str) -> bool:
+    """
+    Word character for keyword boundaries
+
+    Unlike regex ``\\b``, Devanagari vowel signs, virama and nukta count as
+    part of the word, so a keyword ending in a matra (चिंता) still matches
+    and a prefix of a longer word (डर in डराना) does not.
+    """
+    if DEVANAGARI_START <= ch <= DEVANAGARI_END:
+        return ch not in DEVANAGARI_DANDAS
+    return ch.isalnum() or ch == "_" or ch in ZERO_WIDTH_JOINERS
+
+
+class KeywordIndex:
+    """
+    Aho-Corasick automaton over categorized keywords
+
+    A keyword may belong to several categories. With ``whole_words`` a hit
+    only counts when it is not glued to other word characters (see
+    is_word_char); without it every substring occurrence counts, matching
+    ``keyword in text``. Matching is case-insensitive unless ``case_sensitive``.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], whole_words: bool = True,
+                 case_sensitive: bool = False):
+        self.whole_words = whole_words
+        self.case_sensitive = case_sensitive
+        self.keywords: List[str] = []                  # keyword id -> keyword
+        self.keyword_categories: List[List[str]] = []  # keyword id -> categories
+        self._category_keyword_ids: Dict[str, List[int]] = {}
+
+        keyword_ids: Dict[str, int] = {}
+        for category, keywords in categories.items():
+            category_ids = self._category_keyword_ids.setdefault(category, [])
+            for keyword in keywords:
+                key = self._normalize(keyword)
+                if not key:
+                    continue
+                if key not in keyword_ids:
+                    keyword_ids[key] = len(self.keywords)
+                    self.keywords.append(keyword)
+                    self.keyword_categories.append([])
+                keyword_id = keyword_ids[key]
+                if keyword_id not in category_ids:
+                    category_ids.append(keyword_id)
+                    self.keyword_categories[keyword_id].append(category)
+
+        self._build([self._normalize(keyword) for keyword in self.keywords])
+
+    def _normalize(self, text: str) -> str:
+        return text if self.case_sensitive else text.lower()
+
+    def _build(self, patterns: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, int]]] = [[]]  # state -> [(keyword id, length)]
+
+        for keyword_id, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((keyword_id, len(pattern)))
+
+        # Breadth-first failure links (depth-1 states fail to the root);
+        # each state also reports the keywords of its failure state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def _scan_text(self, text: str) -> str:
+        if self.case_sensitive:
+            return text
+        lowered = text.lower()
+        # Keep positions valid for characters whose lowercase is longer (e.g. 'İ')
+        if len(lowered) != len(text):
+            lowered = "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+        return lowered
+
+    def find(self, text: str) -> List[KeywordHit]:
+        """Every keyword occurrence in ``text`` as (category, keyword, start, end), ordered by end position"""
+        if not text:
+            return []
+
+        scan_text = self._scan_text(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        text_length = len(text)
+        hits = []
+        state = 0
+        for position, ch in enumerate(scan_text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword_id, length in output[state]:
+                end = position + 1
+                start = end - length
+                if self.whole_words and (
+                    (start > 0 and is_word_char(text[start - 1])) or
+                    (end < text_length and is_word_char(text[end]))
+                ):
+                    continue
+                for category in self.keyword_categories[keyword_id]:
+                    hits.append(KeywordHit(category, self.keywords[keyword_id], start, end))
+        return hits
+
+    def find_by_category(self, text: str) -> Dict[str, List[KeywordHit]]:
+        """Hits of ``find`` grouped by category (categories without hits are left out)"""
+        grouped: Dict[str, List[KeywordHit]] = {}
+        for hit in self.find(text):
+            grouped.setdefault(hit.category, []).append(hit)
+        return grouped
+
+    def matched_keywords(self, text: str) -> Dict[str, List[str]]:
+        """
+        Distinct keywords found per category, in the order they were registered
+
+        Every registered category is present, possibly with an empty list; this
+        is the result of testing each keyword with ``in`` (or a word-boundary
+        regex), from one pass over the text.
+        """
+        found = {hit.keyword for hit in self.find(text)}
+        return {
+            category: [self.keywords[i] for i in keyword_ids if self.keywords[i] in found]
+            for category, keyword_ids in self._category_keyword_ids.items()
+        }
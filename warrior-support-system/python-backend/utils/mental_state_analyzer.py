@@ -11,8 +11,13 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from models.mental_health_analyzer import QWarriorMentalHealthAnalyzer
+from models.hindi_sentiment import get_hindi_sentiment_analyzer, is_fallback_result
+from utils.keyword_index import KeywordIndex
+from utils.text_analysis_cache import normalize_text, text_analysis_cache
 from utils.sentiment_analyzer import SentimentAnalyzer
 
+MENTAL_STATE_ANALYSIS_VERSION = "1"  # bump when keywords or state rules change (invalidates cached results)
+
 class MentalStateAnalyzer:
     """
     Local CPU-based mental state analyzer for detecting various mental health conditions
@@ -49,73 +54,91 @@ class MentalStateAnalyzer:
                 "अच्छा", "ठीक", "सामान्य", "स्थिर", "संतुलित", "सकारात्मक"
             ]
         }
+        self.keyword_index = KeywordIndex(self.mental_state_keywords, whole_words=False)
     
-    def analyze_mental_state(self, text: str, language: str = "auto") -> dict:
+    def analyze_mental_state(self, text: str, language: str = "auto", hindi_result: dict = None) -> dict:
         """
         Analyze mental state from text using local models
         
         Args:
             text: Input text to analyze
             language: Language of text ("hindi", "english", or "auto")
+            hindi_result: Precomputed analyze_hindi_sentiment result for the text, if any
             
         Returns:
             Dictionary with mental state analysis results
         """
         try:
-            # Get sentiment analysis first
-            sentiment_result = self.sentiment_analyzer.analyze_sentiment(text, language)
-            
-            # Use QWarrior analyzer for comprehensive analysis
-            qwarrior_result = self.qwarrior_analyzer.analyze_text_sentiment(
-                text, 
-                sentiment_result["language"]
-            )
-            
-            # Detect specific mental states using keywords
-            detected_states = self._detect_mental_states(text)
-            
-            # Determine primary mental state
-            primary_state = self._determine_primary_state(
-                detected_states, 
-                sentiment_result, 
-                qwarrior_result
-            )
-            
-            # Calculate confidence score
-            confidence = self._calculate_confidence(
-                detected_states, 
-                sentiment_result, 
-                qwarrior_result
+            # Memoized per normalized text; fallback results are not cached
+            return text_analysis_cache.get_or_compute(
+                "mental_state", self._cache_version(language), text,
+                lambda normalized: self._analyze_mental_state(normalized, language, hindi_result),
+                cacheable=self._is_cacheable
             )
             
-            return {
-                "detected_states": detected_states,
-                "primary_state": primary_state,
-                "confidence": confidence,
-                "risk_level": qwarrior_result.get("risk_level", "normal"),
-                "risk_score": qwarrior_result.get("risk_score", 0),
-                "sentiment_analysis": sentiment_result,
-                "keywords_found": qwarrior_result.get("keywords", {}),
-                "military_factors": qwarrior_result.get("military_factors", {}),
-                "language": sentiment_result["language"]
-            }
-            
         except Exception as e:
             # Fallback analysis
             return self._fallback_mental_state_analysis(text)
     
+    def _cache_version(self, language: str) -> str:
+        """Analysis code, language hint and sentiment model behind a cached result"""
+        return f"{MENTAL_STATE_ANALYSIS_VERSION}:{language}:{get_hindi_sentiment_analyzer().cache_version}"
+    
+    def _is_cacheable(self, result: dict) -> bool:
+        """Results built on a keyword fallback Hindi sentiment (after a model error) are not cached"""
+        return not is_fallback_result(result["sentiment_analysis"].get("raw_result") or {})
+    
+    def _analyze_mental_state(self, text: str, language: str, hindi_result: dict = None) -> dict:
+        """Uncached analyze_mental_state; raises on failure"""
+        # Get sentiment analysis first
+        sentiment_result = self.sentiment_analyzer.analyze_sentiment(text, language, hindi_result)
+        
+        # Use QWarrior analyzer for comprehensive analysis
+        qwarrior_result = self.qwarrior_analyzer.analyze_text_response(
+            text, 
+            sentiment_result["language"],
+            hindi_result
+        )
+        
+        # Detect specific mental states using keywords
+        detected_states = self._detect_mental_states(text)
+        
+        # Determine primary mental state
+        primary_state = self._determine_primary_state(
+            detected_states, 
+            sentiment_result, 
+            qwarrior_result
+        )
+        
+        # Calculate confidence score
+        confidence = self._calculate_confidence(
+            detected_states, 
+            sentiment_result, 
+            qwarrior_result
+        )
+        
+        return {
+            "detected_states": detected_states,
+            "primary_state": primary_state,
+            "confidence": confidence,
+            "risk_level": qwarrior_result.get("risk_level", "normal"),
+            "risk_score": qwarrior_result.get("risk_score", 0),
+            "sentiment_analysis": sentiment_result,
+            "keywords_found": qwarrior_result.get("keywords", {}),
+            "military_factors": qwarrior_result.get("military_factors", {}),
+            "language": sentiment_result["language"]
+        }
+    
     def _detect_mental_states(self, text: str) -> list:
         """Detect mental states based on keyword matching"""
-        text_lower = text.lower()
         detected_states = []
         
-        for state, keywords in self.mental_state_keywords.items():
-            matches = sum(1 for keyword in keywords if keyword in text_lower)
-            if matches > 0:
+        for state, keywords in self.keyword_index.matched_keywords(text).items():
+            if keywords:
                 detected_states.append({
                     "state": state,
-                    "matches": matches,
-                    "keywords": [kw for kw in keywords if kw in text_lower]
+                    "matches": len(keywords),
+                    "keywords": keywords
                 })
         
         # Sort by number of matches
@@ -186,15 +209,27 @@ class MentalStateAnalyzer:
     
     def analyze_multiple_responses(self, responses: list) -> dict:
         """Analyze multiple responses to get overall mental state"""
-        all_results = []
-        
+        texts = []
         for response in responses:
             if isinstance(response, dict) and "text" in response:
-                result = self.analyze_mental_state(response["text"])
-                all_results.append(result)
+                texts.append(response["text"])
             elif isinstance(response, str):
-                result = self.analyze_mental_state(response)
-                all_results.append(result)
+                texts.append(response)
+        
+        # Cached answers cost nothing; the rest share one batched sentiment model pass
+        version = self._cache_version("auto")
+        all_results = [text_analysis_cache.get("mental_state", version, text) for text in texts]
+        pending = [i for i, result in enumerate(all_results) if result is None]
+        hindi_results = get_hindi_sentiment_analyzer().batch_analyze_sentiment([texts[i] for i in pending])
+        
+        for i, hindi_result in zip(pending, hindi_results):
+            normalized = normalize_text(texts[i])
+            try:
+                all_results[i] = self._analyze_mental_state(normalized, "auto", hindi_result)
+                if self._is_cacheable(all_results[i]):
+                    text_analysis_cache.put("mental_state", version, normalized, all_results[i])
+            except Exception as e:
+                all_results[i] = self._fallback_mental_state_analysis(texts[i])
         
         if not all_results:
             return {"error": "No valid responses to analyze"}
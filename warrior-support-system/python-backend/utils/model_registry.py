@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Process-wide registry of heavy model instances
+Each model is registered with a loader, loaded once (at startup or on first
+use) and then shared; load time, memory growth and warm/cold status are
+kept for /health
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (Linux /proc, psutil elsewhere)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, IndexError):
+        try:
+            import psutil
+            return psutil.Process().memory_info().rss / 1024 ** 2
+        except ImportError:
+            return 0.0
+
+
+class _ModelEntry:
+    def __init__(self, loader: Callable[[], object], describe: Optional[Callable[[object], str]]):
+        self.loader = loader
+        self.describe = describe
+        self.instance = None
+        self.status = "cold"
+        self.load_seconds = 0.0
+        self.load_memory_mb = 0.0
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """
+    Named, lazily loaded, shared model instances
+
+    ``get`` loads a model on first use; concurrent first calls wait for one
+    load instead of loading twice. A failed load is remembered and retried on
+    the next ``get``.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _ModelEntry] = {}
+
+    def register(self, name: str, loader: Callable[[], object],
+                 describe: Optional[Callable[[object], str]] = None):
+        """Register a loader; ``describe(instance)`` names what was actually loaded for status()"""
+        if name not in self._entries:
+            self._entries[name] = _ModelEntry(loader, describe)
+
+    def get(self, name: str):
+        """The shared instance of a registered model, loading it if still cold"""
+        entry = self._entries[name]
+        if entry.instance is not None:
+            return entry.instance
+
+        with entry.lock:
+            if entry.instance is None:
+                self._load(name, entry)
+        return entry.instance
+
+    def _load(self, name: str, entry: _ModelEntry):
+        entry.status = "loading"
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        try:
+            instance = entry.loader()
+        except Exception as e:
+            entry.status = "failed"
+            entry.error = str(e)
+            logger.error(f"❌ Failed to load model '{name}': {e}")
+            raise
+
+        entry.load_seconds = time.perf_counter() - start
+        entry.load_memory_mb = current_rss_mb() - rss_before
+        entry.error = None
+        entry.status = "warm"
+        entry.instance = instance
+        logger.info(f"✅ Model '{name}' loaded in {entry.load_seconds:.1f}s, +{entry.load_memory_mb:.0f} MB RSS")
+
+    def warm(self, names: Optional[Iterable[str]] = None):
+        """Load the given (default: all) registered models now, logging rather than raising failures"""
+        for name in names or list(self._entries):
+            try:
+                self.get(name)
+            except Exception:
+                pass
+
+    def is_warm(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.instance is not None
+
+    def status(self) -> Dict[str, Dict]:
+        return {
+            name: {
+                "status": entry.status,
+                "model": entry.describe(entry.instance) if entry.describe and entry.instance is not None else None,
+                "load_seconds": round(entry.load_seconds, 2),
+                "load_memory_mb": round(entry.load_memory_mb, 1),
+                "error": entry.error
+            }
+            for name, entry in self._entries.items()
+        }
+
+
+# Shared by every module of the process
+model_registry = ModelRegistry()
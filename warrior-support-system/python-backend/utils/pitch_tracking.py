@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Pitch (F0) tracking backends for prosodic voice features
+pyin (librosa, most accurate, slowest), YIN and a vectorized
+autocorrelation tracker restricted to the speech range
+"""
+
+import numpy as np
+import librosa
+from typing import Optional, Tuple
+
+PITCH_BACKENDS = ('pyin', 'yin', 'autocorr')
+
+# Speech F0 range used by the fast backends (adult male low end to raised female voice)
+SPEECH_FMIN = 65.0
+SPEECH_FMAX = 500.0
+
+AUTOCORR_BLOCK_FRAMES = 512
+OCTAVE_PEAK_RATIO = 0.9
+AUTOCORR_PERIODICITY_THRESHOLD = 0.45
+
+
+def track_pitch(audio: np.ndarray, sr: int, backend: str = 'pyin',
+                fmin: float = SPEECH_FMIN, fmax: float = SPEECH_FMAX,
+                frame_length: int = 2048, hop_length: int = 512,
+                rms: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Estimate frame-wise F0 with the selected backend
+
+    Args:
+        audio: Mono audio signal
+        sr: Sample rate
+        backend: 'pyin', 'yin' or 'autocorr'
+        fmin, fmax: Search range in Hz
+        frame_length, hop_length: Analysis framing in samples
+        rms: Precomputed frame RMS with the same framing (reused for voicing)
+
+    Returns:
+        (f0, voiced_flag) with NaN F0 in unvoiced frames, same layout as librosa.pyin
+    """
+    if backend == 'pyin':
+        f0, voiced_flag, _ = librosa.pyin(
+            audio, fmin=fmin, fmax=fmax, sr=sr,
+            frame_length=frame_length, hop_length=hop_length
+        )
+        return f0, voiced_flag
+    if backend == 'yin':
+        return _track_yin(audio, sr, fmin, fmax, frame_length, hop_length, rms)
+    if backend == 'autocorr':
+        return _track_autocorr(audio, sr, fmin, fmax, frame_length, hop_length, rms)
+
+    raise ValueError(f"Unknown pitch backend '{backend}', expected one of {PITCH_BACKENDS}")
+
+
+def _energy_voicing(audio: np.ndarray, frame_length: int, hop_length: int,
+                    rms: Optional[np.ndarray] = None, threshold_ratio: float = 0.1) -> np.ndarray:
+    """Frames with RMS above a fraction of the mean energy (same rule as pause detection)"""
+    if rms is None:
+        rms = librosa.feature.rms(y=audio, frame_length=frame_length, hop_length=hop_length)[0]
+    return rms > np.mean(rms) * threshold_ratio
+
+
+def _track_yin(audio: np.ndarray, sr: int, fmin: float, fmax: float,
+               frame_length: int, hop_length: int,
+               rms: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """librosa.yin with energy-based voicing (YIN itself has no voicing decision)"""
+    f0 = librosa.yin(audio, fmin=fmin, fmax=fmax, sr=sr,
+                     frame_length=frame_length, hop_length=hop_length)
+
+    voiced_flag = _energy_voicing(audio, frame_length, hop_length, rms)[:len(f0)]
+    # YIN clamps to the search bounds when it finds no trough
+    voiced_flag &= (f0 > fmin * 1.01) & (f0 < fmax * 0.99)
+
+    f0 = np.where(voiced_flag, f0, np.nan)
+    return f0, voiced_flag
+
+
+def _track_autocorr(audio: np.ndarray, sr: int, fmin: float, fmax: float,
+                    frame_length: int, hop_length: int,
+                    rms: Optional[np.ndarray] = None,
+                    periodicity_threshold: float = AUTOCORR_PERIODICITY_THRESHOLD) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Normalized autocorrelation pitch tracker, vectorized over all frames
+
+    Autocorrelation is computed with batched real FFTs and divided by the
+    window's own autocorrelation (Boersma's correction); only lags inside [sr/fmax, sr/fmin] are searched and the peak is refined
+    with parabolic interpolation. A frame is voiced when its normalized peak
+    exceeds ``periodicity_threshold`` and it carries speech-level energy.
+    """
+    padded = np.pad(audio.astype(np.float64), frame_length // 2)
+    frames = librosa.util.frame(padded, frame_length=frame_length, hop_length=hop_length).T
+
+    f0, peak_value, energy = autocorr_frames(frames, sr, fmin, fmax)
+
+    voiced_flag = (peak_value > periodicity_threshold) & (energy > 0)
+    voiced_flag &= _energy_voicing(audio, frame_length, hop_length, rms)[:len(f0)]
+    voiced_flag &= (f0 >= fmin) & (f0 <= fmax)
+
+    f0 = np.where(voiced_flag, f0, np.nan)
+    return f0, voiced_flag
+
+
+def autocorr_frames(frames: np.ndarray, sr: int, fmin: float = SPEECH_FMIN,
+                    fmax: float = SPEECH_FMAX) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    F0 candidate, normalized periodicity and energy for pre-framed audio
+
+    Args:
+        frames: (n_frames, frame_length) array of raw samples
+        sr: Sample rate
+        fmin, fmax: Search range in Hz
+
+    Returns:
+        (f0, peak_value, energy) per frame, before any voicing decision
+    """
+    frame_length = frames.shape[1]
+    min_lag = max(1, int(np.floor(sr / fmax)))
+    max_lag = min(frame_length - 2, int(np.ceil(sr / fmin)))
+    window = np.hanning(frame_length)
+    window_acf = np.fft.irfft(np.abs(np.fft.rfft(window, n=2 * frame_length)) ** 2)[:frame_length]
+    window_acf = np.maximum(window_acf / window_acf[0], 1e-3)
+
+    n_frames = len(frames)
+    f0 = np.empty(n_frames)
+    peak_value = np.empty(n_frames)
+    energy = np.empty(n_frames)
+
+    # Blocks of frames keep the FFT buffers small for long recordings
+    for start in range(0, n_frames, AUTOCORR_BLOCK_FRAMES):
+        block = slice(start, min(start + AUTOCORR_BLOCK_FRAMES, n_frames))
+        f0[block], peak_value[block], energy[block] = _autocorr_block(
+            frames[block], sr, window, window_acf, min_lag, max_lag
+        )
+
+    return f0, peak_value, energy
+
+
+def _autocorr_block(frames: np.ndarray, sr: int, window: np.ndarray, window_acf: np.ndarray,
+                    min_lag: int, max_lag: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """F0, normalized peak height and energy for a block of frames"""
+    frame_length = frames.shape[1]
+    frames = (frames - frames.mean(axis=1, keepdims=True)) * window
+
+    n_fft = 2 * frame_length
+    spectrum = np.fft.rfft(frames, n=n_fft, axis=1)
+    acf = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=n_fft, axis=1)[:, :frame_length]
+
+    energy = acf[:, 0]
+    safe_energy = np.where(energy > 0, energy, 1.0)
+    acf = acf / safe_energy[:, None] / window_acf
+
+    search = acf[:, min_lag:max_lag + 1]
+
+    # Prefer the shortest-lag local peak close to the maximum to avoid octave-down errors
+    best = search.max(axis=1, keepdims=True)
+    is_peak = np.zeros_like(search, dtype=bool)
+    is_peak[:, 1:-1] = (search[:, 1:-1] > search[:, :-2]) & (search[:, 1:-1] >= search[:, 2:])
+    candidates = is_peak & (search >= OCTAVE_PEAK_RATIO * best)
+    peak = np.where(candidates.any(axis=1), np.argmax(candidates, axis=1), np.argmax(search, axis=1))
+
+    lag = peak + min_lag
+    rows = np.arange(len(lag))
+    peak_value = search[rows, peak]
+
+    # Parabolic interpolation around the peak for sub-sample lag
+    left = acf[rows, lag - 1]
+    center = acf[rows, lag]
+    right = acf[rows, lag + 1]
+    denom = left - 2 * center + right
+    shift = np.where(np.abs(denom) > 1e-12, 0.5 * (left - right) / denom, 0.0)
+    refined_lag = lag + np.clip(shift, -0.5, 0.5)
+
+    return sr / refined_lag, peak_value, energy
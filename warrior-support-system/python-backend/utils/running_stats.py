@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Streaming statistics for incremental feature extraction
+Mean, standard deviation, skewness and kurtosis updated chunk by chunk
+without keeping the underlying samples in memory
+"""
+
+import numpy as np
+from typing import Dict
+
+
+class RunningMoments:
+    """
+    Running first four central moments (population statistics)
+
+    Each ``update`` computes the chunk's own central moments and merges them
+    with Pébay's pairwise formulas, which stay numerically stable for long
+    streams. Results match np.mean / np.std and the analyzers'
+    _calculate_skewness / _calculate_kurtosis over the concatenated data.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._m3 = 0.0
+        self._m4 = 0.0
+
+    def update(self, values) -> "RunningMoments":
+        """Merge a chunk of values (any shape; flattened)"""
+        x = np.asarray(values, dtype=np.float64).ravel()
+        if x.size == 0:
+            return self
+
+        mean_b = float(np.mean(x))
+        d = x - mean_b
+        d2 = d * d
+        self._merge(x.size, mean_b, float(np.sum(d2)), float(np.sum(d2 * d)), float(np.sum(d2 * d2)))
+        return self
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """Combine with statistics accumulated elsewhere"""
+        if other.n > 0:
+            self._merge(other.n, other.mean, other._m2, other._m3, other._m4)
+        return self
+
+    def _merge(self, n_b: int, mean_b: float, m2_b: float, m3_b: float, m4_b: float):
+        n_a = self.n
+        if n_a == 0:
+            self.n, self.mean = n_b, mean_b
+            self._m2, self._m3, self._m4 = m2_b, m3_b, m4_b
+            return
+
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        delta_n = delta / n
+        m2_a, m3_a = self._m2, self._m3
+
+        self._m4 = (self._m4 + m4_b
+                    + delta * delta_n ** 3 * n_a * n_b * (n_a * n_a - n_a * n_b + n_b * n_b)
+                    + 6 * delta_n ** 2 * (n_a * n_a * m2_b + n_b * n_b * m2_a)
+                    + 4 * delta_n * (n_a * m3_b - n_b * m3_a))
+        self._m3 = (m3_a + m3_b
+                    + delta * delta_n ** 2 * n_a * n_b * (n_a - n_b)
+                    + 3 * delta_n * (n_a * m2_b - n_b * m2_a))
+        self._m2 = m2_a + m2_b + delta * delta_n * n_a * n_b
+        self.mean += delta_n * n_b
+        self.n = n
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.n if self.n else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    @property
+    def skewness(self) -> float:
+        std = self.std
+        if self.n == 0 or std == 0:
+            return 0
+        return (self._m3 / self.n) / std ** 3
+
+    @property
+    def kurtosis(self) -> float:
+        """Excess kurtosis"""
+        variance = self.variance
+        if self.n == 0 or variance == 0:
+            return 0
+        return (self._m4 / self.n) / variance ** 2 - 3
+
+    def to_dict(self, prefix: str) -> Dict[str, float]:
+        """Feature dict in the analyzers' naming, e.g. prefix='wav2vec' -> wav2vec_mean ..."""
+        return {
+            f'{prefix}_mean': self.mean,
+            f'{prefix}_std': self.std,
+            f'{prefix}_skewness': self.skewness,
+            f'{prefix}_kurtosis': self.kurtosis
+        }
@@ -10,7 +10,7 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from models.hindi_sentiment import analyze_hindi_sentiment, get_emotion_analysis
+from models.hindi_sentiment import analyze_hindi_sentiment, get_emotion_analysis, get_hindi_sentiment_analyzer
 from models.mental_health_analyzer import QWarriorMentalHealthAnalyzer
 
 class SentimentAnalyzer:
@@ -21,13 +21,14 @@ class SentimentAnalyzer:
     def __init__(self):
         self.qwarrior_analyzer = QWarriorMentalHealthAnalyzer()
         
-    def analyze_sentiment(self, text: str, language: str = "auto") -> dict:
+    def analyze_sentiment(self, text: str, language: str = "auto", hindi_result: dict = None) -> dict:
         """
         Analyze sentiment of text using local models
         
         Args:
             text: Input text to analyze
             language: Language of text ("hindi", "english", or "auto")
+            hindi_result: Precomputed analyze_hindi_sentiment result for the text, if any
             
         Returns:
             Dictionary with sentiment analysis results
@@ -39,7 +40,7 @@ class SentimentAnalyzer:
             
             if language == "hindi" or self._contains_hindi(text):
                 # Use Hindi sentiment analyzer
-                result = analyze_hindi_sentiment(text)
+                result = hindi_result or analyze_hindi_sentiment(text)
                 
                 return {
                     "sentiment": result["sentiment_label"].lower(),
@@ -133,8 +134,9 @@ class SentimentAnalyzer:
             }
     
     def batch_analyze(self, texts: list) -> list:
-        """Analyze multiple texts"""
-        results = []
-        for text in texts:
-            results.append(self.analyze_sentiment(text))
-        return results
+        """Analyze multiple texts, running the Hindi sentiment model over all of them in batches"""
+        hindi_results = get_hindi_sentiment_analyzer().batch_analyze_sentiment(texts)
+        return [
+            self.analyze_sentiment(text, hindi_result=hindi_result)
+            for text, hindi_result in zip(texts, hindi_results)
+        ]
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Incremental voice feature extraction for live microphone input
+Updates energy, pause, pitch and spectral statistics block by block so
+partial features are available while recording and the final set is ready
+as soon as the last block arrives
+"""
+
+import threading
+import numpy as np
+import librosa
+from typing import Callable, Dict, Optional
+
+from utils.voice_segmentation import segment_pauses
+from utils.pitch_tracking import AUTOCORR_PERIODICITY_THRESHOLD, SPEECH_FMIN, SPEECH_FMAX, autocorr_frames
+from utils.running_stats import RunningMoments
+
+
+class StreamingVoiceFeatures:
+    """
+    Block-wise counterpart of AdvancedVoiceMentalHealthAnalyzer's hand-crafted features
+
+    Audio is framed exactly like librosa's centered STFT/RMS (zero padding of
+    frame_length // 2 at both ends, applied in ``finalize``), and each new frame
+    is analysed once. MFCC, spectral centroid/rolloff and zero-crossing
+    statistics are kept as running moments; per-frame RMS and autocorrelation
+    pitch candidates are kept as small scalar tracks so threshold-based
+    decisions (voicing, pauses) use the mean energy of the whole recording,
+    as the batch analyzer does.
+
+    The batch analyzer peak-normalizes each clip first. Energy features and
+    the MFCC 0 offset are rescaled to the running peak, so values match the
+    batch path up to power_to_db's top_db floor. Pitch uses the autocorrelation
+    backend with the speech F0 range.
+    """
+
+    def __init__(self, sr: int = 16000, frame_length: int = 2048, hop_length: int = 512, n_mfcc: int = 5):
+        self.sr = sr
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.n_mfcc = n_mfcc
+
+        self._window = librosa.filters.get_window('hann', frame_length, fftbins=True)
+        self._mel_basis = librosa.filters.mel(sr=sr, n_fft=frame_length)
+        self._lock = threading.Lock()
+
+        # Left half-frame of zeros reproduces librosa's center=True framing
+        self._buffer = np.zeros(frame_length // 2, dtype=np.float32)
+        self.n_samples = 0
+        self.peak = 0.0
+        self.finalized = False
+
+        self._rms = []
+        self._f0 = []
+        self._periodicity = []
+        self._energy = []
+        self._mfcc = [RunningMoments() for _ in range(n_mfcc)]
+        self._centroid = RunningMoments()
+        self._rolloff = RunningMoments()
+        self._zcr = RunningMoments()
+
+    @property
+    def duration(self) -> float:
+        return self.n_samples / self.sr
+
+    @property
+    def n_frames(self) -> int:
+        return sum(len(r) for r in self._rms)
+
+    def push(self, block: np.ndarray) -> int:
+        """Add a block of mono samples; returns the number of newly analysed frames"""
+        block = np.asarray(block, dtype=np.float32).ravel()
+        if block.size == 0:
+            return 0
+
+        with self._lock:
+            if self.finalized:
+                raise RuntimeError("Cannot push audio after finalize()")
+            self.n_samples += block.size
+            self.peak = max(self.peak, float(np.max(np.abs(block))))
+            self._buffer = np.concatenate((self._buffer, block))
+            return self._consume()
+
+    def finalize(self) -> Dict[str, float]:
+        """Flush the trailing half frame and return the final feature set"""
+        with self._lock:
+            if not self.finalized:
+                if self.n_samples > 0:
+                    padding = np.zeros(self.frame_length // 2, dtype=np.float32)
+                    self._buffer = np.concatenate((self._buffer, padding))
+                    self._consume()
+                self.finalized = True
+        return self.features()
+
+    def _consume(self) -> int:
+        """Analyse every complete frame in the buffer and keep the overlap"""
+        if len(self._buffer) < self.frame_length:
+            return 0
+
+        n_frames = 1 + (len(self._buffer) - self.frame_length) // self.hop_length
+        frames = librosa.util.frame(self._buffer, frame_length=self.frame_length, hop_length=self.hop_length).T
+        self._analyse_frames(frames[:n_frames])
+        self._buffer = self._buffer[n_frames * self.hop_length:]
+        return n_frames
+
+    def _analyse_frames(self, frames: np.ndarray):
+        self._rms.append(np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1)))
+
+        f0, periodicity, energy = autocorr_frames(frames, self.sr, SPEECH_FMIN, SPEECH_FMAX)
+        self._f0.append(f0)
+        self._periodicity.append(periodicity)
+        self._energy.append(energy)
+
+        magnitude = np.abs(np.fft.rfft(frames * self._window, axis=1)).T
+        mel = self._mel_basis @ (magnitude ** 2)
+        mfccs = librosa.feature.mfcc(S=librosa.power_to_db(mel, top_db=None), n_mfcc=self.n_mfcc)
+        for i in range(self.n_mfcc):
+            self._mfcc[i].update(mfccs[i])
+
+        self._centroid.update(librosa.feature.spectral_centroid(S=magnitude, sr=self.sr, n_fft=self.frame_length))
+        self._rolloff.update(librosa.feature.spectral_rolloff(S=magnitude, sr=self.sr, n_fft=self.frame_length))
+
+        crossings = np.abs(np.diff(np.signbit(frames), axis=1)).sum(axis=1)
+        self._zcr.update(crossings / self.frame_length)
+
+    def features(self) -> Dict[str, float]:
+        """Current feature dict, keyed like AdvancedVoiceMentalHealthAnalyzer.analyze_audio_array"""
+        with self._lock:
+            if not self._rms:
+                return {}
+            rms = np.concatenate(self._rms)
+            f0 = np.concatenate(self._f0)
+            periodicity = np.concatenate(self._periodicity)
+            energy = np.concatenate(self._energy)
+            mfcc = [(m.mean, m.std) for m in self._mfcc]
+            centroid, rolloff, zcr = self._centroid.mean, self._rolloff.mean, self._zcr.mean
+            n_samples = self.n_samples
+            peak = self.peak
+
+        # Equivalent of librosa.util.normalize on the audio seen so far
+        gain = 1.0 / peak if peak > 0 else 1.0
+        rms = rms * gain
+
+        features = {}
+
+        # Prosodic: same voicing rule as the batch autocorrelation backend
+        voiced = (periodicity > AUTOCORR_PERIODICITY_THRESHOLD) & (energy > 0)
+        voiced &= rms > np.mean(rms) * 0.1
+        voiced &= (f0 >= SPEECH_FMIN) & (f0 <= SPEECH_FMAX)
+        f0_clean = f0[voiced]
+
+        if len(f0_clean) > 0:
+            features.update({
+                'f0_mean': np.mean(f0_clean),
+                'f0_std': np.std(f0_clean),
+                'f0_range': np.max(f0_clean) - np.min(f0_clean),
+                'voiced_ratio': np.sum(voiced) / len(voiced)
+            })
+        else:
+            features.update({
+                'f0_mean': 0, 'f0_std': 0, 'f0_range': 0, 'voiced_ratio': 0
+            })
+
+        if len(f0_clean) > 1:
+            features['jitter'] = np.mean(np.abs(np.diff(f0_clean))) / np.mean(f0_clean)
+            rms_clean = rms[rms > 0]
+            if len(rms_clean) > 1:
+                features['shimmer'] = np.mean(np.abs(np.diff(rms_clean))) / np.mean(rms_clean)
+            else:
+                features['shimmer'] = 0
+        else:
+            features['jitter'] = 0
+            features['shimmer'] = 0
+
+        # Spectral: scaling audio by ``gain`` shifts every mel band by 20*log10(gain) dB,
+        # which the orthonormal DCT maps onto MFCC 0 only
+        mfcc_0_offset = 20 * np.log10(gain) * np.sqrt(self._mel_basis.shape[0])
+        for i, (mean, std) in enumerate(mfcc):
+            features[f'mfcc_{i}_mean'] = mean + (mfcc_0_offset if i == 0 else 0)
+            features[f'mfcc_{i}_std'] = std
+
+        features.update({
+            'spectral_centroid_mean': centroid,
+            'spectral_rolloff_mean': rolloff,
+            'zero_crossing_rate_mean': zcr
+        })
+
+        # Temporal
+        features.update({
+            'rms_mean': np.mean(rms),
+            'rms_std': np.std(rms)
+        })
+        pause_stats = segment_pauses(
+            rms, self.sr, self.hop_length, n_samples,
+            min_pause_duration=0.1,
+            include_trailing=False
+        )
+        features.update({
+            'num_pauses': pause_stats['num_pauses'],
+            'mean_pause_duration': pause_stats['mean_pause_duration'],
+            'pause_rate': pause_stats['pause_rate'],
+            'speaking_rate': pause_stats['speaking_rate']
+        })
+
+        return features
+
+    def snapshot(self, scorer: Optional[Callable[[Dict], Dict]] = None) -> Dict:
+        """Features plus optional scores (e.g. AdvancedVoiceMentalHealthAnalyzer.calculate_mental_health_scores)"""
+        features = self.features()
+        return {
+            'duration': round(self.duration, 2),
+            'frames_analysed': self.n_frames,
+            'final': self.finalized,
+            'features': features,
+            'scores': scorer(features) if scorer is not None and features else None
+        }
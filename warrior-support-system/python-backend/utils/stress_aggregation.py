@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Session-level aggregation of per-frame facial stress scores
+Streamed frames are folded into running totals as they are analysed, so a
+session's final analysis does not revisit its frames; lists collected by the
+live Streamlit analysis are summarized in one vectorized pass
+"""
+
+import math
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+
+# Upper bounds (inclusive) of the low / moderate / high bands; above is severe
+STRESS_BAND_LIMITS = (0.35, 0.55, 0.75)
+STRESS_BANDS = ('low', 'moderate', 'high', 'severe')
+
+
+def stress_band(score: float) -> str:
+    """Band name for one stress score, same boundaries as classify_stress_level"""
+    for band, limit in zip(STRESS_BANDS, STRESS_BAND_LIMITS):
+        if score <= limit:
+            return band
+    return STRESS_BANDS[-1]
+
+
+def finite_scores(stress_scores) -> np.ndarray:
+    """Stress scores as a float array without NaN / inf (frames whose score could not be computed)"""
+    scores = np.asarray(stress_scores, dtype=np.float64)
+    return scores[np.isfinite(scores)]
+
+
+def stress_distribution(stress_scores) -> Dict[str, int]:
+    """Frame count per stress band, from a single digitize/bincount pass"""
+    # NaN would otherwise be digitized into the severe band
+    scores = finite_scores(stress_scores)
+    # right=True puts a score equal to a limit in the lower band, as stress_band does
+    bands = np.digitize(scores, STRESS_BAND_LIMITS, right=True)
+    counts = np.bincount(bands, minlength=len(STRESS_BANDS))
+    return {band: int(count) for band, count in zip(STRESS_BANDS, counts)}
+
+
+def emotion_histogram(emotions) -> Dict[str, int]:
+    """Occurrences of each dominant emotion label"""
+    if len(emotions) == 0:
+        return {}
+    labels, counts = np.unique(np.asarray(emotions, dtype=str), return_counts=True)
+    return {str(label): int(count) for label, count in zip(labels, counts)}
+
+
+def _stress_summary(valid_frames: int, stress_sum: float, distribution: Dict[str, int],
+                    emotion_counts: Dict[str, int], confidence_sum: float, confidence_count: int) -> Dict:
+    return {
+        "valid_frames": valid_frames,
+        "average_stress": stress_sum / valid_frames if valid_frames else 0.0,
+        "stress_distribution": dict(distribution),
+        "emotion_distribution": dict(emotion_counts),
+        "average_confidence": confidence_sum / confidence_count if confidence_count else 0.0,
+        "severe_ratio": distribution['severe'] / valid_frames if valid_frames else 0.0,
+        "high_ratio": distribution['high'] / valid_frames if valid_frames else 0.0
+    }
+
+
+def summarize_stress(stress_scores, emotions=(), confidences=()) -> Dict:
+    """
+    Session statistics over per-frame stress scores, dominant emotions and face confidences
+
+    Returns valid_frames, average_stress, stress_distribution, emotion_distribution,
+    average_confidence and the severe/high band ratios (0-1). Non-finite scores
+    are left out.
+    """
+    scores = finite_scores(stress_scores)
+    confidences = np.asarray(confidences, dtype=np.float64)
+    return _stress_summary(
+        len(scores), float(scores.sum()), stress_distribution(scores),
+        emotion_histogram(emotions), float(confidences.sum()), len(confidences)
+    )
+
+
+class StressAggregate:
+    """
+    Running per-session totals of frame stress scores, emotions and confidences
+
+    Band counts, emotion counts and sums are updated per frame, so summary()
+    does not revisit frames; the raw lists are kept only because the final
+    analysis returns them under ``frame_analysis``. A frame with a non-finite
+    stress score counts towards ``frame_count`` but not as a valid frame.
+    """
+
+    def __init__(self):
+        self.frame_count = 0
+        self.stress_scores: List[float] = []
+        self.stress_sum = 0.0
+        self.stress_distribution = {band: 0 for band in STRESS_BANDS}
+        self.emotions: List[str] = []
+        self.emotion_counts: Dict[str, int] = {}
+        self.confidences: List[float] = []
+        self.confidence_sum = 0.0
+
+    def add(self, stress_score: float, emotions: Iterable[str] = (), confidence: Optional[float] = None):
+        """Record one analysed frame"""
+        self.frame_count += 1
+        if math.isfinite(stress_score):
+            self.stress_scores.append(stress_score)
+            self.stress_sum += stress_score
+            self.stress_distribution[stress_band(stress_score)] += 1
+
+        for emotion in emotions:
+            self.emotions.append(emotion)
+            self.emotion_counts[emotion] = self.emotion_counts.get(emotion, 0) + 1
+
+        if confidence is not None:
+            self.confidences.append(confidence)
+            self.confidence_sum += confidence
+
+    @classmethod
+    def from_lists(cls, stress_scores: List[float], emotions: List[str],
+                   confidences: List[float], frame_count: Optional[int] = None) -> "StressAggregate":
+        """Build an aggregate from already collected per-frame lists, totalled in one vectorized pass"""
+        aggregate = cls()
+        scores = finite_scores(stress_scores)
+        aggregate.stress_scores = scores.tolist()
+        aggregate.stress_sum = float(scores.sum())
+        aggregate.stress_distribution = stress_distribution(scores)
+        aggregate.emotions = list(emotions)
+        aggregate.emotion_counts = emotion_histogram(aggregate.emotions)
+        aggregate.confidences = list(confidences)
+        aggregate.confidence_sum = float(np.sum(aggregate.confidences)) if aggregate.confidences else 0.0
+        aggregate.frame_count = len(stress_scores) if frame_count is None else frame_count
+        return aggregate
+
+    @property
+    def valid_frames(self) -> int:
+        return len(self.stress_scores)
+
+    def summary(self) -> Dict:
+        """Same statistics as summarize_stress, from the running totals"""
+        return _stress_summary(
+            self.valid_frames, self.stress_sum, self.stress_distribution,
+            self.emotion_counts, self.confidence_sum, len(self.confidences)
+        )
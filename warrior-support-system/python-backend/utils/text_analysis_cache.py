@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Memoized text analysis results keyed by normalized answer text
+Short answers ("ठीक हूँ", "I am fine") recur across thousands of assessments,
+so sentiment and mental state results are kept in a bounded in-memory LRU
+with a TTL, optionally backed by SQLite so they survive restarts
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEXT_CACHE_PATH = Path(__file__).parent.parent / "models_cache" / "text_analysis.sqlite3"
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_PERSISTENT_ENTRIES = 200000
+PERSISTENT_PRUNE_FRACTION = 0.9  # a full SQLite table is pruned down to this share of its limit
+
+
+def normalize_text(text: str) -> str:
+    """NFKC form with whitespace runs collapsed, so trivially different spellings share one entry"""
+    return re.sub(r'\s+', ' ', unicodedata.normalize("NFKC", text or "")).strip()
+
+
+def _text_key(normalized: str) -> str:
+    # Answers are only stored hashed, never as plain text
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _to_builtin(value):
+    """numpy scalars / arrays -> JSON-serializable Python values"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class TextAnalysisCache:
+    """
+    LRU + TTL cache of analysis result dicts
+
+    Entries are keyed by (namespace, analyzer version, normalized text hash);
+    the version should change whenever the model or analysis code behind a
+    namespace does. Results are deep-copied in and out, so callers may mutate
+    what they get. Safe to share between threads. ``max_entries=0`` disables
+    caching.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 path: Optional[Union[str, Path]] = None,
+                 max_persistent_entries: int = DEFAULT_MAX_PERSISTENT_ENTRIES):
+        self._lock = threading.Lock()
+        self._conn = None
+        self.configure(max_entries, ttl_seconds, path, max_persistent_entries)
+
+    def configure(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                  path: Optional[Union[str, Path]] = None,
+                  max_persistent_entries: int = DEFAULT_MAX_PERSISTENT_ENTRIES):
+        """(Re)configure limits and the optional SQLite file; drops in-memory entries and counters"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+            self.max_entries = max_entries
+            self.ttl_seconds = ttl_seconds
+            self.max_persistent_entries = max_persistent_entries
+            self.path = Path(path) if path else None
+            self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Dict]]" = OrderedDict()
+            self._persistent_entries = 0  # upper bound on SQLite rows (replaced rows are counted again)
+
+            self.hits = 0
+            self.persistent_hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+
+            if self.path and self.enabled:
+                self._open_database()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _open_database(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS text_analysis (
+                namespace TEXT NOT NULL,
+                version TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, version, text_hash)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_text_analysis_access ON text_analysis (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_text_analysis_created ON text_analysis (created_at)")
+        self._conn.commit()
+        self._persistent_entries = self._conn.execute("SELECT COUNT(*) FROM text_analysis").fetchone()[0]
+
+    def _remember(self, key: Tuple[str, str, str], created_at: float, result: Dict):
+        self._entries[key] = (created_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, namespace: str, version: str, text: str) -> Optional[Dict]:
+        """Cached result for ``text``, or None on a miss"""
+        if not self.enabled:
+            return None
+
+        key = (namespace, version, _text_key(normalize_text(text)))
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(entry[1])
+                del self._entries[key]
+                self.expirations += 1
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT result, created_at FROM text_analysis "
+                    "WHERE namespace = ? AND version = ? AND text_hash = ? AND created_at >= ?",
+                    (*key, now - self.ttl_seconds)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE text_analysis SET last_access = ? WHERE namespace = ? AND version = ? AND text_hash = ?",
+                        (now, *key)
+                    )
+                    self._conn.commit()
+                    result = json.loads(row[0])
+                    self._remember(key, row[1], result)
+                    self.hits += 1
+                    self.persistent_hits += 1
+                    return copy.deepcopy(result)
+
+            self.misses += 1
+        return None
+
+    def put(self, namespace: str, version: str, text: str, result: Dict):
+        """Store a result for ``text`` (and in SQLite when persistence is on)"""
+        if not self.enabled:
+            return
+
+        key = (namespace, version, _text_key(normalize_text(text)))
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, copy.deepcopy(result))
+
+            if self._conn is not None:
+                try:
+                    payload = json.dumps(result, default=_to_builtin, ensure_ascii=False)
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"⚠️ Not persisting {namespace} result: {e}")
+                    return
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO text_analysis VALUES (?, ?, ?, ?, ?, ?)",
+                    (*key, payload, now, now)
+                )
+                self._persistent_entries += 1
+                self._prune(now)
+                self._conn.commit()
+
+    def _prune(self, now: float):
+        expired = self._conn.execute(
+            "DELETE FROM text_analysis WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        self.expirations += expired
+        self._persistent_entries -= expired
+        if self._persistent_entries <= self.max_persistent_entries:
+            return
+
+        # Only recount once the tracked bound passes the limit, and then evict well below
+        # it, so most puts do not scan the table
+        rows = self._conn.execute("SELECT COUNT(*) FROM text_analysis").fetchone()[0]
+        if rows > self.max_persistent_entries:
+            excess = rows - int(self.max_persistent_entries * PERSISTENT_PRUNE_FRACTION)
+            self._conn.execute(
+                "DELETE FROM text_analysis WHERE rowid IN "
+                "(SELECT rowid FROM text_analysis ORDER BY last_access LIMIT ?)", (excess,)
+            )
+            self.evictions += excess
+            rows -= excess
+        self._persistent_entries = rows
+
+    def get_or_compute(self, namespace: str, version: str, text: str,
+                       compute: Callable[[str], Dict],
+                       cacheable: Optional[Callable[[Dict], bool]] = None) -> Dict:
+        """
+        Cached result for ``text``, else ``compute(normalized_text)`` stored and returned
+
+        The analysis runs on the normalized text so that every spelling sharing
+        a key gets the same result. Exceptions from ``compute`` propagate and
+        nothing is stored; neither is a result for which ``cacheable(result)``
+        is false (e.g. a degraded fallback result that ``version`` does not describe).
+        """
+        normalized = normalize_text(text)
+        if not self.enabled:
+            return compute(normalized)
+
+        result = self.get(namespace, version, normalized)
+        if result is None:
+            result = compute(normalized)
+            if cacheable is None or cacheable(result):
+                self.put(namespace, version, normalized, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM text_analysis")
+                self._conn.commit()
+                self._persistent_entries = 0
+
+    def stats(self) -> Dict:
+        """Hit-rate and size metrics for /health"""
+        with self._lock:
+            persistent_entries = self._conn.execute(
+                "SELECT COUNT(*) FROM text_analysis"
+            ).fetchone()[0] if self._conn is not None else None
+            lookups = self.hits + self.misses
+
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "path": str(self.path) if self._conn is not None else None,
+                "persistent_entries": persistent_entries,
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+
+# Shared by the text analyzers of the process; app.py configures size, TTL and persistence
+text_analysis_cache = TextAnalysisCache()
@@ -3,9 +3,75 @@ Enhanced Hindi-English Translation Engine
 Provides better translation capabilities for the Army Mental Health Assessment System
 """
 import re
+import sys
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import unicodedata
 
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.keyword_index import KeywordIndex
+
+# Punctuation stripped before lookup; Devanagari vowel signs and nasalization marks are
+# not \w, so they are kept explicitly (only the dandas are punctuation)
+WORD_PUNCTUATION = re.compile(r'[^\w\s\u0900-\u0963\u0966-\u097F]')
+PARTIAL_MATCH_MEMO_SIZE = 50000  # words whose partial match is remembered (free text repeats words a lot)
+
+class PartialMatchIndex:
+    """
+    Partial-match lookup over a dictionary's keys, built once
+
+    A word missing from the dictionary matches the key that shares the longest
+    stretch of it: a key containing the whole word (the shortest such key),
+    otherwise the longest key contained in the word. Remaining ties go to the
+    earlier dictionary entry, so results do not depend on scan order.
+    """
+
+    def __init__(self, dictionary: Dict[str, str]):
+        self.dictionary = dictionary
+        self._key_order = {key: i for i, key in enumerate(dictionary)}
+
+        # Every substring of every key -> shortest (then earliest) key containing it
+        self._containing: Dict[str, str] = {}
+        for key in dictionary:
+            for start in range(len(key)):
+                for end in range(start + 1, len(key) + 1):
+                    best = self._containing.get(key[start:end])
+                    if best is None or len(key) < len(best):
+                        self._containing[key[start:end]] = key
+
+        # Keys contained in a word are found in one automaton pass over the word
+        self._contained = KeywordIndex({"keys": list(dictionary)}, whole_words=False, case_sensitive=True)
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def match_key(self, word: str) -> Optional[str]:
+        """Best partially matching key for ``word``, or None"""
+        if not word:
+            return None
+
+        key = self._containing.get(word)
+        if key is not None:
+            return key
+
+        if word in self._memo:
+            return self._memo[word]
+
+        best = None
+        for hit in self._contained.find(word):
+            if best is None or (len(hit.keyword), -self._key_order[hit.keyword]) > (len(best), -self._key_order[best]):
+                best = hit.keyword
+
+        if len(self._memo) >= PARTIAL_MATCH_MEMO_SIZE:
+            self._memo.clear()
+        self._memo[word] = best
+        return best
+
+    def match(self, word: str) -> Optional[str]:
+        """Dictionary value of the best partially matching key, or None"""
+        key = self.match_key(word)
+        return self.dictionary[key] if key is not None else None
+
 class HindiEnglishTranslator:
     """
     Enhanced translation engine for Hindi-English conversion
@@ -17,6 +83,8 @@ class HindiEnglishTranslator:
         self.english_to_hindi_dict = self._load_english_hindi_dictionary()
         self.transliteration_map = self._load_transliteration_map()
         self.mental_health_terms = self._load_mental_health_terms()
+        self.hindi_partial_index = PartialMatchIndex(self.hindi_to_english_dict)
+        self.english_partial_index = PartialMatchIndex(self.english_to_hindi_dict)
     
     def _load_hindi_english_dictionary(self) -> Dict[str, str]:
         """Load Hindi to English dictionary"""
@@ -146,14 +214,14 @@ class HindiEnglishTranslator:
         
         for word in words:
             # Remove punctuation for lookup
-            clean_word = re.sub(r'[^\w\s]', '', word)
+            clean_word = WORD_PUNCTUATION.sub('', word)
             
-            # Direct dictionary lookup
-            if clean_word in self.hindi_to_english_dict:
-                translated_words.append(self.hindi_to_english_dict[clean_word])
-            # Try partial matches
-            elif self._find_partial_match(clean_word, self.hindi_to_english_dict):
-                match = self._find_partial_match(clean_word, self.hindi_to_english_dict)
+            # Direct dictionary lookup, then partial match
+            match = self.hindi_to_english_dict.get(clean_word)
+            if match is None:
+                match = self.hindi_partial_index.match(clean_word)
+            
+            if match is not None:
                 translated_words.append(match)
             # Transliterate if no translation found
             else:
@@ -186,14 +254,14 @@ class HindiEnglishTranslator:
         
         for word in words:
             # Remove punctuation for lookup
-            clean_word = re.sub(r'[^\w\s]', '', word)
+            clean_word = WORD_PUNCTUATION.sub('', word)
+            
+            # Direct dictionary lookup, then partial match
+            match = self.english_to_hindi_dict.get(clean_word)
+            if match is None:
+                match = self.english_partial_index.match(clean_word)
             
-            # Direct dictionary lookup
-            if clean_word in self.english_to_hindi_dict:
-                translated_words.append(self.english_to_hindi_dict[clean_word])
-            # Try partial matches
-            elif self._find_partial_match(clean_word, self.english_to_hindi_dict):
-                match = self._find_partial_match(clean_word, self.english_to_hindi_dict)
+            if match is not None:
                 translated_words.append(match)
             # Keep original if no translation found
             else:
@@ -211,10 +279,11 @@ class HindiEnglishTranslator:
     
     def _find_partial_match(self, word: str, dictionary: Dict[str, str]) -> Optional[str]:
         """Find partial matches in dictionary"""
-        for key, value in dictionary.items():
-            if word in key or key in word:
-                return value
-        return None
+        if dictionary is self.hindi_to_english_dict:
+            return self.hindi_partial_index.match(word)
+        if dictionary is self.english_to_hindi_dict:
+            return self.english_partial_index.match(word)
+        return PartialMatchIndex(dictionary).match(word)
     
     def _transliterate_word(self, hindi_word: str) -> str:
         """Transliterate Hindi word to Roman script"""
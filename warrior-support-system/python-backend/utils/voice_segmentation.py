@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Vectorized pause / speech segmentation for voice feature extraction
+Shared by AdvancedVoiceMentalHealthAnalyzer and VoiceFeatureExtractor
+"""
+
+import numpy as np
+from typing import Dict, Tuple
+
+
+def find_runs(mask: np.ndarray, include_trailing: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find runs of True in a boolean frame mask using edge detection
+
+    Args:
+        mask: 1-D boolean array (e.g. silent frames)
+        include_trailing: Keep a run that is still open at the last frame
+
+    Returns:
+        (starts, ends) index arrays; ``starts`` inclusive, ``ends`` exclusive
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if mask.size == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    # Pad with False on both sides so every run has a rising and falling edge
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    starts, ends = edges[0::2], edges[1::2]
+
+    if not include_trailing and len(ends) > 0 and ends[-1] == mask.size:
+        starts, ends = starts[:-1], ends[:-1]
+
+    return starts, ends
+
+
+def segment_pauses(rms: np.ndarray, sr: int, hop_length: int, n_samples: int,
+                   threshold_ratio: float = 0.1, min_pause_duration: float = 0.0,
+                   include_trailing: bool = True, inclusive_threshold: bool = False) -> Dict[str, float]:
+    """
+    Pause counts, durations and speaking-rate statistics from frame energies in one pass
+
+    Frames below ``threshold_ratio * mean(rms)`` are treated as silence.
+
+    Args:
+        rms: Frame RMS energies
+        sr: Sample rate of the analysed audio
+        hop_length: Hop between RMS frames in samples
+        n_samples: Length of the analysed audio in samples
+        threshold_ratio: Silence threshold relative to mean energy
+        min_pause_duration: Only count pauses strictly longer than this (seconds)
+        include_trailing: Count a pause that runs until the end of the clip
+        inclusive_threshold: Treat frames equal to the threshold as silent
+
+    Returns:
+        Dictionary with num_pauses, mean_pause_duration, pause_duration_std,
+        total_pause_time, pause_rate, speaking_rate (share of time not in
+        counted pauses), voiced_time and voiced_ratio (share of non-silent frames
+        by time)
+    """
+    rms = np.asarray(rms)
+    threshold = np.mean(rms) * threshold_ratio if rms.size > 0 else 0.0
+    silent = rms <= threshold if inclusive_threshold else rms < threshold
+
+    starts, ends = find_runs(silent, include_trailing=include_trailing)
+    durations = (ends - starts) * hop_length / sr
+    if min_pause_duration > 0:
+        durations = durations[durations > min_pause_duration]
+
+    total_duration = n_samples / sr
+    num_pauses = len(durations)
+    total_pause_time = float(np.sum(durations)) if num_pauses else 0.0
+    voiced_time = np.count_nonzero(~silent) * hop_length / sr
+
+    if total_duration > 0:
+        pause_rate = num_pauses / total_duration
+        speaking_rate = (total_duration - total_pause_time) / total_duration
+        voiced_ratio = voiced_time / total_duration
+    else:
+        pause_rate = speaking_rate = voiced_ratio = 0
+
+    return {
+        'num_pauses': num_pauses,
+        'mean_pause_duration': float(np.mean(durations)) if num_pauses else 0,
+        'pause_duration_std': float(np.std(durations)) if num_pauses else 0,
+        'total_pause_time': total_pause_time,
+        'pause_rate': pause_rate,
+        'speaking_rate': speaking_rate,
+        'voiced_time': voiced_time,
+        'voiced_ratio': voiced_ratio
+    }
@@ -6,8 +6,14 @@ Extracts voice features for mental health assessment in military personnel
 import numpy as np
 import librosa
 import torch
+import sys
+from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+sys.path.append(str(Path(__file__).parent / "python-backend"))
+
+from utils.voice_segmentation import find_runs, segment_pauses
+
 try:
     from transformers import Wav2Vec2Processor, Wav2Vec2Model
     TRANSFORMERS_AVAILABLE = True
@@ -140,32 +146,19 @@ class VoiceFeatureExtractor:
             'zcr_std': np.std(zcr)
         })
         
-        # Pause detection and analysis
-        energy_threshold = np.mean(rms) * 0.1
-        voiced_frames = rms > energy_threshold
-        
-        # Calculate pause statistics
-        pause_frames = ~voiced_frames
-        pause_segments = self._get_segments(pause_frames)
-        
-        if len(pause_segments) > 0:
-            pause_durations = [(end - start) * self.hop_length / sr for start, end in pause_segments]
-            features.update({
-                'pause_rate': len(pause_segments) / (len(audio) / sr),
-                'mean_pause_duration': np.mean(pause_durations),
-                'pause_duration_std': np.std(pause_durations)
-            })
-        else:
-            features.update({
-                'pause_rate': 0,
-                'mean_pause_duration': 0,
-                'pause_duration_std': 0
-            })
+        # Pause detection and analysis (vectorized run-length segmentation)
+        pause_stats = segment_pauses(
+            rms, sr, self.hop_length, len(audio),
+            inclusive_threshold=True
+        )
+        features.update({
+            'pause_rate': pause_stats['pause_rate'],
+            'mean_pause_duration': pause_stats['mean_pause_duration'],
+            'pause_duration_std': pause_stats['pause_duration_std']
+        })
         
         # Speaking rate estimation
-        speaking_frames = np.sum(voiced_frames)
-        speaking_time = speaking_frames * self.hop_length / sr
-        features['speaking_rate'] = speaking_time / (len(audio) / sr) if len(audio) > 0 else 0
+        features['speaking_rate'] = pause_stats['voiced_ratio']
         
         return features
     
@@ -209,20 +202,8 @@ class VoiceFeatureExtractor:
     
     def _get_segments(self, binary_array: np.ndarray) -> List[Tuple[int, int]]:
         """Extract continuous segments from binary array"""
-        segments = []
-        start = None
-        
-        for i, val in enumerate(binary_array):
-            if val and start is None:
-                start = i
-            elif not val and start is not None:
-                segments.append((start, i))
-                start = None
-        
-        if start is not None:
-            segments.append((start, len(binary_array)))
-        
-        return segments
+        starts, ends = find_runs(binary_array)
+        return list(zip(starts.tolist(), ends.tolist()))
     
     def _calculate_skewness(self, data: np.ndarray) -> float:
         """Calculate skewness of data distribution"""